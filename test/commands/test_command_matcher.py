@@ -0,0 +1,109 @@
+import os
+from typing import Dict
+
+import pytest
+import yaml
+
+from zumrad_iis.commands.command_matcher import FuzzyCommandMatcher
+from zumrad_iis.commands.command_vocabulary import Vocabulary
+from zumrad_iis.commands.text_canonicalizer import TextCanonicalizer
+
+CONFIG_PATH: str = os.path.join(os.path.dirname(__file__), "..", "..", "config.yaml")
+
+
+def _vocabulary(locale: str) -> Vocabulary:
+    """Словарь команд из config.yaml для локали."""
+    with open(CONFIG_PATH, encoding="utf-8") as f:
+        commands = yaml.safe_load(f)["command_vocabulary"]
+    vocabulary_map: Dict[str, str] = {
+        phrase: command for command, locales in commands.items() for phrase in locales.get(locale, [])
+    }
+    return Vocabulary(list(commands), vocabulary_map, TextCanonicalizer(locale))
+
+
+@pytest.fixture
+def ru_matcher() -> FuzzyCommandMatcher:
+    # Без exact_only: ложные совпадения должны отсекаться самой оценкой
+    return FuzzyCommandMatcher(_vocabulary("ru-RU"))
+
+
+@pytest.mark.parametrize("phrase", [
+    "внимание три",
+    "внимание",
+    "опасность",
+    "сколько",
+    "открыть программу",
+    "выходной",
+])
+def test_partial_or_different_phrase_is_not_matched(ru_matcher: FuzzyCommandMatcher, phrase: str) -> None:
+    assert ru_matcher.match(phrase) is None
+
+
+@pytest.mark.parametrize("phrase, command", [
+    ("который час пожалуйста", None),  # Такой фразы в словаре нет вовсе
+    ("сколько времени пожалуйста", "what_time_is"),
+    ("скажи сколько сейчас времени", "what_time_is"),
+    ("повторить", "repeat"),
+    ("время пошло", None),             # Половина запроса фразой "время" не покрыта
+    ("хватит уже", None),
+])
+def test_extra_words_and_small_misrecognition(ru_matcher: FuzzyCommandMatcher, phrase: str, command: str) -> None:
+    matched = ru_matcher.match(phrase)
+    assert (matched[0] if matched else None) == command
+
+
+def test_exact_only_commands_are_never_matched_fuzzily() -> None:
+    matcher = FuzzyCommandMatcher(_vocabulary("ru-RU"), exact_only=["attention_two", "quit"])
+    assert matcher.match("внимание два пожалуйста") is None
+    assert matcher.match("завершить работу сейчас") is None
+    assert FuzzyCommandMatcher(_vocabulary("ru-RU")).match("внимание два пожалуйста")[0] == "attention_two"
+
+
+def test_ambiguous_match_is_rejected() -> None:
+    vocabulary = Vocabulary(["a", "b"], {"включи свет": "a", "включи свеч": "b"})
+    assert FuzzyCommandMatcher(vocabulary, min_score=0.5).match("включи све") is None
+    assert FuzzyCommandMatcher(vocabulary, min_score=0.5, min_margin=0.0).match("включи све") is not None
+
+
+def test_is_accepted_filters_commands() -> None:
+    matcher = FuzzyCommandMatcher(_vocabulary("ru-RU"))
+    assert matcher.match("сколько времени пожалуйста", lambda command: command != "what_time_is") is None
+
+
+def test_index_is_rebuilt_when_vocabulary_changes() -> None:
+    vocabulary = Vocabulary(["a"], {"включи свет": "a"})
+    matcher = FuzzyCommandMatcher(vocabulary)
+    assert matcher.match("выключи телевизор") is None
+    vocabulary.add_phrase("выключи телевизор", "b")
+    assert matcher.match("выключи телевизор") == ("b", 1.0)
+
+
+def test_uz_vocabulary_variants() -> None:
+    vocabulary = _vocabulary("uz-UZ")
+    matcher = FuzzyCommandMatcher(vocabulary)
+    assert matcher.match(vocabulary.canonicalize("hozirgi vaqt iltimos"))[0] == "what_time_is"
+    assert matcher.match(vocabulary.canonicalize("vaqt")) is None
+
+
+@pytest.mark.parametrize("locale, phrase", [
+    ("ru-RU", "не повторяй"),
+    ("ru-RU", "нет хватит"),
+    ("uz-UZ", "stop qilma"),
+    ("uz-UZ", "takrorlamang"),
+    ("uz-UZ", "takrorlama"),
+])
+def test_negated_command_is_not_matched(locale: str, phrase: str) -> None:
+    vocabulary = _vocabulary(locale)
+    assert FuzzyCommandMatcher(vocabulary).match(vocabulary.canonicalize(phrase)) is None
+
+
+def test_extra_query_words_lower_score() -> None:
+    vocabulary = Vocabulary(["a"], {"выключи телевизор": "a"})
+    matcher = FuzzyCommandMatcher(vocabulary)
+    assert matcher.match("выключи телевизор сейчас") == ("a", pytest.approx(0.8))
+    assert matcher.match("выключи телевизор сейчас же") is None
+
+
+def test_negation_in_vocabulary_phrase_is_allowed() -> None:
+    vocabulary = Vocabulary(["a"], {"не беспокоить": "a"})
+    assert FuzzyCommandMatcher(vocabulary).match("не беспокоить") == ("a", 1.0)
@@ -0,0 +1,74 @@
+from typing import List, Optional
+
+import pytest
+
+from zumrad_iis.commands.command_matcher import FuzzyCommandMatcher
+from zumrad_iis.commands.command_processor import CommandExecutor, CommandProcessor, CommandTranslator
+from zumrad_iis.commands.command_vocabulary import Vocabulary
+from zumrad_iis.commands.text_canonicalizer import TextCanonicalizer
+
+
+class FakeFeedback:
+    sound_path: str = "beep.wav"
+
+    async def play_sound(self, path: Optional[str]) -> None:
+        pass
+
+
+class RecordingRunner:
+    def __init__(self) -> None:
+        self.runs: List[str] = []
+
+    async def run(self, command_name: str) -> None:
+        self.runs.append(command_name)
+
+
+def make_translator(fuzzy: bool = True) -> CommandTranslator:
+    vocabulary = Vocabulary(["time", "quit", "repeat"], {
+        "сколько времени": "time",
+        "выход": "quit",
+        "повтори": "repeat",
+    }, TextCanonicalizer("ru-RU"))
+    return CommandTranslator(vocabulary, FuzzyCommandMatcher(vocabulary) if fuzzy else None)
+
+
+def test_best_hypothesis_wins() -> None:
+    assert make_translator().translate_best(["Выход", "повтори"]) == ("Выход", "quit")
+
+
+def test_exact_alternative_beats_fuzzy_best() -> None:
+    # Лучшая гипотеза похожа на команду лишь приблизительно, альтернатива совпадает точно
+    translator = make_translator()
+    assert translator.translate_best(["сколько времени сейчас"]) == ("сколько времени сейчас", "time")
+    assert translator.translate_best(["сколько времени сейчас", "повтори"]) == ("повтори", "repeat")
+
+
+def test_fuzzy_picks_highest_score_across_alternatives() -> None:
+    translator = make_translator()
+    assert translator.translate_best(["повтори пожалуйста еще", "сколько времени сейчас"]) == \
+        ("сколько времени сейчас", "time")
+
+
+def test_is_accepted_filters_commands() -> None:
+    translator = make_translator()
+    assert translator.translate_best(["выход", "повтори"], lambda command: command != "quit") == ("повтори", "repeat")
+    assert translator.translate_best(["выход"], lambda command: command != "quit") is None
+
+
+def test_no_fuzzy_without_matcher() -> None:
+    translator = make_translator(fuzzy=False)
+    assert translator.translate_best(["сколько времени сейчас"]) is None
+    assert translator.translate_best(["шум", "повтори"]) == ("повтори", "repeat")
+
+
+@pytest.mark.asyncio
+async def test_process_runs_registered_alternative() -> None:
+    runner = RecordingRunner()
+    executor = CommandExecutor(FakeFeedback())  # type: ignore[arg-type]
+    executor.register_command("repeat", runner)
+    processor = CommandProcessor(executor, make_translator())
+    # "выход" есть в словаре, но команда не зарегистрирована
+    assert await processor.process("выход", ["повтори"])
+    assert runner.runs == ["repeat"]
+    assert not await processor.process("выход")
+    assert runner.runs == ["repeat"]
@@ -0,0 +1,62 @@
+import logging
+from pathlib import Path
+
+import pytest
+import yaml
+
+from zumrad_iis.commands.command_vocabulary import Vocabulary
+from zumrad_iis.commands.text_canonicalizer import TextCanonicalizer
+from zumrad_iis.services.avosk_stt import STTService
+
+
+@pytest.mark.parametrize("locale, text, canonical", [
+    ("ru-RU", "Включи  Свет!", "включи свет"),
+    ("ru-RU", "Всё, ещё раз", "все еще раз"),
+    ("ru-RU", "Что-нибудь", "что нибудь"),
+    ("uz-UZ", "To‘liq ekran", "toliq ekran"),         # Любой апостроф отбрасывается
+    ("uz-UZ", "to`liq  ekran.", "toliq ekran"),
+    ("uz-UZ", "Chiqish", "chiqish"),                   # q и k - разные звуки, не сливаются
+    ("en-US", "Don’t stop", "don't stop"),             # Неизвестная локаль: только общие правила
+])
+def test_canonical_form(locale: str, text: str, canonical: str) -> None:
+    assert TextCanonicalizer(locale).canonicalize(text) == canonical
+
+
+@pytest.mark.parametrize("locale, text", [
+    ("ru-RU", "Ёлка - это «ЁЛКА»"),
+    ("uz-UZ", "O'zbekiston, qaysi soat?"),
+])
+def test_canonicalization_is_idempotent(locale: str, text: str) -> None:
+    canonicalizer = TextCanonicalizer(locale)
+    once = canonicalizer.canonicalize(text)
+    assert canonicalizer.canonicalize(once) == once
+
+
+def test_vocabulary_lookup_uses_canonical_form(caplog: pytest.LogCaptureFixture) -> None:
+    vocabulary = Vocabulary(["exit"], {"chiqish": "exit", "to'liq ekran": "fullscreen"}, TextCanonicalizer("uz-UZ"))
+    assert vocabulary.lookup(vocabulary.canonicalize("Chiqish!")) == "exit"
+    assert vocabulary.lookup(vocabulary.canonicalize("to‘liq ekran")) == "fullscreen"
+    with caplog.at_level(logging.WARNING):
+        vocabulary.add_phrase("to'liq  ekran!", "stop")       # Та же каноническая форма
+        assert vocabulary.lookup("toliq ekran") == "fullscreen"
+    assert "duplicates" in caplog.text
+
+
+@pytest.mark.parametrize("locale", ["ru-RU", "uz-UZ"])
+def test_config_vocabulary_has_no_collisions(locale: str) -> None:
+    with open(Path(__file__).parents[2] / "config.yaml", encoding="utf-8") as file:
+        command_vocabulary = yaml.safe_load(file)["command_vocabulary"]
+    canonicalizer = TextCanonicalizer(locale)
+    commands: dict[str, str] = {}
+    for command, phrases in command_vocabulary.items():
+        for phrase in phrases.get(locale, []):
+            assert commands.setdefault(canonicalizer.canonicalize(phrase), command) == command, phrase
+
+
+def test_grammar_has_surface_and_canonical_forms() -> None:
+    vocabulary = Vocabulary(["exit"], {"to'liq ish": "exit", "Chiqish": "exit"}, TextCanonicalizer("uz-UZ"))
+    stt = STTService(model_path="", audio_input=None, sample_rate=16000,  # type: ignore[arg-type]
+                    vocabulary=vocabulary)
+    grammar = stt.build_grammar()
+    assert {"to'liq ish", "toliq ish", "chiqish"} <= set(grammar)
+    assert "chikish" not in grammar
@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from zumrad_iis.services.stt.decode_chunker import DecodeChunker
+
+
+def samples(start: int, count: int) -> bytes:
+    return np.arange(start, start + count, dtype=np.int16).tobytes()
+
+
+def push_all(chunker: DecodeChunker, blocks: list) -> list:
+    # Порция валидна до следующей итерации: копируем сразу
+    return [bytes(chunk) for block in blocks for chunk in chunker.push(block)]
+
+
+@pytest.mark.parametrize("chunk_samples, block_samples", [
+    (4, 16),   # Порция меньше блока: срезы
+    (16, 4),   # Порция больше блока: накопление
+    (6, 4),    # Порции пересекают границы блоков
+    (4, 4),
+])
+def test_stream_is_rechunked_without_loss(chunk_samples: int, block_samples: int) -> None:
+    chunker = DecodeChunker(chunk_samples)
+    blocks = [samples(i, block_samples) for i in range(0, 48, block_samples)]
+    chunks = push_all(chunker, blocks)
+    assert all(len(chunk) == 2 * chunk_samples for chunk in chunks)
+    assert b"".join(chunks) == samples(0, 48 // chunk_samples * chunk_samples)
+
+
+def test_smaller_chunks_are_views_of_block() -> None:
+    block = bytearray(samples(0, 8))
+    chunk = next(iter(DecodeChunker(4).push(block)))
+    block[0] = 0x7F
+    assert chunk[0] == 0x7F # Срез исходного блока, без копии
+
+
+def test_reset_drops_partial_chunk() -> None:
+    chunker = DecodeChunker(4)
+    assert push_all(chunker, [samples(0, 3)]) == []
+    chunker.reset()
+    assert push_all(chunker, [samples(10, 4)]) == [samples(10, 4)]
+
+
+def test_memoryview_blocks_are_accepted() -> None:
+    chunker = DecodeChunker(2)
+    view = memoryview(np.arange(4, dtype=np.int16))
+    assert push_all(chunker, [view]) == [samples(0, 2), samples(2, 2)]
+
+
+def test_invalid_chunk_size() -> None:
+    with pytest.raises(ValueError):
+        DecodeChunker(0)
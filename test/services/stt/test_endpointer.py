@@ -0,0 +1,89 @@
+import json
+from typing import List
+
+from zumrad_iis.services.avosk_stt import RecognitionMode, STTService
+from zumrad_iis.services.stt.endpointer import EndpointerProfile
+from zumrad_iis.services.stt.recognition_events import STTResult
+
+SAMPLE_RATE: int = 1000
+CHUNK: bytes = bytes(2 * SAMPLE_RATE // 10) # 100 мс
+
+
+class OldRecognizer:
+    """KaldiRecognizer без настройки эндпойнтера (Vosk 0.3.45): гипотезы задаются сценарием."""
+    def __init__(self, partials: List[str]) -> None:
+        self.partials: List[str] = partials
+        self.accepted: int = 0
+
+    def AcceptWaveform(self, data: bytes) -> bool:
+        self.accepted += 1
+        return False
+
+    def PartialResult(self) -> str:
+        return json.dumps({"partial": self.partials[min(self.accepted, len(self.partials)) - 1]})
+
+    def FinalResult(self) -> str:
+        return json.dumps({"text": self.partials[min(self.accepted, len(self.partials)) - 1]})
+
+
+class NewRecognizer(OldRecognizer):
+    def __init__(self, partials: List[str]) -> None:
+        super().__init__(partials)
+        self.mode: int = -1
+        self.delays: tuple = ()
+
+    def SetEndpointerMode(self, mode: int) -> None:
+        self.mode = mode
+
+    def SetEndpointerDelays(self, t_start_max: float, t_end: float, t_max: float) -> None:
+        self.delays = (t_start_max, t_end, t_max)
+
+
+def make_service(recognizer: OldRecognizer, profile: EndpointerProfile) -> STTService:
+    stt = STTService(model_path="", audio_input=None, sample_rate=SAMPLE_RATE,  # type: ignore[arg-type]
+                    active_endpointer=profile)
+    stt.recognizer = stt._full_recognizer = recognizer  # type: ignore[assignment]
+    stt.set_mode(RecognitionMode.FULL)
+    return stt
+
+
+def test_profile_applied_natively() -> None:
+    recognizer = NewRecognizer([""])
+    profile = EndpointerProfile("short", "short", 5.0, 0.3, 10.0)
+    assert profile.apply(recognizer)
+    assert recognizer.mode == EndpointerProfile.MODES["short"]
+    assert recognizer.delays == (5.0, 0.3, 10.0)
+
+
+def test_profile_not_applied_on_old_vosk() -> None:
+    assert not EndpointerProfile("short", "short").apply(OldRecognizer([""]))
+
+
+def test_end_seconds_from_t_end_or_mode() -> None:
+    assert EndpointerProfile("a", "default", t_end=0.4).end_seconds == 0.4
+    assert EndpointerProfile("b", "short").end_seconds == EndpointerProfile.MODE_END_SECONDS["short"]
+    assert EndpointerProfile("c", "long").end_seconds is None
+
+
+def test_emulated_t_end_finalizes_stable_partial() -> None:
+    partials = ["который", "который час", "который час", "который час", "который час"]
+    stt = make_service(OldRecognizer(partials), EndpointerProfile("short", "short", t_end=0.3))
+    events = [stt.accept(CHUNK) for _ in partials]
+    # Гипотеза не менялась 300 мс после третьей порции
+    assert events[:4] == [None, None, None, None]
+    assert isinstance(events[4], STTResult)
+    assert events[4].text == "который час"
+
+
+def test_emulated_t_max_finalizes_long_utterance() -> None:
+    partials = [f"слово{i}" for i in range(10)] # Гипотеза меняется на каждой порции
+    stt = make_service(OldRecognizer(partials), EndpointerProfile("max", "default", t_max=0.5))
+    events = [stt.accept(CHUNK) for _ in partials]
+    finals = [i for i, event in enumerate(events) if isinstance(event, STTResult)]
+    assert finals[0] == 4
+
+
+def test_native_profile_is_not_emulated() -> None:
+    partials = ["выход"] * 6
+    stt = make_service(NewRecognizer(partials), EndpointerProfile("short", "short", t_end=0.1))
+    assert all(stt.accept(CHUNK) is None for _ in partials)
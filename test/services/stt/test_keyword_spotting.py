@@ -0,0 +1,44 @@
+import pickle
+
+import pytest
+
+from zumrad_iis.services.activation_service import ActivationService
+from zumrad_iis.services.avosk_stt import STTService
+
+
+def make_service(keyword: str, **kwargs) -> STTService:
+    return STTService(model_path="", audio_input=None, sample_rate=16000,  # type: ignore[arg-type]
+                    keyword=keyword, **kwargs)
+
+
+@pytest.mark.parametrize("keyword, text", [
+    ("zumrad", "zumrad soat necha"),
+    ("zumrad", "zum rad soat necha"),    # Ключевое слово разбито на два токена
+    ("zumrad", "zumrat"),
+    ("изумруд", "изумрут включи свет"),
+])
+def test_keyword_spotted_like_activation(keyword: str, text: str) -> None:
+    assert make_service(keyword)._has_keyword(text)
+    assert ActivationService(keyword).find_keyword(text) is not None
+
+
+@pytest.mark.parametrize("keyword, text", [
+    ("zumrad", "hozir ham rad etdi"),    # Подстрока "rad" - не ключевое слово
+    ("zumrad", "summa qancha"),
+    ("изумруд", "изумрудный город"),
+])
+def test_ordinary_speech_not_spotted(keyword: str, text: str) -> None:
+    assert not make_service(keyword)._has_keyword(text)
+
+
+def test_activation_finder_is_used_and_picklable() -> None:
+    activation = ActivationService("zumrad", fuzzy=False)
+    stt = make_service("zumrad", keyword_finder=activation.find_keyword)
+    assert not stt._has_keyword("zum rad") # Без нечеткого поиска, как при активации
+    assert stt._has_keyword("zumrad soat necha")
+    # Параметры STTService передаются процессу распознавания
+    assert pickle.loads(pickle.dumps(activation.find_keyword))("zumrad") is not None
+
+
+def test_no_keyword() -> None:
+    assert not make_service("")._has_keyword("zumrad")
@@ -0,0 +1,216 @@
+import asyncio
+import logging
+from collections import deque
+from typing import Iterable, List, Optional, Union
+
+import pytest
+
+from zumrad_iis.services.avosk_stt import Messages
+from zumrad_iis.services.stt import speech_recognizer
+from zumrad_iis.services.stt.recognition_events import PartialEvent, RecognitionEvent, STTResult
+from zumrad_iis.services.stt.speech_recognizer import SpeechRecognizer
+
+SPEECH: bytes = b"\x01" * 320  # 10 мс речи при 16 кГц, моно
+SILENCE: bytes = b"\x00" * 320
+
+
+class FakeAudioInput:
+    """Отдает заданные блоки (исключение в списке поднимается при чтении), затем сообщает о конце источника."""
+    samplerate: int = 16000
+    channels: int = 1
+    blocksize: int = 160
+    stream_latency: float = 0.0
+
+    def __init__(self, blocks: Iterable[Union[bytes, Exception]] = ()) -> None:
+        self.blocks: deque = deque(blocks)
+        self.reads: int = 0
+
+    @property
+    def is_finished(self) -> bool:
+        return not self.blocks
+
+    def read_frame(self, timeout: Optional[float] = None) -> Optional[bytes]:
+        self.reads += 1
+        block = self.blocks.popleft() if self.blocks else None
+        if isinstance(block, Exception):
+            raise block
+        return block
+
+
+class FakeVad:
+    """Речь - ненулевые блоки; hangover уже учтен тем, кто составил блоки."""
+    def process(self, portion: bytes) -> tuple:
+        return (portion,) if any(portion) else ()
+
+    def reset(self) -> None:
+        pass
+
+
+class FakeSTT:
+    """Каждая порция выдает следующее событие из events (None - без события)."""
+    def __init__(self, events: Iterable[Optional[RecognitionEvent]] = ()) -> None:
+        self.events: deque = deque(events)
+        self.accepted: List[bytes] = []
+        self.finalized: int = 0
+        self.utterance_id: int = 0
+
+    def accept(self, chunk: bytes) -> Optional[RecognitionEvent]:
+        self.accepted.append(bytes(chunk))
+        return self.events.popleft() if self.events else None
+
+    def finalize(self) -> Optional[STTResult]:
+        self.finalized += 1
+        return None
+
+    def reset_utterance(self) -> None:
+        self.utterance_id += 1
+
+
+def _ready() -> None:
+    pass
+
+
+async def _noop(*args) -> None:
+    pass
+
+
+def make_recognizer(blocks: Iterable[Union[bytes, Exception]], vad: Optional[FakeVad] = None,
+                    force_final_silence_ms: int = 0) -> SpeechRecognizer:
+    recognizer = SpeechRecognizer(FakeAudioInput(blocks), FakeSTT(), _ready, _noop, _noop,  # type: ignore[arg-type]
+                                vad=vad, force_final_silence_ms=force_final_silence_ms)  # type: ignore[arg-type]
+    recognizer.is_running = True
+    return recognizer
+
+
+def test_vad_finalizes_when_hangover_expires() -> None:
+    recognizer = make_recognizer([SPEECH, SPEECH, SILENCE, SILENCE, SPEECH, SILENCE], vad=FakeVad())
+    recognizer._recognition_pass()
+    assert recognizer.stt.finalized == 2  # type: ignore[attr-defined]
+    assert len(recognizer.stt.accepted) == 3  # type: ignore[attr-defined]
+
+
+@pytest.mark.parametrize("silent_blocks, finalized", [(2, 0), (3, 1), (6, 1)])
+def test_vad_finalizes_after_extra_silence(silent_blocks: int, finalized: int) -> None:
+    recognizer = make_recognizer([SPEECH] + [SILENCE] * silent_blocks, vad=FakeVad(), force_final_silence_ms=30)
+    recognizer._recognition_pass()
+    assert recognizer.stt.finalized == finalized  # type: ignore[attr-defined]
+
+
+def test_no_finalize_without_speech_or_vad() -> None:
+    recognizer = make_recognizer([SILENCE] * 5, vad=FakeVad())
+    recognizer._recognition_pass()
+    assert recognizer.stt.finalized == 0  # type: ignore[attr-defined]
+
+    recognizer = make_recognizer([SPEECH] + [SILENCE] * 5)
+    recognizer._recognition_pass()
+    assert recognizer.stt.finalized == 0  # type: ignore[attr-defined]
+    assert len(recognizer.stt.accepted) == 6  # type: ignore[attr-defined]
+
+
+class FakeClock:
+    """Часы, которые сдвигаются вручную: проход без ошибок можно сделать сколь угодно долгим."""
+    def __init__(self) -> None:
+        self.now: float = 0.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+class SlowFailingAudioInput(FakeAudioInput):
+    """Каждое чтение занимает step секунд по FakeClock."""
+    def __init__(self, blocks: Iterable[Union[bytes, Exception]], clock: FakeClock, step: float) -> None:
+        super().__init__(blocks)
+        self.clock = clock
+        self.step = step
+
+    def read_frame(self, timeout: Optional[float] = None) -> Optional[bytes]:
+        self.clock.now += self.step
+        return super().read_frame(timeout)
+
+
+@pytest.fixture(autouse=True)
+def no_restart_delay(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(SpeechRecognizer, "RESTART_DELAY", 0.0)
+
+
+def test_loop_restarts_after_transient_error() -> None:
+    recognizer = make_recognizer([SPEECH, OSError("device lost"), SPEECH, SPEECH])
+    recognizer._threaded_recognition_loop()
+    assert recognizer.stt.accepted == [SPEECH] * 3  # type: ignore[attr-defined]
+    # Перезапуск сбрасывает текущую фразу
+    assert recognizer.stt.utterance_id == 1  # type: ignore[attr-defined]
+
+
+def test_loop_gives_up_after_max_restarts(caplog: pytest.LogCaptureFixture) -> None:
+    errors = [OSError("device lost")] * (SpeechRecognizer.MAX_RESTARTS + 1)
+    recognizer = make_recognizer(errors + [SPEECH])
+    with caplog.at_level(logging.ERROR):
+        recognizer._threaded_recognition_loop()
+    assert recognizer.audio_in.reads == SpeechRecognizer.MAX_RESTARTS + 1  # type: ignore[attr-defined]
+    assert recognizer.stt.utterance_id == SpeechRecognizer.MAX_RESTARTS  # type: ignore[attr-defined]
+    assert recognizer.stt.accepted == []  # type: ignore[attr-defined]
+    assert "распознавание остановлено" in caplog.text
+
+
+def test_critical_error_is_not_restarted() -> None:
+    recognizer = make_recognizer([RuntimeError(Messages.FAILED_TO_LOAD_STT_MODEL), SPEECH])
+    recognizer._threaded_recognition_loop()
+    assert recognizer.audio_in.reads == 1  # type: ignore[attr-defined]
+    assert recognizer.stt.accepted == []  # type: ignore[attr-defined]
+
+
+def test_healthy_run_resets_restart_count(monkeypatch: pytest.MonkeyPatch) -> None:
+    clock = FakeClock()
+    monkeypatch.setattr(speech_recognizer, "time", clock)
+    # Каждый проход падает после долгой работы: ошибки редкие, счетчик обнуляется
+    errors = [OSError("device lost")] * (SpeechRecognizer.MAX_RESTARTS * 2)
+    recognizer = make_recognizer([])
+    recognizer.audio_in = SlowFailingAudioInput(errors + [SPEECH], clock,  # type: ignore[assignment]
+                                                SpeechRecognizer.HEALTHY_RUN_SECONDS + 1)
+    recognizer._threaded_recognition_loop()
+    assert recognizer.stt.accepted == [SPEECH]  # type: ignore[attr-defined]
+    assert recognizer.stt.utterance_id == SpeechRecognizer.MAX_RESTARTS * 2  # type: ignore[attr-defined]
+
+
+@pytest.mark.asyncio
+async def test_final_of_utterance_fired_from_partial_is_suppressed() -> None:
+    fired: List[str] = []
+    finals: List[str] = []
+
+    async def on_partial(event: PartialEvent) -> None:
+        # Как VoiceAssistant._process_partial_text: команда выполняется по стабильной гипотезе
+        if event.is_stable:
+            recognizer.consume_utterance(event.utterance_id)
+            fired.append(event.text)
+
+    async def on_final(event: STTResult) -> None:
+        finals.append(event.text)
+
+    stt = FakeSTT([PartialEvent("повто", 0), PartialEvent("повтори", 0, is_stable=True),
+                   PartialEvent("повтори", 0, is_stable=True), STTResult("повтори", 0),
+                   None, STTResult("выход", 1)])
+    recognizer = SpeechRecognizer(FakeAudioInput([SPEECH] * 6), stt, _ready,  # type: ignore[arg-type]
+                                on_final, _noop, partial_handler=on_partial)
+    recognizer.set_event_loop(asyncio.get_running_loop())
+    recognizer.is_running = True
+    await asyncio.to_thread(recognizer._recognition_pass)
+    await asyncio.sleep(0.05)  # Доставка событий, запланированных потоком распознавания
+
+    assert fired == ["повтори"]  # Повторная стабильная гипотеза той же фразы не доставляется
+    assert finals == ["выход"]   # Окончательный результат выполненной фразы подавлен, следующей - нет
+
+
+def test_consumed_utterance_resets_recognizer_once() -> None:
+    recognizer = make_recognizer([SPEECH, SPEECH])
+    recognizer.consume_utterance(0)
+    recognizer._recognition_pass()
+    assert recognizer.stt.utterance_id == 1  # type: ignore[attr-defined]
+
+
+def test_consumed_utterance_does_not_reset_next_one() -> None:
+    # Распознаватель уже перешел к следующей фразе (например, по эндпойнтеру): ее не сбрасываем
+    recognizer = make_recognizer([SPEECH])
+    recognizer.stt.utterance_id = 1  # type: ignore[attr-defined]
+    recognizer.consume_utterance(0)
+    recognizer._recognition_pass()
+    assert recognizer.stt.utterance_id == 1  # type: ignore[attr-defined]
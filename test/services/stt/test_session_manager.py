@@ -0,0 +1,158 @@
+import asyncio
+import json
+import threading
+from typing import List, Optional, Tuple
+
+import pytest
+
+from zumrad_iis.services import avosk_stt
+from zumrad_iis.services.avosk_stt import RecognitionMode
+from zumrad_iis.services.stt import session_manager
+from zumrad_iis.services.stt.recognition_events import RecognitionEvent, STTResult
+from zumrad_iis.services.stt.session_manager import SessionManager
+
+
+class FakeModel:
+    loads: List[str] = []
+
+    def __init__(self, model_path: str) -> None:
+        FakeModel.loads.append(model_path)
+
+
+class FakeRecognizer:
+    """Фраза - байты текста; порция, оканчивающаяся точкой, завершает ее."""
+    def __init__(self, model: FakeModel, sample_rate: int, grammar: Optional[str] = None) -> None:
+        self.model: FakeModel = model
+        self.buffer: bytes = b""
+
+    def SetWords(self, enabled: bool) -> None:
+        pass
+
+    def AcceptWaveform(self, data: bytes) -> bool:
+        self.buffer += data
+        return data.endswith(b".")
+
+    def Result(self) -> str:
+        text, self.buffer = self.buffer.decode().rstrip("."), b""
+        return json.dumps({"text": text})
+
+    def FinalResult(self) -> str:
+        return self.Result()
+
+    def Reset(self) -> None:
+        self.buffer = b""
+
+
+class FakeAudioInput:
+    """Источник блоков для attach_audio(): отдает заданные блоки, затем исчерпан."""
+    def __init__(self, blocks: List[bytes]) -> None:
+        self.blocks: List[bytes] = list(blocks)
+        self.is_capturing: bool = True
+        self.read_threads: List[str] = []
+
+    @property
+    def is_finished(self) -> bool:
+        return not self.blocks
+
+    def read_frame(self, timeout: Optional[float] = None) -> Optional[memoryview]:
+        self.read_threads.append(threading.current_thread().name)
+        return memoryview(self.blocks.pop(0)) if self.blocks else None
+
+
+@pytest.fixture(autouse=True)
+def fake_vosk(monkeypatch: pytest.MonkeyPatch) -> None:
+    FakeModel.loads = []
+    monkeypatch.setattr(session_manager, "Model", FakeModel)
+    monkeypatch.setattr(avosk_stt, "KaldiRecognizer", FakeRecognizer)
+
+
+class Collector:
+    def __init__(self) -> None:
+        self.events: List[Tuple[str, RecognitionEvent]] = []
+        self.received = asyncio.Event()
+
+    async def __call__(self, session_id: str, event: RecognitionEvent) -> None:
+        self.events.append((session_id, event))
+        self.received.set()
+
+
+@pytest.mark.asyncio
+async def test_model_is_loaded_once_for_all_sessions() -> None:
+    manager = SessionManager()
+    handler = Collector()
+    await asyncio.gather(manager.open_session("kitchen", "model", 16000, handler),
+                        manager.open_session("hall", "model", 16000, handler))
+    assert FakeModel.loads == ["model"]
+    assert manager.loaded_models == 1
+    kitchen, hall = manager.sessions["kitchen"], manager.sessions["hall"]
+    assert kitchen.stt.model is hall.stt.model
+    assert kitchen.stt.recognizer is not hall.stt.recognizer
+    await manager.close_session("kitchen")
+    assert manager.loaded_models == 1 # Модель еще нужна сессии "hall"
+    await manager.close()
+    assert manager.loaded_models == 0
+
+
+@pytest.mark.asyncio
+async def test_registered_model_is_not_loaded_again() -> None:
+    manager = SessionManager()
+    model = FakeModel("main")
+    manager.register_model("main", model)
+    session = await manager.open_session("kitchen", "main", 16000, Collector())
+    assert FakeModel.loads == ["main"] # Только загрузка выше, в тесте
+    assert session.stt.model is model
+    await manager.close()
+
+
+@pytest.mark.asyncio
+async def test_feed_keeps_sessions_independent() -> None:
+    manager = SessionManager()
+    handler = Collector()
+    await manager.open_session("kitchen", "model", 16000, handler)
+    await manager.open_session("hall", "model", 16000, handler)
+    await manager.feed("kitchen", "вы".encode())
+    await manager.feed("hall", b"time.")
+    await manager.feed("kitchen", "ход.".encode())
+    assert [(session_id, event.text) for session_id, event in handler.events] == \
+        [("hall", "time"), ("kitchen", "выход")]
+    assert all(isinstance(event, STTResult) for _, event in handler.events)
+    assert manager.sessions["kitchen"].results_count == 1
+    await manager.close()
+
+
+@pytest.mark.asyncio
+async def test_attached_audio_is_decoded_in_session_thread() -> None:
+    manager = SessionManager()
+    handler = Collector()
+    await manager.open_session("kitchen", "model", 16000, handler)
+    audio_input = FakeAudioInput([b"what ", b"time."])
+    manager.attach_audio("kitchen", audio_input) # type: ignore[arg-type]
+    await asyncio.wait_for(handler.received.wait(), 2.0)
+    assert [(session_id, event.text) for session_id, event in handler.events] == [("kitchen", "what time")]
+    # Блоки читаются потоком сессии напрямую, без цикла событий
+    assert set(audio_input.read_threads) == {"zumrad-session-kitchen"}
+    await manager.close()
+    assert not manager.sessions
+
+
+@pytest.mark.asyncio
+async def test_mode_is_applied_before_next_chunk() -> None:
+    manager = SessionManager()
+    session = await manager.open_session("kitchen", "model", 16000, Collector())
+    manager.set_mode_all(RecognitionMode.KEYWORD)
+    assert session.stt._is_listening_active is False
+    manager.set_mode("kitchen", RecognitionMode.FULL)
+    await manager.feed("kitchen", b"a")
+    assert session.stt._is_listening_active is True
+    await manager.close()
+
+
+@pytest.mark.asyncio
+async def test_session_errors() -> None:
+    manager = SessionManager()
+    await manager.open_session("kitchen", "model", 16000, Collector())
+    with pytest.raises(ValueError):
+        await manager.open_session("kitchen", "model", 16000, Collector())
+    with pytest.raises(KeyError):
+        await manager.feed("hall", b"a")
+    await manager.close()
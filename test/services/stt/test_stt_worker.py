@@ -0,0 +1,158 @@
+import multiprocessing
+import os
+import subprocess
+import sys
+import threading
+from multiprocessing.connection import Connection
+from typing import Any, Callable, List, Optional
+
+import pytest
+
+from zumrad_iis.services.avosk_stt import RecognitionMode
+from zumrad_iis.services.stt import stt_worker, stt_worker_entry
+from zumrad_iis.services.stt.recognition_events import RecognitionEvent, STTResult
+from zumrad_iis.services.stt.stt_worker import ProcessSTTService
+
+
+class FakeSTTService:
+    """STTService воркера: фраза - байты текста, порция с точкой в конце ее завершает."""
+    release = threading.Event() # Пока не установлено, декодирование порций стоит
+
+    def __init__(self, audio_input: Any = None, **kwargs: Any) -> None:
+        self.mode: str = RecognitionMode.FULL
+        self.utterance_id: int = 0
+        self.text: bytes = b""
+
+    async def initialize(self) -> None:
+        pass
+
+    def accept(self, audio_data: bytes) -> Optional[RecognitionEvent]:
+        FakeSTTService.release.wait(5.0)
+        self.text += audio_data
+        if not audio_data.endswith(b"."):
+            return None
+        text, self.text = self.text.decode().rstrip("."), b""
+        self.utterance_id += 1
+        return STTResult(text, self.utterance_id - 1)
+
+    def reset_utterance(self) -> None:
+        self.text = b""
+        self.utterance_id += 1
+
+    def set_mode(self, mode: str) -> None:
+        self.mode = mode
+
+
+class ThreadProcess:
+    """Процесс воркера в потоке тестового процесса."""
+    def __init__(self, target: Callable[..., None], args: tuple, name: str, daemon: bool) -> None:
+        self.pid: int = 0
+        # Родитель закрывает свою копию канала воркера после запуска, как при настоящем процессе
+        connection = Connection(os.dup(args[0].fileno()))
+        self._thread = threading.Thread(target=target, args=(connection, *args[1:]), name=name, daemon=True)
+
+    def start(self) -> None:
+        assert sys.modules["__main__"] is stt_worker_entry # Главный модуль подменен на время запуска
+        self._thread.start()
+
+    def join(self, timeout: Optional[float] = None) -> None:
+        self._thread.join(timeout)
+
+    def is_alive(self) -> bool:
+        return self._thread.is_alive()
+
+    def terminate(self) -> None:
+        pass
+
+
+class ThreadContext:
+    Pipe = staticmethod(multiprocessing.Pipe)
+    Process = ThreadProcess
+
+
+@pytest.fixture(autouse=True)
+def thread_worker(monkeypatch: pytest.MonkeyPatch) -> None:
+    FakeSTTService.release.set()
+    monkeypatch.setattr(stt_worker_entry, "STTService", FakeSTTService)
+    monkeypatch.setattr(stt_worker.multiprocessing, "get_context", lambda method: ThreadContext())
+
+
+async def start_service(slots: int = 2) -> ProcessSTTService:
+    stt = ProcessSTTService(model_path="model", sample_rate=1000, slots=slots, slot_seconds=0.01)
+    await stt.initialize()
+    return stt
+
+
+@pytest.mark.asyncio
+async def test_synchronous_calls_without_event_handler() -> None:
+    stt = await start_service()
+    main_module = sys.modules["__main__"]
+    assert stt.accept(b"what ") is None
+    result = stt.accept(b"time.")
+    assert isinstance(result, STTResult) and result.text == "what time"
+    assert stt.utterance_id == 1
+    assert sys.modules["__main__"] is main_module
+    stt.close()
+
+
+@pytest.mark.asyncio
+async def test_chunks_are_pipelined_up_to_slot_count() -> None:
+    stt = await start_service(slots=2)
+    events: List[RecognitionEvent] = []
+    delivered = threading.Event()
+
+    def on_event(event: RecognitionEvent) -> None:
+        events.append(event)
+        if len(events) == 2:
+            delivered.set()
+
+    stt.set_event_handler(on_event)
+    FakeSTTService.release.clear() # Воркер занят первой порцией
+    assert stt.accept(b"one.") is None
+    assert stt.accept(b"tw") is None # Вторая порция не ждет ответа на первую
+    # Третьей порции нужен слот первой: accept() ждет ответа воркера
+    third = threading.Thread(target=stt.accept, args=(b"o.",))
+    third.start()
+    third.join(0.2)
+    assert third.is_alive()
+    FakeSTTService.release.set()
+    third.join(2.0)
+    assert not third.is_alive()
+    assert delivered.wait(2.0)
+    assert [event.text for event in events] == ["one", "two"]
+    stt.close()
+
+
+@pytest.mark.asyncio
+async def test_reset_is_skipped_when_utterance_changed_in_flight() -> None:
+    stt = await start_service()
+    stt.accept(b"stale ")
+    stale_id: int = stt.utterance_id
+    stt.reset_utterance()             # Фраза та же: сбрасывается
+    stt.accept(b"new.")
+    stt.accept(b"keep ")
+    stt.utterance_id = stale_id       # Родитель еще не получил ответ о новой фразе
+    stt.reset_utterance()             # Новая фраза не сбрасывается
+    result = stt.accept(b"going.")
+    assert isinstance(result, STTResult) and result.text == "keep going"
+    stt.close()
+
+
+@pytest.mark.asyncio
+async def test_lost_worker_is_reported_to_next_call() -> None:
+    stt = await start_service()
+    stt.set_event_handler(lambda event: None)
+    assert stt._connection is not None
+    stt._connection.send((0, "stop"))  # Воркер завершается, канал закрывается
+    assert stt._reader is not None
+    stt._reader.join(2.0)
+    with pytest.raises(RuntimeError):
+        stt.accept(b"a")
+    stt.close()
+
+
+def test_worker_entry_does_not_import_audio_or_torch() -> None:
+    code = ("import sys, zumrad_iis.services.stt.stt_worker_entry; "
+            "print(sorted(m for m in ('sounddevice', 'torch', 'zumrad_iis.main') if m in sys.modules))")
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    assert output.strip() == "[]"
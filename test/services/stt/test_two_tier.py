@@ -0,0 +1,87 @@
+import json
+
+import pytest
+
+from zumrad_iis.services.avosk_stt import RecognitionMode, STTService
+from zumrad_iis.services.stt.recognition_events import PartialEvent, STTResult
+
+
+class KeywordRecognizer:
+    """Грамматика из ключевого слова: на любой речи промежуточная гипотеза - ключевое слово."""
+    def AcceptWaveform(self, data: bytes) -> bool:
+        return False
+
+    def PartialResult(self) -> str:
+        return json.dumps({"partial": "zumrad"})
+
+    def FinalResult(self) -> str:
+        return json.dumps({"text": "zumrad"})
+
+    def Reset(self) -> None:
+        pass
+
+
+class FullRecognizer:
+    """Фраза - байты текста; порция, оканчивающаяся точкой, завершает ее."""
+    def __init__(self) -> None:
+        self.buffer: bytes = b""
+
+    def AcceptWaveform(self, data: bytes) -> bool:
+        self.buffer += data
+        return data.endswith(b".")
+
+    def PartialResult(self) -> str:
+        return json.dumps({"partial": self.buffer.decode().strip()})
+
+    def Result(self) -> str:
+        text, self.buffer = self.buffer.decode().rstrip("."), b""
+        return json.dumps({"text": text})
+
+    def FinalResult(self) -> str:
+        return self.Result()
+
+    def Reset(self) -> None:
+        self.buffer = b""
+
+
+@pytest.fixture
+def stt() -> STTService:
+    service = STTService(model_path="", audio_input=None, sample_rate=16000,  # type: ignore[arg-type]
+                        keyword="zumrad", two_tier=True, emit_partials=True)
+    service._keyword_recognizer = KeywordRecognizer()  # type: ignore[assignment]
+    service._full_recognizer = FullRecognizer()  # type: ignore[assignment]
+    service.recognizer = service._full_recognizer
+    service.set_mode(RecognitionMode.KEYWORD)
+    return service
+
+
+def test_spurious_keyword_partial_returns_to_keyword_mode(stt: STTService) -> None:
+    event = stt.accept(b"hozir ")
+    assert isinstance(event, PartialEvent) and stt.mode == RecognitionMode.FULL
+    result = stt.accept(b"ham rad.")
+    assert isinstance(result, STTResult) and result.text == "hozir ham rad"
+    assert stt.mode == RecognitionMode.KEYWORD
+    assert stt.recognizer is stt._keyword_recognizer
+
+
+def test_keyword_in_final_result_keeps_full_mode(stt: STTService) -> None:
+    stt.accept(b"zumrad ")
+    result = stt.accept(b"soat necha.")
+    assert isinstance(result, STTResult) and result.text == "zumrad soat necha"
+    assert stt.mode == RecognitionMode.FULL # Ассистент активируется и сам задаст режим
+
+
+def test_mode_set_by_application_is_kept(stt: STTService) -> None:
+    stt.accept(b"zumrad ")
+    stt.accept(b"soat.")
+    stt.set_mode(RecognitionMode.FULL)    # Ассистент активирован
+    stt.accept(b"necha.")                 # Команда без ключевого слова
+    assert stt.mode == RecognitionMode.FULL
+
+
+def test_unactivated_result_after_keyword_returns_to_keyword_mode(stt: STTService) -> None:
+    # Ключевое слово было, но ассистент не активировался (например, низкая уверенность)
+    stt.accept(b"zumrad ")
+    stt.accept(b"soat.")
+    stt.accept(b"necha.")
+    assert stt.mode == RecognitionMode.KEYWORD
@@ -0,0 +1,77 @@
+import numpy as np
+
+from zumrad_iis.services.stt.voice_activity_detector import VoiceActivityDetector
+
+RATE: int = 16000
+BLOCK: int = RATE // 10 # 100 мс
+
+
+def tone(amplitude: float, frequency: float = 300.0, frames: int = BLOCK) -> bytes:
+    t = np.arange(frames) / RATE
+    return np.rint(amplitude * np.sin(2 * np.pi * frequency * t)).astype(np.int16).tobytes()
+
+
+SILENCE: bytes = bytes(2 * BLOCK)
+SPEECH: bytes = tone(8000)
+
+
+def test_silence_is_skipped_and_preroll_precedes_speech() -> None:
+    vad = VoiceActivityDetector(RATE, preroll_ms=300)
+    quiet = [tone(10, frames=BLOCK) for _ in range(5)]
+    assert all(vad.process(block) == () for block in quiet)
+    chunks = vad.process(SPEECH)
+    assert len(chunks) == 2 and chunks[1] is SPEECH
+    assert chunks[0] == b"".join(quiet)[-2 * RATE * 300 // 1000:] # Последние 300 мс тишины
+    assert vad.is_speech
+    assert vad.silence_blocks == 5 and vad.speech_blocks == 1
+
+
+def test_hangover_passes_trailing_silence() -> None:
+    vad = VoiceActivityDetector(RATE, hangover_ms=300)
+    vad.process(SPEECH)
+    assert [vad.process(SILENCE) for _ in range(4)] == [(SILENCE,), (SILENCE,), (SILENCE,), ()]
+    assert not vad.is_speech
+    # Речь во время хвоста продлевает его
+    vad.process(SPEECH)
+    vad.process(SILENCE)
+    vad.process(SPEECH)
+    assert [len(vad.process(SILENCE)) for _ in range(4)] == [1, 1, 1, 0]
+
+
+def test_preroll_is_not_repeated() -> None:
+    vad = VoiceActivityDetector(RATE, hangover_ms=100)
+    vad.process(SILENCE)
+    assert len(vad.process(SPEECH)) == 2
+    assert vad.process(SILENCE) == (SILENCE,)          # Хвост речи уже передан
+    quiet = tone(10)
+    vad.process(quiet)
+    assert vad.process(SPEECH) == (quiet, SPEECH)      # Пре-ролл - только тишина после хвоста
+    vad.reset()
+    assert vad.process(SPEECH) == (SPEECH,)
+
+
+def test_noise_floor_adapts_to_steady_hum() -> None:
+    vad = VoiceActivityDetector(RATE)
+    hum = np.frombuffer(tone(1000, frequency=100), dtype=np.int16) # ~-33 dBFS, выше порога -45 dBFS
+    assert vad.classify(hum)
+    for _ in range(200):
+        vad.classify(hum)
+    assert not vad.classify(hum)          # Фон поднял порог
+    assert vad.classify(np.frombuffer(SPEECH, dtype=np.int16))
+    # Фон опускается быстро, когда шум стихает
+    for _ in range(10):
+        vad.classify(np.frombuffer(tone(100, frequency=100), dtype=np.int16))
+    assert vad.classify(hum)
+
+
+def test_broadband_noise_is_rejected_by_zcr() -> None:
+    vad = VoiceActivityDetector(RATE)
+    noise = np.random.default_rng(0).normal(0, 3000, BLOCK).astype(np.int16)
+    assert not vad.classify(noise)
+
+
+def test_stereo_channels_are_averaged() -> None:
+    vad = VoiceActivityDetector(RATE, channels=2)
+    mono = np.frombuffer(SPEECH, dtype=np.int16)
+    assert vad.classify(np.column_stack((mono, mono)).reshape(-1))
+    assert not vad.classify(np.column_stack((mono, -mono)).reshape(-1)) # Противофаза гасится
@@ -0,0 +1,163 @@
+from typing import Any, Dict, List, Optional
+
+import pytest
+
+from zumrad_iis.services import audio_device_registry, audio_input_service
+from zumrad_iis.services.audio_device_registry import AudioDeviceRegistry
+from zumrad_iis.services.audio_input_service import AudioInputService
+
+
+class FakeStream:
+    def __init__(self, portaudio: "FakePortAudio", device: Optional[int], **kwargs: Any) -> None:
+        self.device: Optional[int] = device
+        self.active: bool = False
+        self.closed: bool = False
+        portaudio.streams.append(self)
+
+    def start(self) -> None:
+        self.active = True
+
+    def stop(self) -> None:
+        self.active = False
+
+    def close(self) -> None:
+        self.closed = True
+
+
+class FakePortAudio:
+    """sounddevice: список устройств виден только после переинициализации, как в PortAudio."""
+    def __init__(self, names: List[str]) -> None:
+        self.connected: List[str] = list(names)  # Что подключено физически
+        self.visible: List[str] = list(names)    # Что видит PortAudio
+        self.streams: List[FakeStream] = []
+        self.failures: int = 0                   # Сколько следующих открытий потока завершатся ошибкой
+        self.attempts: List[Optional[int]] = []
+
+    def query_devices(self, kind: Optional[str] = None) -> Any:
+        devices: List[Dict[str, Any]] = [{"name": name, "max_input_channels": 1, "default_samplerate": 1000.0}
+                                        for name in self.visible]
+        if kind == "input":
+            return {**devices[0], "index": 0} if devices else {"index": -1}
+        return devices
+
+    def _terminate(self) -> None:
+        pass
+
+    def _initialize(self) -> None:
+        self.visible = list(self.connected)
+
+    def RawInputStream(self, device: Optional[int] = None, **kwargs: Any) -> FakeStream:
+        self.attempts.append(device)
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("Error opening RawInputStream")
+        if device is not None and self.visible[device] not in self.connected:
+            raise RuntimeError("Device unavailable")
+        return FakeStream(self, device, **kwargs)
+
+    def unplug(self, name: str) -> None:
+        self.connected.remove(name)
+        for stream in self.streams:
+            if stream.device is not None and self.visible[stream.device] == name:
+                stream.active = False # Поток устройства останавливается сам
+
+    def plug(self, name: str) -> None:
+        self.connected.append(name)
+
+
+@pytest.fixture
+def portaudio(monkeypatch: pytest.MonkeyPatch) -> FakePortAudio:
+    fake = FakePortAudio(["USB Mic", "Built-in Mic"])
+    monkeypatch.setattr(audio_device_registry, "sd", fake)
+    monkeypatch.setattr(audio_input_service, "sd", fake)
+    return fake
+
+
+def start_service(fallback_device_id: Optional[int] = 1) -> AudioInputService:
+    service = AudioInputService(1000, 10, 0, 1, fallback_device_id=fallback_device_id,
+                                watch_devices=False, stall_timeout=0.5)
+    service.start_capture()
+    return service
+
+
+def current_device(service: AudioInputService) -> Optional[str]:
+    return service.device_registry.name_of(service._current_device_id)
+
+
+def test_open_streams_are_counted(portaudio: FakePortAudio) -> None:
+    service = start_service()
+    registry: AudioDeviceRegistry = service.device_registry
+    assert registry._open_streams == 1
+    service.reselect_device()          # Пересоздание потока не меняет счетчик
+    assert registry._open_streams == 1
+    with registry.stream():            # Воспроизведение речи
+        assert registry._open_streams == 2
+    service.stop_capture()
+    assert registry._open_streams == 0
+
+
+def test_rescan_is_skipped_while_a_stream_is_open(portaudio: FakePortAudio) -> None:
+    registry = AudioDeviceRegistry()
+    registry.devices()
+    portaudio.plug("Headset")
+    with registry.stream():
+        registry.refresh(rescan=True)
+    assert registry.find_input("Headset") is None and registry.rescans == 0
+    assert registry.refresh(rescan=True)
+    assert registry.find_input("Headset") == 2 and registry.rescans == 1
+
+
+def test_stalled_stream_is_restarted(portaudio: FakePortAudio) -> None:
+    service = start_service()
+    first: FakeStream = portaudio.streams[0]
+    service._on_devices_polled(False)
+    assert len(portaudio.streams) == 1 # Колбэки приходят: поток жив
+    service._last_callback_at -= 1.0
+    service._on_devices_polled(False)
+    assert first.closed and len(portaudio.streams) == 2 and portaudio.streams[1].active
+    service.stop_capture()
+
+
+def test_unplugged_device_fails_over_to_fallback(portaudio: FakePortAudio) -> None:
+    service = start_service()
+    portaudio.unplug("USB Mic")
+    service._on_devices_polled(False)
+    assert current_device(service) == "Built-in Mic"
+    assert service._is_on_fallback
+    # Без автоматического возврата: основное устройство - только через reselect_device()
+    portaudio.plug("USB Mic")
+    service._on_devices_polled(False)
+    assert current_device(service) == "Built-in Mic"
+    service.reselect_device()
+    assert current_device(service) == "USB Mic" and not service._is_on_fallback
+    service.stop_capture()
+
+
+def test_stale_device_list_does_not_select_lost_device(portaudio: FakePortAudio) -> None:
+    service = start_service(fallback_device_id=None)
+    with service.device_registry.stream(): # Идет воспроизведение: список не пересканируется
+        portaudio.unplug("USB Mic")
+        service._on_devices_polled(False)
+        assert portaudio.visible[0] == "USB Mic" # Кэш все еще содержит пропавшее устройство
+        assert current_device(service) == "Built-in Mic"
+        assert service._stream is not None
+    service.stop_capture()
+
+
+def test_failed_reopen_is_retried_on_next_poll(portaudio: FakePortAudio) -> None:
+    service = start_service()
+    portaudio.unplug("USB Mic")
+    portaudio.failures = 1
+    service._on_devices_polled(False)
+    assert service._stream is None and service.is_capturing
+    portaudio.plug("USB Mic")
+    service._on_devices_polled(False)
+    assert service._stream is not None and service._stream.active
+    # Переинициализация показала, что основное устройство снова есть
+    assert current_device(service) == "USB Mic"
+    attempts: int = len(portaudio.attempts)
+    service._on_devices_polled(False)
+    assert len(portaudio.attempts) == attempts # Рабочий поток не пересоздается
+    service.stop_capture()
+    service._on_devices_polled(False)
+    assert len(portaudio.attempts) == attempts # После остановки захвата попыток нет
@@ -0,0 +1,77 @@
+import numpy as np
+
+from zumrad_iis.services.audio_history_buffer import AudioHistoryBuffer
+
+
+def make_history(capacity_frames: int) -> AudioHistoryBuffer:
+    # 1000 Гц: 1 мс истории - один кадр
+    return AudioHistoryBuffer(samplerate=1000, channels=1, duration_ms=capacity_frames)
+
+
+def write_frames(history: AudioHistoryBuffer, start: int, count: int, timestamp: float = 0.0) -> None:
+    history.write(np.arange(start, start + count, dtype=np.int16), timestamp)
+
+
+def read_all(history: AudioHistoryBuffer, *args, **kwargs) -> list:
+    return [int(x) for chunk in history.read(*args, **kwargs) for x in chunk]
+
+
+def test_read_from_start_frame() -> None:
+    history = make_history(100)
+    write_frames(history, 0, 30)
+    assert history.written_frames == 30
+    assert read_all(history, 10) == list(range(10, 30))
+
+
+def test_read_after_wraparound_clamps_to_oldest_frame() -> None:
+    history = make_history(16)
+    for start in range(0, 40, 8):
+        write_frames(history, start, 8)
+    assert history.oldest_frame == 24
+    # Кадры до oldest_frame уже перезаписаны
+    assert read_all(history, 0) == list(range(24, 40))
+    assert read_all(history, 30) == list(range(30, 40))
+
+
+def test_block_longer_than_history_keeps_its_tail() -> None:
+    history = make_history(10)
+    write_frames(history, 0, 25)
+    assert history.written_frames == 25
+    assert read_all(history, 0) == list(range(15, 25))
+
+
+def test_read_in_chunks_does_not_cross_buffer_end() -> None:
+    history = make_history(16)
+    write_frames(history, 0, 12)
+    write_frames(history, 12, 8)  # Переход через конец массива
+    chunks = list(history.read(6, chunk_frames=5))
+    assert all(len(chunk) <= 5 for chunk in chunks)
+    assert [int(x) for chunk in chunks for x in chunk] == list(range(6, 20))
+
+
+def test_read_skips_interval() -> None:
+    history = make_history(100)
+    write_frames(history, 0, 50)
+    assert read_all(history, 10, skip=(20, 30)) == list(range(10, 20)) + list(range(30, 50))
+    # Интервал, начинающийся раньше start_frame
+    assert read_all(history, 25, skip=(20, 30)) == list(range(30, 50))
+
+
+def test_read_stops_at_end_frame() -> None:
+    history = make_history(100)
+    write_frames(history, 0, 50)
+    assert read_all(history, 10, end_frame=18) == list(range(10, 18))
+    assert read_all(history, 10, end_frame=500) == list(range(10, 50))
+    assert read_all(history, 10, skip=(15, 40), end_frame=20) == list(range(10, 15))
+
+
+def test_frame_at_converts_time_to_frame() -> None:
+    history = make_history(100)
+    write_frames(history, 0, 40, timestamp=10.0)
+    write_frames(history, 40, 40, timestamp=10.04)
+    assert history.frame_at(10.04) == 80
+    assert history.frame_at(10.0) == 40
+    assert history.frame_at(10.03) == 70
+    # Время вне истории ограничивается ее границами
+    assert history.frame_at(100.0) == 80
+    assert history.frame_at(0.0) == history.oldest_frame
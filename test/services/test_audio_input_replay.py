@@ -0,0 +1,96 @@
+from typing import List
+
+import numpy as np
+
+from zumrad_iis.services.audio_input_service import AudioInputService
+
+BLOCK: int = 4
+
+
+def make_service(capacity: int) -> AudioInputService:
+    return AudioInputService(samplerate=1000, blocksize=BLOCK, device_id=None, channels=1,
+                            buffer_capacity=capacity, history_ms=1000, watch_devices=False)
+
+
+class Feeder:
+    """Подает в колбэк захвата блоки с последовательными номерами кадров."""
+    def __init__(self, service: AudioInputService) -> None:
+        self.service: AudioInputService = service
+        self.next_frame: int = 0
+
+    def feed(self, blocks: int = 1) -> None:
+        for _ in range(blocks):
+            block = np.arange(self.next_frame, self.next_frame + BLOCK, dtype=np.int16)
+            self.service._consume_audio_data_callback(block, BLOCK, None, None)
+            self.next_frame += BLOCK
+
+
+def drain(service: AudioInputService) -> List[int]:
+    frames: List[int] = []
+    while (data := service.audio_buffer.read_nowait()) is not None:
+        frames.extend(int(x) for x in np.frombuffer(data, dtype=np.int16))
+    return frames
+
+
+def test_replay_keeps_queued_audio_without_gaps_or_duplicates() -> None:
+    service = make_service(capacity=3)
+    feeder = Feeder(service)
+    feeder.feed(3)
+    # Потребитель успел прочитать только первый блок
+    received: List[int] = [int(x) for x in np.frombuffer(service.audio_buffer.read_nowait(), dtype=np.int16)]
+
+    service.pause_capture()   # Два непрочитанных блока отбрасываются из буфера
+    feeder.feed(4)            # Речь во время паузы
+    assert len(service.audio_buffer) == 0
+    service.resume_capture(replay=True)
+    for _ in range(6):
+        feeder.feed()
+        received.extend(drain(service))
+    assert received == list(range(feeder.next_frame))
+
+
+def test_replay_is_pushed_in_chunks_that_fit_the_buffer() -> None:
+    service = make_service(capacity=2)
+    feeder = Feeder(service)
+    service.pause_capture()
+    feeder.feed(10)
+    service.resume_capture(replay=True)
+    received: List[int] = []
+    for _ in range(12):
+        feeder.feed()
+        # За колбэк пишется не больше свободных слотов: ничего не теряется
+        assert service.audio_buffer.dropped_blocks == 0
+        received.extend(drain(service))
+    assert received == list(range(feeder.next_frame))
+    assert service._replay is None
+
+
+def test_resume_without_replay_drops_paused_audio() -> None:
+    service = make_service(capacity=4)
+    feeder = Feeder(service)
+    feeder.feed(2)
+    received: List[int] = drain(service)
+    service.pause_capture()
+    feeder.feed(3)
+    service.resume_capture()
+    feeder.feed(2)
+    received.extend(drain(service))
+    assert received == list(range(2 * BLOCK)) + list(range(5 * BLOCK, 7 * BLOCK))
+
+
+def test_pause_during_replay_resumes_from_undelivered_audio() -> None:
+    service = make_service(capacity=2)
+    feeder = Feeder(service)
+    service.pause_capture()
+    feeder.feed(6)
+    service.resume_capture(replay=True)
+    feeder.feed()             # Повтор успевает подать только два блока
+    received: List[int] = drain(service)
+    assert service._replay is not None
+    service.pause_capture()
+    feeder.feed(2)
+    service.resume_capture(replay=True)
+    for _ in range(8):
+        feeder.feed()
+        received.extend(drain(service))
+    assert received == list(range(feeder.next_frame))
@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+from zumrad_iis.services.audio_resampler import PolyphaseResampler
+
+
+def tone(frequency: float, rate: int, seconds: float = 1.0, amplitude: float = 10000.0) -> np.ndarray:
+    t = np.arange(int(rate * seconds)) / rate
+    return np.rint(amplitude * np.sin(2 * np.pi * frequency * t)).astype(np.int16)
+
+
+def resample_in_blocks(resampler: PolyphaseResampler, signal: np.ndarray, block_frames: int) -> np.ndarray:
+    parts = [resampler.process(signal[i:i + block_frames].tobytes()) for i in range(0, len(signal), block_frames)]
+    return np.concatenate(parts)
+
+
+@pytest.mark.parametrize("in_rate", [48000, 44100, 8000])
+def test_output_length_follows_rate_ratio(in_rate: int) -> None:
+    resampler = PolyphaseResampler(in_rate, 16000)
+    output = resample_in_blocks(resampler, tone(440, in_rate), in_rate // 50)
+    assert abs(len(output) - 16000) <= 1
+    for frames in (1, 7, in_rate // 50):
+        assert len(resampler.process(np.zeros(frames, dtype=np.int16).tobytes())) <= resampler.output_frames(frames)
+
+
+def test_tone_is_preserved_across_block_boundaries() -> None:
+    output = resample_in_blocks(PolyphaseResampler(48000, 16000), tone(1000, 48000), 960)
+    steady = output[200:200 + 15000].astype(np.float64)   # Без переходного процесса фильтра
+    spectrum = np.abs(np.fft.rfft(steady))
+    assert np.fft.rfftfreq(len(steady), 1 / 16000)[spectrum.argmax()] == pytest.approx(1000, abs=2)
+    # Амплитуда сохраняется, разрывов на границах блоков нет
+    assert np.sqrt(2 * np.mean(steady ** 2)) == pytest.approx(10000, rel=0.02)
+    assert np.abs(np.diff(steady)).max() < 2 * np.pi * 1000 / 16000 * 10000 * 1.05
+
+
+def test_block_size_does_not_change_result() -> None:
+    signal = tone(700, 44100, 0.2)
+    whole = PolyphaseResampler(44100, 16000).process(signal.tobytes())
+    blocks = resample_in_blocks(PolyphaseResampler(44100, 16000), signal, 333)
+    assert np.array_equal(whole, blocks)
+
+
+def test_frequencies_above_new_nyquist_are_suppressed() -> None:
+    output = resample_in_blocks(PolyphaseResampler(48000, 16000), tone(12000, 48000), 960)
+    assert np.abs(output[200:].astype(np.int32)).max() < 0.01 * 10000
+
+
+def test_stereo_channels_are_independent() -> None:
+    left, right = tone(500, 48000, 0.1), np.zeros(4800, dtype=np.int16)
+    interleaved = np.column_stack((left, right)).reshape(-1)
+    output = PolyphaseResampler(48000, 16000, channels=2).process(interleaved.tobytes()).reshape(-1, 2)
+    assert np.abs(output[:, 0]).max() > 5000
+    assert not output[:, 1].any()
+
+
+def test_reset_clears_history() -> None:
+    resampler = PolyphaseResampler(48000, 16000)
+    resampler.process(tone(440, 48000, 0.01).tobytes())
+    resampler.reset()
+    assert not resampler.process(np.zeros(480, dtype=np.int16).tobytes()).any()
+
+
+def test_invalid_rates() -> None:
+    with pytest.raises(ValueError):
+        PolyphaseResampler(0, 16000)
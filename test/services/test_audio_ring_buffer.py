@@ -0,0 +1,88 @@
+import threading
+
+import numpy as np
+import pytest
+
+from zumrad_iis.services.audio_ring_buffer import AudioRingBuffer, OverflowPolicy
+
+
+def block(value: int, samples: int = 4) -> bytes:
+    return np.full(samples, value, dtype=np.int16).tobytes()
+
+
+def read_values(buffer: AudioRingBuffer) -> list:
+    values = []
+    while (data := buffer.read_nowait()) is not None:
+        values.append(int(np.frombuffer(data, dtype=np.int16)[0]))
+    return values
+
+
+def test_drop_oldest_keeps_newest_blocks() -> None:
+    buffer = AudioRingBuffer(2, 4, overflow_policy=OverflowPolicy.DROP_OLDEST)
+    assert all(buffer.write(block(value)) for value in (1, 2, 3))
+    assert read_values(buffer) == [2, 3]
+    assert buffer.stats()["dropped_blocks"] == 1
+    assert buffer.dropped_frames == 4
+    assert buffer.high_water_mark == 2
+
+
+def test_drop_newest_rejects_incoming_block() -> None:
+    buffer = AudioRingBuffer(2, 4, overflow_policy=OverflowPolicy.DROP_NEWEST)
+    assert buffer.write(block(1)) and buffer.write(block(2))
+    assert not buffer.write(block(3))
+    assert read_values(buffer) == [1, 2]
+    assert buffer.dropped_blocks == 1
+
+
+def test_block_waits_for_reader() -> None:
+    buffer = AudioRingBuffer(1, 4, overflow_policy=OverflowPolicy.BLOCK, block_timeout=5.0)
+    buffer.write(block(1))
+    writer = threading.Thread(target=buffer.write, args=(block(2),))
+    writer.start()
+    writer.join(0.1)
+    assert writer.is_alive() # Места нет: писатель ждет
+    assert read_values(buffer)[0] == 1
+    writer.join(2.0)
+    assert not writer.is_alive()
+    assert read_values(buffer) == [2]
+    assert buffer.dropped_blocks == 0
+
+
+def test_block_drops_after_timeout() -> None:
+    buffer = AudioRingBuffer(1, 4, overflow_policy=OverflowPolicy.BLOCK, block_timeout=0.05)
+    buffer.write(block(1))
+    assert not buffer.write(block(2))
+    assert buffer.dropped_blocks == 1
+
+
+def test_reader_slot_is_not_overwritten() -> None:
+    buffer = AudioRingBuffer(1, 4, overflow_policy=OverflowPolicy.DROP_OLDEST)
+    buffer.write(block(1))
+    held = buffer.read_nowait()
+    buffer.write(block(2))
+    buffer.write(block(3))                 # Вытесняет блок 2, но не слот читателя
+    assert np.frombuffer(held, dtype=np.int16)[0] == 1
+    assert read_values(buffer) == [3]
+
+
+def test_clear_and_truncation_are_accounted() -> None:
+    buffer = AudioRingBuffer(4, 4, channels=2)
+    buffer.write(block(1))
+    buffer.write(block(2, samples=6))      # Больше слота: обрезается
+    assert buffer.truncated == 1
+    assert buffer.clear() == 2
+    assert buffer.cleared_frames == 4      # 2 блока по 4 семпла, 2 канала
+    assert len(buffer) == 0 and buffer.read_nowait() is None
+
+
+def test_partial_block_length() -> None:
+    buffer = AudioRingBuffer(2, 4)
+    buffer.write(block(7, samples=3))
+    assert len(buffer.read_nowait()) == 6
+
+
+def test_invalid_arguments() -> None:
+    with pytest.raises(ValueError):
+        AudioRingBuffer(0, 4)
+    with pytest.raises(ValueError):
+        AudioRingBuffer(2, 4, overflow_policy="drop_all")
@@ -0,0 +1,92 @@
+import asyncio
+import threading
+
+import pytest
+
+from zumrad_iis.services.executor_registry import ExecutorPool, ExecutorRegistry, run_blocking
+
+
+@pytest.mark.asyncio
+async def test_run_returns_result_and_counts_metrics() -> None:
+    pool = ExecutorPool("test", 2)
+    assert await pool.run(lambda a, b: a + b, 2, 3) == 5
+    stats = pool.stats()
+    assert stats["completed"] == 1 and stats["queued"] == 0 and stats["active"] == 0
+    assert threading.current_thread().name != "zumrad-test"
+    assert (await pool.run(lambda: threading.current_thread().name)).startswith("zumrad-test")
+    pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_exception_is_propagated_and_counted() -> None:
+    pool = ExecutorPool("test", 1)
+    with pytest.raises(ValueError):
+        await pool.run(int, "not a number")
+    assert pool.stats()["completed"] == 1 and pool.active == 0
+    pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_queue_depth_is_tracked() -> None:
+    pool = ExecutorPool("test", 1)
+    release = threading.Event()
+    first = asyncio.ensure_future(pool.run(release.wait, 5.0))
+    second = asyncio.ensure_future(pool.run(lambda: 2))
+    await asyncio.sleep(0.05)
+    assert pool.active == 1 and pool.queued == 1
+    release.set()
+    assert await second == 2 and await first
+    assert pool.max_queued >= 1 and pool.queued == 0 and pool.completed == 2
+    pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_removes_queued_job() -> None:
+    pool = ExecutorPool("test", 1)
+    release = threading.Event()
+    ran = threading.Event()
+    busy = asyncio.ensure_future(pool.run(release.wait, 5.0))
+    queued = asyncio.ensure_future(pool.run(ran.set))
+    await asyncio.sleep(0.05)
+    queued.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await queued
+    release.set()
+    await busy
+    await pool.run(lambda: None)
+    assert not ran.is_set() # Отмененная задача не выполнялась
+    stats = pool.stats()
+    assert stats["queued"] == 0 and stats["cancelled"] == 1 and stats["completed"] == 2
+    pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_shutdown_without_wait_cancels_queued_jobs() -> None:
+    pool = ExecutorPool("test", 1)
+    release = threading.Event()
+    busy = asyncio.ensure_future(pool.run(release.wait, 5.0))
+    queued = [asyncio.ensure_future(pool.run(lambda: None)) for _ in range(3)]
+    await asyncio.sleep(0.05)
+    pool.shutdown(wait=False)
+    release.set()
+    await busy
+    results = await asyncio.gather(*queued, return_exceptions=True)
+    assert all(isinstance(result, asyncio.CancelledError) for result in results)
+    assert pool.queued == 0 and pool.cancelled == 3
+    with pytest.raises(RuntimeError):
+        await pool.run(lambda: None) # Остановленный пул задач не принимает
+    assert pool.queued == 0
+
+
+@pytest.mark.asyncio
+async def test_registry_pools() -> None:
+    registry = ExecutorRegistry({ExecutorRegistry.DECODING: 3})
+    assert registry.get(ExecutorRegistry.DECODING) is registry.get(ExecutorRegistry.DECODING)
+    assert registry.get(ExecutorRegistry.DECODING).max_workers == 3
+    assert registry.get(ExecutorRegistry.AUDIO_IO).max_workers == ExecutorRegistry.DEFAULT_SIZES["audio_io"]
+    assert registry.get("unknown").max_workers == 1
+    assert await run_blocking(registry, ExecutorRegistry.COMPUTE, sum, [1, 2]) == 3
+    assert registry.get(ExecutorRegistry.COMPUTE).completed == 1
+    registry.log_stats()
+    registry.shutdown()
+    assert await run_blocking(None, ExecutorRegistry.COMPUTE, sum, [1, 2]) == 3 # Без реестра
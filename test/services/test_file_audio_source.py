@@ -0,0 +1,74 @@
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, List
+
+import pytest
+
+from zumrad_iis.services.audio_ring_buffer import OverflowPolicy
+from zumrad_iis.services.audio_input_service import AudioInputService
+from zumrad_iis.services.audio_sources import FileAudioSource
+
+
+def make_source(path: Path, blocks: List[bytes], finished: threading.Event) -> FileAudioSource:
+    return FileAudioSource(str(path), samplerate=1000, blocksize=4, channels=1,
+                        callback=lambda data, frames, time_info, status: blocks.append(bytes(data)),
+                        finished_callback=finished.set, realtime=False)
+
+
+def test_raw_file_is_read_in_blocks(tmp_path: Path) -> None:
+    path = tmp_path / "audio.raw"
+    path.write_bytes(bytes(range(20)))
+    blocks: List[bytes] = []
+    finished = threading.Event()
+    source = make_source(path, blocks, finished)
+    source.start()
+    assert finished.wait(2.0)
+    source.stop()
+    assert blocks == [bytes(range(0, 8)), bytes(range(8, 16)), bytes(range(16, 20))]
+
+
+@pytest.mark.skipif(not hasattr(os, "mkfifo"), reason="нужны именованные каналы")
+def test_stop_does_not_hang_on_idle_fifo(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(FileAudioSource, "JOIN_TIMEOUT", 0.2)
+    path = tmp_path / "audio.fifo"
+    os.mkfifo(path)
+    blocks: List[bytes] = []
+    finished = threading.Event()
+    source = make_source(path, blocks, finished)
+    source.start()
+    writer: int = os.open(path, os.O_WRONLY) # Поток чтения открыл канал
+    try:
+        os.write(writer, bytes(6))           # Неполный блок: чтение ждет остальное
+        time.sleep(0.05)
+        started: float = time.monotonic()
+        source.stop()
+        assert time.monotonic() - started < 1.0
+        assert not finished.is_set()         # Остановка - не конец данных
+    finally:
+        os.close(writer)
+
+
+@pytest.mark.skipif(not hasattr(os, "mkfifo"), reason="нужны именованные каналы")
+def test_stop_does_not_hang_without_fifo_writer(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(FileAudioSource, "JOIN_TIMEOUT", 0.2)
+    path = tmp_path / "audio.fifo"
+    os.mkfifo(path)
+    source = make_source(path, [], threading.Event())
+    source.start()                           # open() ждет писателя
+    started: float = time.monotonic()
+    source.stop()
+    assert time.monotonic() - started < 1.0
+    os.close(os.open(path, os.O_WRONLY | os.O_NONBLOCK)) # Отпускаем фоновый поток
+
+
+@pytest.mark.parametrize("realtime, policy, expected", [
+    (False, OverflowPolicy.DROP_OLDEST, OverflowPolicy.BLOCK),
+    (False, OverflowPolicy.DROP_NEWEST, OverflowPolicy.BLOCK),
+    (True, OverflowPolicy.DROP_OLDEST, OverflowPolicy.DROP_OLDEST),
+])
+def test_fast_file_source_forces_block_policy(realtime: bool, policy: str, expected: str) -> None:
+    service: Any = AudioInputService(1000, 4, None, 1, source=AudioInputService.SOURCE_FILE,
+                                    source_path="audio.raw", source_realtime=realtime, overflow_policy=policy)
+    assert service.audio_buffer.overflow_policy == expected
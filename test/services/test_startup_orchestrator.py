@@ -0,0 +1,58 @@
+import asyncio
+import logging
+
+import pytest
+
+from zumrad_iis.services.startup_orchestrator import StartupOrchestrator
+
+
+@pytest.mark.asyncio
+async def test_wait_returns_before_slower_components() -> None:
+    startup = StartupOrchestrator()
+    tts_loaded = asyncio.Event()
+
+    async def load_tts() -> None:
+        await tts_loaded.wait()
+
+    async def load_stt() -> str:
+        return "stt"
+
+    startup.add("stt", load_stt)
+    startup.add("tts", load_tts)
+    startup.start()
+    assert await startup.wait_required("stt") == "stt"
+    tts_loaded.set()
+    assert await startup.wait_all() == {"stt": None, "tts": None}
+    assert set(startup.timings) == {"stt", "tts"}
+
+
+@pytest.mark.asyncio
+async def test_failed_required_component_cancels_others_and_reports(caplog: pytest.LogCaptureFixture) -> None:
+    startup = StartupOrchestrator()
+    tts_cancelled = asyncio.Event()
+
+    async def load_tts() -> None:
+        try:
+            await asyncio.sleep(60)
+        except asyncio.CancelledError:
+            tts_cancelled.set()
+            raise
+
+    async def load_stt() -> None:
+        raise RuntimeError("no model")
+
+    startup.add("stt", load_stt)
+    startup.add("tts", load_tts)
+    startup.start()
+    with caplog.at_level(logging.INFO), pytest.raises(RuntimeError, match="no model"):
+        await startup.wait_required("stt")
+    assert tts_cancelled.is_set()
+    assert all(task.done() for task in startup._tasks.values()) # Висящих загрузок не осталось
+    assert "Загрузка 'tts' отменена" in caplog.text
+    assert "Запуск за" in caplog.text
+
+
+def test_unknown_dependency_is_rejected() -> None:
+    startup = StartupOrchestrator()
+    with pytest.raises(ValueError):
+        startup.add("tts", lambda: asyncio.sleep(0), depends_on=["stt"])
@@ -0,0 +1,60 @@
+import pytest
+
+from zumrad_iis.commands.text_canonicalizer import TextCanonicalizer
+from zumrad_iis.services.activation_service import ActivationService
+from zumrad_iis.services.wake_word_matcher import WakeWordMatcher
+
+
+@pytest.mark.parametrize("keyword, text, remainder", [
+    ("zumrad", "zumrad soat necha", "soat necha"),
+    ("zumrad", "zum rad soat necha", "soat necha"),      # Ключевое слово разбито на два токена
+    ("zumrad", "zumrat", ""),                             # Звонкая/глухая согласная
+    ("zumrad", "zumrid soat necha", "soat necha"),        # Одна правка, в начале фразы
+    ("zumrad", "salom zumrad qalaysan", "qalaysan"),      # Точное совпадение не в начале
+    ("изумруд", "изумрут включи свет", "включи свет"),
+    ("изумруд", "из умруд привет", "привет"),
+    ("изумруд", "ну изумруд который час", "который час"),
+])
+def test_keyword_variants_match(keyword: str, text: str, remainder: str) -> None:
+    match = WakeWordMatcher(keyword).match(text)
+    assert match is not None
+    assert match.remainder == remainder
+
+
+@pytest.mark.parametrize("keyword, text", [
+    ("zumrad", "summa qancha"),
+    ("zumrad", "sumka qayerda"),
+    ("zumrad", "hozir ham rad etdi"),
+    ("zumrad", "rad"),
+    ("zumrad", "salom zumrid"),                           # Неточное совпадение не в начале фразы
+    ("изумруд", "включи свет"),
+    ("изумруд", "изумрудный город"),
+])
+def test_ordinary_speech_does_not_match(keyword: str, text: str) -> None:
+    assert WakeWordMatcher(keyword).match(text) is None
+
+
+def test_score_threshold() -> None:
+    assert WakeWordMatcher("zumrad").match("zumrid").score == pytest.approx(5 / 6)
+    assert WakeWordMatcher("zumrad", min_score=0.9).match("zumrid") is None
+    assert WakeWordMatcher("zumrad", min_score=0.9).match("zumrad").score == 1.0
+
+
+def test_normalize_is_shared_by_scripts() -> None:
+    assert WakeWordMatcher.normalize("зумрад") == WakeWordMatcher.normalize("zumrat")
+    assert WakeWordMatcher.normalize("to'liq") == WakeWordMatcher.normalize("тулик")
+
+
+def test_activation_service_with_canonicalizer() -> None:
+    service = ActivationService("zumrad", canonicalizer=TextCanonicalizer("uz-UZ"))
+    assert service.check_and_trigger_activation("summa qancha") is None
+    assert not service.is_active()
+    assert service.check_and_trigger_activation("Zum rad, soat necha?") == "soat necha"
+    assert service.is_active()
+    assert service.last_match is not None and service.last_match.score == 1.0
+
+
+def test_activation_service_exact_mode() -> None:
+    service = ActivationService("изумруд", fuzzy=False)
+    assert service.strip_keyword("изумрут включи") == "изумрут включи"
+    assert service.strip_keyword("изумруд включи") == "включи"
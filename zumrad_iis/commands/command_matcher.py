@@ -0,0 +1,180 @@
+import logging
+from typing import Callable, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+from zumrad_iis.commands.command_vocabulary import Vocabulary
+
+log: logging.Logger = logging.getLogger(__name__)
+
+
+class FuzzyCommandMatcher:
+    """
+    Приблизительный поиск команды по фразе: лишнее или неверно распознанное
+    слово не делает команду неопределенной.
+
+    По каноническим фразам словаря (Vocabulary.canonical_map) строится
+    инвертированный индекс триграмм символов; по нему для запроса выбираются
+    фразы-кандидаты, у которых есть общие триграммы с запросом.
+
+    Оценка кандидата - покрытие всей фразы словаря: для каждого ее слова
+    берется самое похожее слово запроса (коэффициент Дайса по триграммам слова,
+    от 0 до 1), а оценка фразы - минимум по ее словам. Фраза словаря должна
+    найтись целиком: общее слово или начало фразы ("внимание" при "внимание два",
+    "сколько" при "сколько времени") совпадением не считается.
+    Слова запроса, не похожие ни на одно слово фразы, снижают оценку
+    пропорционально своей доле в запросе (QUERY_COVERAGE_WEIGHT): одно лишнее слово к фразе из двух-трех слов
+    ("сколько времени пожалуйста") допустимо, а "время пошло" - уже не "время".
+
+    Запрос с отрицанием ("не повторяй", "takrorlamang", "stop qilma") не
+    сопоставляется вовсе: без отрицания он означал бы как раз эту команду.
+    Отрицание - отдельное слово (NEGATION_WORDS) или, для узбекского,
+    глагольный суффикс (NEGATION_SUFFIXES), если таких слов нет в самом словаре.
+
+    Совпадение отклоняется, если лучшая фраза другой команды набрала оценку,
+    отстающую меньше чем на `min_margin`: при неоднозначности команда не выполняется.
+    Команды из `exact_only` (выход, тревоги) приблизительно не ищутся вовсе.
+    Индекс перестраивается, когда меняется `vocabulary.revision`.
+
+    :param vocabulary: Словарь фраз и команд.
+    :param min_score: Минимальная оценка, ниже которой совпадение не засчитывается.
+    :param min_margin: Минимальный отрыв от лучшей фразы другой команды.
+    :param exact_only: Команды, которые выполняются только по точному совпадению фразы.
+    """
+    QUERY_COVERAGE_WEIGHT: float = 0.6 # Насколько непокрытые слова запроса снижают оценку
+    QUERY_WORD_MIN_SIMILARITY: float = 0.5 # Слово запроса, менее похожее на слова фразы, не покрыто
+    # Отрицания в канонической форме (см. TextCanonicalizer)
+    NEGATION_WORDS: FrozenSet[str] = frozenset({"не", "нет", "emas"})
+    NEGATION_SUFFIXES: Dict[str, Tuple[str, ...]] = {
+        "uz-UZ": ("mangiz", "mang", "masin", "ma"), # takrorla-mang, kil-ma
+    }
+    MIN_NEGATED_STEM: int = 3 # Короче - не глагол с отрицанием ("nima")
+
+    def __init__(self,
+                vocabulary: Vocabulary,
+                min_score: float = 0.75,
+                min_margin: float = 0.1,
+                exact_only: Iterable[str] = (),
+                ) -> None:
+        self.vocabulary: Vocabulary = vocabulary
+        self.min_score: float = min_score
+        self.min_margin: float = min_margin
+        self.exact_only: FrozenSet[str] = frozenset(exact_only)
+        self._revision: int = -1 # Версия словаря, по которой построен индекс
+        self._phrases: List[str] = []
+        self._commands: List[str] = []
+        self._words: List[List[Set[str]]] = [] # Триграммы каждого слова фразы
+        self._index: Dict[str, List[int]] = {} # Триграмма -> номера фраз
+        self._vocabulary_words: Set[str] = set() # Слова фраз словаря: они отрицанием не считаются
+
+    @staticmethod
+    def trigrams(word: str) -> Set[str]:
+        padded: str = f" {word} "
+        return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+    @staticmethod
+    def similarity(a: Set[str], b: Set[str]) -> float:
+        """Коэффициент Дайса двух множеств триграмм."""
+        return 2.0 * len(a & b) / (len(a) + len(b)) if a and b else 0.0
+
+    def _build_index(self) -> None:
+        self._phrases = []
+        self._commands = []
+        self._words = []
+        self._index = {}
+        self._vocabulary_words = set()
+        for phrase, command_name in self.vocabulary.canonical_map.items():
+            if command_name in self.exact_only:
+                continue
+            number: int = len(self._phrases)
+            words: List[Set[str]] = [FuzzyCommandMatcher.trigrams(word) for word in phrase.split()]
+            if not words:
+                continue
+            self._phrases.append(phrase)
+            self._commands.append(command_name)
+            self._words.append(words)
+            self._vocabulary_words.update(phrase.split())
+            for gram in set().union(*words):
+                self._index.setdefault(gram, []).append(number)
+        self._revision = self.vocabulary.revision
+        log.debug(f"FuzzyCommandMatcher: Индекс построен: фраз {len(self._phrases)}, триграмм {len(self._index)}.")
+
+    def _score(self, number: int, query_words: List[Set[str]]) -> float:
+        """
+        Покрытие фразы словаря запросом (худшее из лучших совпадений ее слов),
+        сниженное за слова запроса, которые фразой не покрыты.
+        """
+        words: List[Set[str]] = self._words[number]
+        score: float = 1.0
+        for word in words:
+            score = min(score, max(FuzzyCommandMatcher.similarity(word, q) for q in query_words))
+            if score == 0.0:
+                return 0.0
+        uncovered: int = sum(1 for q in query_words
+                            if max(FuzzyCommandMatcher.similarity(q, word) for word in words)
+                            < FuzzyCommandMatcher.QUERY_WORD_MIN_SIMILARITY)
+        return score * (1.0 - FuzzyCommandMatcher.QUERY_COVERAGE_WEIGHT * uncovered / len(query_words))
+
+    def _is_negated(self, tokens: List[str]) -> bool:
+        """Есть ли в запросе отрицание, которого нет во фразах словаря."""
+        canonicalizer = self.vocabulary.canonicalizer
+        suffixes: Tuple[str, ...] = \
+            FuzzyCommandMatcher.NEGATION_SUFFIXES.get(canonicalizer.locale, ()) if canonicalizer else ()
+        for token in tokens:
+            if token in self._vocabulary_words:
+                continue
+            if token in FuzzyCommandMatcher.NEGATION_WORDS:
+                return True
+            if any(token.endswith(suffix) and len(token) - len(suffix) >= FuzzyCommandMatcher.MIN_NEGATED_STEM
+                   for suffix in suffixes):
+                return True
+        return False
+
+    def match(self,
+            phrase: str,
+            is_accepted: Optional[Callable[[str], bool]] = None,
+            ) -> Optional[Tuple[str, float]]:
+        """
+        Ищет самую похожую фразу словаря.
+
+        Args:
+            phrase: Распознанная фраза в канонической форме (Vocabulary.canonicalize).
+            is_accepted: Необязательная проверка команды (например, что она зарегистрирована).
+
+        Returns:
+            (команда, оценка) лучшей фразы с оценкой не ниже `min_score`
+            и отрывом от других команд не меньше `min_margin`, иначе None.
+        """
+        if self._revision != self.vocabulary.revision:
+            self._build_index()
+        tokens: List[str] = phrase.split()
+        if not tokens:
+            return None
+        if self._is_negated(tokens):
+            log.debug(f"FuzzyCommandMatcher: '{phrase}' содержит отрицание, команда не ищется.")
+            return None
+        query_words: List[Set[str]] = [FuzzyCommandMatcher.trigrams(word) for word in tokens]
+        candidates: Set[int] = set()
+        for gram in set().union(*query_words):
+            candidates.update(self._index.get(gram, ()))
+
+        # Лучшая оценка по каждой команде
+        scores: Dict[str, Tuple[float, str]] = {}
+        for number in candidates:
+            command_name: str = self._commands[number]
+            if is_accepted is not None and not is_accepted(command_name):
+                continue
+            score: float = self._score(number, query_words)
+            if score > scores.get(command_name, (-1.0, ""))[0]:
+                scores[command_name] = (score, self._phrases[number])
+        if not scores:
+            return None
+        ranked: List[Tuple[float, str, str]] = sorted(
+            ((score, command_name, matched) for command_name, (score, matched) in scores.items()), reverse=True)
+        best_score, best_command, best_phrase = ranked[0]
+        if best_score < self.min_score:
+            return None
+        if len(ranked) > 1 and best_score - ranked[1][0] < self.min_margin:
+            log.debug(f"FuzzyCommandMatcher: '{phrase}' неоднозначна: '{best_command}' ({best_score:.2f}) "
+                    f"и '{ranked[1][1]}' ({ranked[1][0]:.2f}).")
+            return None
+        log.debug(f"FuzzyCommandMatcher: '{phrase}' ~ '{best_phrase}' ({best_score:.2f})")
+        return best_command, best_score
@@ -1,8 +1,9 @@
 import asyncio
 import logging
-from typing import Dict, Protocol, runtime_checkable
+from typing import Callable, Dict, Iterable, List, Optional, Protocol, Sequence, Tuple, runtime_checkable
 from abc import ABC, abstractmethod
 
+from zumrad_iis.commands.command_matcher import FuzzyCommandMatcher
 from zumrad_iis.commands.command_vocabulary import CommandVocabulary, Vocabulary
 from zumrad_iis.services.audio_feedback_service import AudioFeedbackService
 
@@ -56,6 +57,9 @@ class CommandRunner(ABC):
             self._register[command_name] = runner
         else:
             raise ValueError(f"Invalid runner type for command '{command_name}'")
+
+    def is_registered(self, command_name: str) -> bool:
+        return command_name in self._register
         
     @abstractmethod # Теперь _process_registered_command является абстрактным методом
     async def _process_registered_command(self, command_name: str) -> None:
@@ -109,16 +113,21 @@ class CommandExecutor(CommandRunner):
 class CommandTranslator:
     """
     A class that translates phrases to commands.
+
+    If `matcher` is set, a phrase that is not in the vocabulary exactly
+    is matched approximately (see FuzzyCommandMatcher).
     """
-    def __init__(self, vocabulary: Vocabulary) -> None:
+    def __init__(self, vocabulary: Vocabulary, matcher: Optional[FuzzyCommandMatcher] = None) -> None:
         self.vocabulary: Vocabulary = vocabulary
+        self.matcher: Optional[FuzzyCommandMatcher] = matcher
 
         ...
     def translate(self, phrase: str) -> str | None:
         """
         Translate a phrase to a command.
         
-        self.vocabulary.phrase_map: Dict[key_phrase: str, value_command: str]
+        The phrase is canonicalized (see Vocabulary.canonicalize) and looked up
+        in self.vocabulary.canonical_map: Dict[canonical_phrase: str, value_command: str]
 
         Args:
             phrase (str): The phrase to translate.
@@ -126,7 +135,40 @@ class CommandTranslator:
         Returns:
             str: The translated command.
         """
-        return self.vocabulary.vocabulary_map.get(phrase, None)
+        return self.vocabulary.lookup(self.vocabulary.canonicalize(phrase))
+
+    def translate_best(self,
+                    phrases: Iterable[str],
+                    is_accepted: Optional[Callable[[str], bool]] = None,
+                    ) -> Optional[Tuple[str, str]]:
+        """
+        Translate the best of several hypotheses (N-best alternatives, best first).
+
+        Args:
+            phrases: Hypotheses ordered by score, the best first.
+            is_accepted: Optional check of the command (e.g. that it is registered).
+
+        Returns:
+            (phrase, command) for the first hypothesis that maps to an accepted command, or None.
+            Exact matches of all hypotheses are tried before approximate ones.
+        """
+        # Каждая гипотеза канонизируется один раз: и для точного, и для приблизительного поиска
+        canonical: List[Tuple[str, str]] = [(phrase, self.vocabulary.canonicalize(phrase)) for phrase in phrases]
+        for phrase, key in canonical:
+            command_name: str | None = self.vocabulary.lookup(key)
+            if command_name and (is_accepted is None or is_accepted(command_name)):
+                return phrase, command_name
+        if self.matcher is None:
+            return None
+        best: Optional[Tuple[str, str, float]] = None
+        for phrase, key in canonical:
+            matched: Optional[Tuple[str, float]] = self.matcher.match(key, is_accepted)
+            if matched and (best is None or matched[1] > best[2]):
+                best = (phrase, *matched)
+        if best is None:
+            return None
+        log.info(f"Phrase '{best[0]}' approximately matches command '{best[1]}' (score {best[2]:.2f})")
+        return best[0], best[1]
         
 class CommandProcessor():
     """
@@ -139,16 +181,22 @@ class CommandProcessor():
     def register_command(self, command_name: str, command: Command) -> None:
         self.executor.register_command(command_name, command)
 
-    async def process(self, phrase: str) -> bool:
+    async def process(self, phrase: str, alternatives: Sequence[str] = ()) -> bool:
         """
         Process a phrase.
         
         Args:
             phrase (str): The phrase to process.
+            alternatives (Sequence[str]): Less likely hypotheses of the same utterance, best first.
+                They are tried if the phrase does not map to a registered command.
         """
         is_command_was_executed: bool = False
-        command_name: str | None = self.translator.translate(phrase)
-        if command_name:
+        translated: Optional[Tuple[str, str]] = self.translator.translate_best(
+            (phrase, *alternatives), self.executor.is_registered)
+        if translated:
+            matched_phrase, command_name = translated
+            if matched_phrase != phrase:
+                log.info(f"Phrase '{phrase}' is not a command, using alternative '{matched_phrase}'")
             is_command_was_executed = await self.executor.exe(command_name)
         return is_command_was_executed
     
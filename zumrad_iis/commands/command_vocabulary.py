@@ -1,5 +1,7 @@
 import logging
-from typing import Dict, TypeAlias
+from typing import Dict, Optional, TypeAlias
+
+from zumrad_iis.commands.text_canonicalizer import TextCanonicalizer
 
 log: logging.Logger = logging.getLogger(__name__) 
 
@@ -9,10 +11,62 @@ VocabularyMap: TypeAlias = Dict[KeyCommand, ValueCommand]
 
 
 class Vocabulary:
-    def __init__(self, vocabulary: list[str], vocabulary_map: VocabularyMap) -> None:
+    """
+    Фразы словаря хранятся в исходном написании (`vocabulary_map`, по нему строится
+    грамматика STT), а поиск команды идет по канонической форме (`canonical_map`,
+    см. TextCanonicalizer): варианты написания одной фразы сводятся к одному ключу.
+    """
+    def __init__(self,
+                vocabulary: list[str],
+                vocabulary_map: VocabularyMap,
+                canonicalizer: Optional[TextCanonicalizer] = None) -> None:
         self.vocabulary: list[str] = vocabulary
         self.vocabulary_map: VocabularyMap = vocabulary_map  # Its should be inflated later in config.py
-        
+        self.canonicalizer: Optional[TextCanonicalizer] = canonicalizer
+        # Номер версии словаря: увеличивается при каждом изменении фраз.
+        # По нему потребители (например, грамматика STT) узнают, что словарь надо перечитать.
+        self.revision: int = 0
+        self._canonical_map: VocabularyMap = {}
+        self._canonical_revision: int = -1 # Версия словаря, по которой построен _canonical_map
+
+    def canonicalize(self, phrase: str) -> str:
+        """Каноническая форма фразы; без канонизатора фраза не меняется."""
+        return self.canonicalizer.canonicalize(phrase) if self.canonicalizer else phrase
+
+    @property
+    def canonical_map(self) -> VocabularyMap:
+        """Каноническая форма фразы -> команда; пересчитывается один раз на версию словаря."""
+        if self._canonical_revision != self.revision:
+            canonical_map: VocabularyMap = {}
+            for phrase, command in self.vocabulary_map.items():
+                key: str = self.canonicalize(phrase)
+                if canonical_map.setdefault(key, command) != command:
+                    log.warning(f"Vocabulary: Phrase '{phrase}' of command '{command}' duplicates "
+                                f"a phrase of command '{canonical_map[key]}' and is ignored.")
+            self._canonical_map = canonical_map
+            self._canonical_revision = self.revision
+        return self._canonical_map
+
+    def lookup(self, phrase: str) -> Optional[ValueCommand]:
+        """Команда по уже канонизированной фразе (одна операция со словарем)."""
+        return self.canonical_map.get(phrase)
+
+    def phrases(self) -> list[str]:
+        return list(self.vocabulary_map.keys())
+
+    def add_phrase(self, phrase: KeyCommand, command: ValueCommand) -> None:
+        self.vocabulary_map[phrase] = command
+        self.revision += 1
+
+    def remove_phrase(self, phrase: KeyCommand) -> None:
+        if self.vocabulary_map.pop(phrase, None) is not None:
+            self.revision += 1
+
+    def update(self, vocabulary_map: VocabularyMap) -> None:
+        """Заменяет все фразы словаря."""
+        self.vocabulary_map = vocabulary_map
+        self.revision += 1
+
     def __repr__(self) -> str:
         data: str = 'Vocabulary map:\n'
         for key in self.vocabulary_map:
@@ -35,5 +89,8 @@ class CommandVocabulary(Vocabulary):
     """
     
     
-    def __init__(self, vocabulary: list[str], vocabulary_map: VocabularyMap) -> None:
-        super().__init__(vocabulary, vocabulary_map)
+    def __init__(self,
+                vocabulary: list[str],
+                vocabulary_map: VocabularyMap,
+                canonicalizer: Optional[TextCanonicalizer] = None) -> None:
+        super().__init__(vocabulary, vocabulary_map, canonicalizer)
@@ -0,0 +1,38 @@
+import re
+from typing import Dict, Tuple
+
+
+class TextCanonicalizer:
+    """
+    Приводит фразу к канонической форме, чтобы варианты написания, которые
+    выдает Vosk, совпадали с одной фразой словаря.
+
+    Общие правила: нижний регистр, ё -> е, все виды апострофа -> "'",
+    дефис -> пробел, прочая пунктуация отбрасывается, пробелы схлопываются.
+    Затем применяются правила локали (LOCALE_RULES), например для узбекского
+    апостроф отбрасывается ("to'liq" -> "toliq"). Замены, сливающие разные звуки
+    (например, узбекские q и k: "qo'l" - рука, "ko'l" - озеро), сюда не добавляются:
+    такие варианты распознавания перечисляются в словаре явно.
+
+    Преобразование идемпотентно: повторная канонизация формы не меняет.
+
+    :param locale: Локаль, например "ru-RU" или "uz-UZ"; для неизвестной применяются только общие правила.
+    """
+    APOSTROPHES: str = "’‘`ʻʼ´"
+    # Замены подстрок по локалям, применяются по порядку
+    LOCALE_RULES: Dict[str, Tuple[Tuple[str, str], ...]] = {
+        "ru-RU": (),
+        "uz-UZ": (("'", ""),),
+    }
+    _PUNCTUATION = re.compile(r"[^\w\s']")
+
+    def __init__(self, locale: str) -> None:
+        self.locale: str = locale
+        self._rules: Tuple[Tuple[str, str], ...] = TextCanonicalizer.LOCALE_RULES.get(locale, ())
+        self._translation = str.maketrans({**dict.fromkeys(TextCanonicalizer.APOSTROPHES, "'"), "ё": "е", "-": " "})
+
+    def canonicalize(self, text: str) -> str:
+        text = TextCanonicalizer._PUNCTUATION.sub("", text.lower().translate(self._translation))
+        for old, new in self._rules:
+            text = text.replace(old, new)
+        return " ".join(text.split())
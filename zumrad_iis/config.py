@@ -5,6 +5,7 @@ import logging
 from typing import List, Optional, Any, Dict
 from typing import TypeAlias
 from zumrad_iis.commands.command_vocabulary import CommandVocabulary, Vocabulary
+from zumrad_iis.commands.text_canonicalizer import TextCanonicalizer
 
 log: logging.Logger = logging.getLogger(__name__) # Используем логгер модуля
 
@@ -28,11 +29,60 @@ DEFAULT_STT_SAMPLERATE: int = 16000
 DEFAULT_STT_CHANNELS: int = 1
 DEFAULT_STT_BLOCKSIZE: int = 8000
 DEFAULT_STT_DEVICE_ID: Optional[int] = None # None для устройства по умолчанию
+DEFAULT_STT_FALLBACK_DEVICE_ID: Optional[int] = None # Резервное устройство при потере основного, None - по умолчанию
+DEFAULT_STT_DEVICE_WATCH: bool = True # Следить за подключением/отключением устройств
+DEFAULT_STT_DEVICE_REFRESH_INTERVAL: float = 2.0 # Период обновления списка устройств, с
+DEFAULT_STT_DEVICE_STALL_TIMEOUT: float = 2.0 # Сколько секунд без аудио считать потерей устройства
+DEFAULT_STT_CAPTURE_SAMPLERATE: Optional[int] = None # None - родная частота устройства, с ресемплингом в STT_SAMPLERATE
+DEFAULT_STT_LOW_LATENCY: bool = False # Режим низкой задержки: маленький блок захвата
+DEFAULT_STT_LOW_LATENCY_BLOCKSIZE: int = 800 # Блок захвата в режиме низкой задержки (50 мс при 16 кГц)
+DEFAULT_STT_LOW_LATENCY_DECODE_BLOCKSIZE: int = 1600 # Порция для Vosk в режиме низкой задержки (100 мс)
+DEFAULT_STT_USE_GRAMMAR: bool = False # Ограничить распознавание фразами словаря команд (только small-модели Vosk)
+DEFAULT_STT_TWO_TIER: bool = False # В ожидании распознавать только ключевое слово (только small-модели Vosk)
+DEFAULT_STT_PARTIALS_ENABLED: bool = True # Обрабатывать промежуточные гипотезы (ранняя активация)
+DEFAULT_STT_PARTIALS_STABLE_CHUNKS: int = 2 # Сколько порций гипотеза не должна меняться, чтобы считаться стабильной
+DEFAULT_STT_PARTIALS_FIRE_COMMANDS: bool = True # Выполнять команды по стабильной промежуточной гипотезе
+# Профили эндпойнтера Vosk: mode - default | short | long | very_long,
+# t_start_max / t_end / t_max - явные задержки в секундах (применяются, только если заданы все три)
+DEFAULT_STT_ENDPOINTER_PROFILES: Dict[str, Dict[str, Any]] = {
+    "default": {"mode": "default"},
+    "short": {"mode": "short"},
+}
+DEFAULT_STT_ENDPOINTER_IDLE: Optional[str] = None # Профиль в ожидании ключевого слова, None - настройки Vosk
+DEFAULT_STT_ENDPOINTER_ACTIVE: Optional[str] = None # Профиль после активации, None - настройки Vosk
+DEFAULT_STT_FORCE_FINAL_SILENCE_MS: int = 0 # Завершать фразу после стольких мс тишины по VAD после hangover (0 - сразу)
+DEFAULT_STT_WORKER_ENABLED: bool = False # Распознавание в отдельном процессе
+DEFAULT_STT_WORKER_CPU_AFFINITY: Optional[List[int]] = None # Ядра для процесса распознавания, None - все
+DEFAULT_STT_WORKER_SLOTS: int = 4 # Слотов в кольце разделяемой памяти для аудио
+DEFAULT_STT_SESSIONS: List[Dict[str, Any]] = [] # Дополнительные микрофоны (комнаты): [{id, device_id, model_path}]
+DEFAULT_STT_MAX_ALTERNATIVES: int = 0 # N-best гипотез для поиска команды (0 - только лучшая)
+DEFAULT_STT_MIN_CONFIDENCE: float = 0.0 # Фразы с меньшей уверенностью (минимум по словам) игнорируются
+DEFAULT_STT_RESUME_DISCARD_MS: int = 0 # Сколько аудио отбросить при возобновлении после паузы
+DEFAULT_STT_HISTORY_MS: int = 5000 # Глубина истории захвата для повтора после сигнала активации (0 - отключить)
+DEFAULT_STT_SOURCE_TYPE: str = "device" # "device" - микрофон, "file" - WAV / сырой PCM / именованный канал
+DEFAULT_STT_SOURCE_PATH: Optional[str] = None
+DEFAULT_STT_SOURCE_REALTIME: bool = True # False - читать файл с максимальной скоростью
+DEFAULT_STT_BUFFER_CAPACITY: int = 64 # Максимум блоков в буфере захвата
+DEFAULT_STT_OVERFLOW_POLICY: str = "drop_oldest" # drop_oldest | drop_newest | block
+
+# Настройки детектора речевой активности (VAD)
+DEFAULT_VAD_ENABLED: bool = True
+DEFAULT_VAD_ENERGY_THRESHOLD_DB: float = -45.0 # Минимальная энергия речевого кадра, dBFS
+DEFAULT_VAD_SNR_MARGIN_DB: float = 10.0 # Превышение над шумовым фоном, dB
+DEFAULT_VAD_ZCR_MAX: float = 0.35 # Максимальная доля пересечений нуля в речевом кадре
+DEFAULT_VAD_FRAME_MS: int = 20
+DEFAULT_VAD_MIN_SPEECH_MS: int = 60
+DEFAULT_VAD_HANGOVER_MS: int = 800 # Сколько тишины после речи еще передавать в Vosk
+DEFAULT_VAD_PREROLL_MS: int = 300 # Сколько тишины перед речью передавать в Vosk
 
 # Настройки активации
 DEFAULT_STT_KEYWORD: str = "изумруд"
 DEFAULT_ACTIVATION_SOUND_PATH: str = "assets/sound/bdrim.wav"
 DEFAULT_COMMAND_SOUND_PATH: str = "assets/sound/snap.wav"
+DEFAULT_ACTIVATION_FUZZY: bool = True                 # Нечеткий поиск ключевого слова (WakeWordMatcher)
+DEFAULT_ACTIVATION_MAX_DISTANCE_RATIO: float = 0.2    # Допустимая доля правок от длины ключевого слова
+DEFAULT_ACTIVATION_SEARCH_TOKENS: int = 3             # В скольких первых словах фразы искать точное ключевое слово
+DEFAULT_ACTIVATION_MIN_SCORE: float = 0.8             # Минимальная оценка неточного совпадения
 
 # TTS Настройки
 DEFAULT_TTS_LANGUAGE: str = "ru"
@@ -41,6 +91,25 @@ DEFAULT_TTS_VOICE: str = "kseniya"  # Голос по умолчанию, есл
 DEFAULT_TTS_SAMPLERATE: int = 48000
 DEFAULT_TTS_DEVICE: str = "cpu"
 
+# Размеры пулов потоков подсистем (см. ExecutorRegistry)
+DEFAULT_EXECUTOR_POOL_SIZES: Dict[str, int] = {
+    "audio_io": 2,          # Звуки обратной связи
+    "speech_playback": 1,   # Воспроизведение синтезированной речи
+    "model_loading": 2,     # Загрузка моделей STT и TTS
+    "compute": 2,           # Синтез и прогрев моделей
+    "decoding": 2,          # Декодирование сессий распознавания (SessionManager)
+}
+
+DEFAULT_COMMAND_FUZZY_ENABLED: bool = True     # Приблизительный поиск команды (FuzzyCommandMatcher)
+DEFAULT_COMMAND_FUZZY_MIN_SCORE: float = 0.75  # Минимальная оценка сходства фраз, от 0 до 1
+DEFAULT_COMMAND_FUZZY_MIN_MARGIN: float = 0.1  # Минимальный отрыв от другой команды, иначе совпадение неоднозначно
+# Команды, которые выполняются только по точной фразе: выход и тревоги
+DEFAULT_COMMAND_EXACT_ONLY: List[str] = ["quit", "attention_one", "attention_two", "danger_of_fire"]
+
+DEFAULT_WARMUP_ENABLED: bool = True # Прогревать модели STT и TTS при запуске
+DEFAULT_WARMUP_STT_SECONDS: float = 1.0 # Сколько секунд синтетического аудио прогнать через декодер
+DEFAULT_WARMUP_TTS_TEXT: Optional[str] = None # Фраза для прогрева синтеза, None - ключевое слово
+
 # Общие настройки
 DEFAULT_PHRASES_TO_EXIT: List[str] = [
     "завершить работу", "завершить сеанс", "выход", "выйди", "закрыть программу",
@@ -63,15 +132,67 @@ STT_SAMPLERATE: int = DEFAULT_STT_SAMPLERATE
 STT_CHANNELS: int = DEFAULT_STT_CHANNELS
 STT_BLOCKSIZE: int = DEFAULT_STT_BLOCKSIZE
 STT_DEVICE_ID: Optional[int] = DEFAULT_STT_DEVICE_ID
+STT_LOW_LATENCY: bool = DEFAULT_STT_LOW_LATENCY
+STT_DECODE_BLOCKSIZE: int = DEFAULT_STT_BLOCKSIZE # Порция аудио для декодера, по умолчанию равна блоку захвата
+STT_RESUME_DISCARD_MS: int = DEFAULT_STT_RESUME_DISCARD_MS
+STT_USE_GRAMMAR: bool = DEFAULT_STT_USE_GRAMMAR
+STT_TWO_TIER: bool = DEFAULT_STT_TWO_TIER
+STT_PARTIALS_ENABLED: bool = DEFAULT_STT_PARTIALS_ENABLED
+STT_MIN_CONFIDENCE: float = DEFAULT_STT_MIN_CONFIDENCE
+STT_MAX_ALTERNATIVES: int = DEFAULT_STT_MAX_ALTERNATIVES
+STT_WORKER_ENABLED: bool = DEFAULT_STT_WORKER_ENABLED
+STT_WORKER_CPU_AFFINITY: Optional[List[int]] = DEFAULT_STT_WORKER_CPU_AFFINITY
+STT_WORKER_SLOTS: int = DEFAULT_STT_WORKER_SLOTS
+STT_SESSIONS: List[Dict[str, Any]] = DEFAULT_STT_SESSIONS
+STT_ENDPOINTER_PROFILES: Dict[str, Dict[str, Any]] = DEFAULT_STT_ENDPOINTER_PROFILES
+STT_ENDPOINTER_IDLE: Optional[str] = DEFAULT_STT_ENDPOINTER_IDLE
+STT_ENDPOINTER_ACTIVE: Optional[str] = DEFAULT_STT_ENDPOINTER_ACTIVE
+STT_FORCE_FINAL_SILENCE_MS: int = DEFAULT_STT_FORCE_FINAL_SILENCE_MS
+STT_PARTIALS_STABLE_CHUNKS: int = DEFAULT_STT_PARTIALS_STABLE_CHUNKS
+STT_PARTIALS_FIRE_COMMANDS: bool = DEFAULT_STT_PARTIALS_FIRE_COMMANDS
+STT_CAPTURE_SAMPLERATE: Optional[int] = DEFAULT_STT_CAPTURE_SAMPLERATE
+STT_FALLBACK_DEVICE_ID: Optional[int] = DEFAULT_STT_FALLBACK_DEVICE_ID
+STT_DEVICE_WATCH: bool = DEFAULT_STT_DEVICE_WATCH
+STT_DEVICE_REFRESH_INTERVAL: float = DEFAULT_STT_DEVICE_REFRESH_INTERVAL
+STT_DEVICE_STALL_TIMEOUT: float = DEFAULT_STT_DEVICE_STALL_TIMEOUT
+STT_HISTORY_MS: int = DEFAULT_STT_HISTORY_MS
+STT_SOURCE_TYPE: str = DEFAULT_STT_SOURCE_TYPE
+STT_SOURCE_PATH: Optional[str] = DEFAULT_STT_SOURCE_PATH
+STT_SOURCE_REALTIME: bool = DEFAULT_STT_SOURCE_REALTIME
+STT_BUFFER_CAPACITY: int = DEFAULT_STT_BUFFER_CAPACITY
+STT_OVERFLOW_POLICY: str = DEFAULT_STT_OVERFLOW_POLICY
 STT_KEYWORD: str = DEFAULT_STT_KEYWORD
+VAD_ENABLED: bool = DEFAULT_VAD_ENABLED
+VAD_ENERGY_THRESHOLD_DB: float = DEFAULT_VAD_ENERGY_THRESHOLD_DB
+VAD_SNR_MARGIN_DB: float = DEFAULT_VAD_SNR_MARGIN_DB
+VAD_ZCR_MAX: float = DEFAULT_VAD_ZCR_MAX
+VAD_FRAME_MS: int = DEFAULT_VAD_FRAME_MS
+VAD_MIN_SPEECH_MS: int = DEFAULT_VAD_MIN_SPEECH_MS
+VAD_HANGOVER_MS: int = DEFAULT_VAD_HANGOVER_MS
+VAD_PREROLL_MS: int = DEFAULT_VAD_PREROLL_MS
 ACTIVATION_SOUND_PATH: str = DEFAULT_ACTIVATION_SOUND_PATH
 COMMAND_SOUND_PATH: str = DEFAULT_COMMAND_SOUND_PATH
+ACTIVATION_FUZZY: bool = DEFAULT_ACTIVATION_FUZZY
+ACTIVATION_MAX_DISTANCE_RATIO: float = DEFAULT_ACTIVATION_MAX_DISTANCE_RATIO
+ACTIVATION_SEARCH_TOKENS: int = DEFAULT_ACTIVATION_SEARCH_TOKENS
+ACTIVATION_MIN_SCORE: float = DEFAULT_ACTIVATION_MIN_SCORE
 TTS_SAMPLERATE: int = DEFAULT_TTS_SAMPLERATE
 TTS_LANGUAGE: str = DEFAULT_TTS_LANGUAGE
 TTS_VOICE: str = DEFAULT_TTS_VOICE  # Голос по умолчанию, если не указан
 TTS_MODEL_ID: str = DEFAULT_TTS_MODEL_ID
 TTS_DEVICE: str = DEFAULT_TTS_DEVICE
 
+EXECUTOR_POOL_SIZES: Dict[str, int] = DEFAULT_EXECUTOR_POOL_SIZES
+
+COMMAND_FUZZY_ENABLED: bool = DEFAULT_COMMAND_FUZZY_ENABLED
+COMMAND_FUZZY_MIN_SCORE: float = DEFAULT_COMMAND_FUZZY_MIN_SCORE
+COMMAND_FUZZY_MIN_MARGIN: float = DEFAULT_COMMAND_FUZZY_MIN_MARGIN
+COMMAND_EXACT_ONLY: List[str] = DEFAULT_COMMAND_EXACT_ONLY
+
+WARMUP_ENABLED: bool = DEFAULT_WARMUP_ENABLED
+WARMUP_STT_SECONDS: float = DEFAULT_WARMUP_STT_SECONDS
+WARMUP_TTS_TEXT: Optional[str] = DEFAULT_WARMUP_TTS_TEXT
+
 # Список фраз для выхода из программы
 PHRASES_TO_EXIT: List[str] = list(DEFAULT_PHRASES_TO_EXIT) # Копируем список, чтобы избежать изменения оригинала
 
@@ -149,7 +270,7 @@ def load_and_apply_config() -> None:
     local: str = _parse_common_config(yaml_config)
     LOCAL = local
     vocabulary_map: Dict[str, str] = _parse_vocabulary(yaml_config, "command_vocabulary", _cmd_list, local)
-    command_vocabulary = Vocabulary(_cmd_list, vocabulary_map)
+    command_vocabulary = Vocabulary(_cmd_list, vocabulary_map, TextCanonicalizer(local))
     log.debug(command_vocabulary)
     interactive_dictionary = _parse_list_of_values(yaml_config.get("interactive_phrases", {}), _itr_list, local)
     log.debug(interactive_dictionary)
@@ -160,8 +281,22 @@ def _parse_common_config(yaml_config: Dict[str, Any]) -> str:
     """Загружает конфигурацию из YAML и применяет ее, переопределяя значения по умолчанию."""
     global CONFIG_FILE_PATH
     global STT_MODEL_PATH_BASE, STT_SAMPLERATE, STT_CHANNELS, STT_BLOCKSIZE, STT_DEVICE_ID
+    global STT_LOW_LATENCY, STT_DECODE_BLOCKSIZE, STT_RESUME_DISCARD_MS, STT_CAPTURE_SAMPLERATE
+    global STT_USE_GRAMMAR, STT_TWO_TIER, STT_MIN_CONFIDENCE, STT_MAX_ALTERNATIVES
+    global STT_WORKER_ENABLED, STT_WORKER_CPU_AFFINITY, STT_WORKER_SLOTS, STT_SESSIONS
+    global STT_ENDPOINTER_PROFILES, STT_ENDPOINTER_IDLE, STT_ENDPOINTER_ACTIVE, STT_FORCE_FINAL_SILENCE_MS
+    global STT_PARTIALS_ENABLED, STT_PARTIALS_STABLE_CHUNKS, STT_PARTIALS_FIRE_COMMANDS
+    global STT_SOURCE_TYPE, STT_SOURCE_PATH, STT_SOURCE_REALTIME
+    global STT_BUFFER_CAPACITY, STT_OVERFLOW_POLICY, STT_HISTORY_MS
+    global STT_FALLBACK_DEVICE_ID, STT_DEVICE_WATCH, STT_DEVICE_REFRESH_INTERVAL, STT_DEVICE_STALL_TIMEOUT
     global TTS_LANGUAGE, TTS_MODEL_ID, TTS_VOICE, TTS_SAMPLERATE, TTS_DEVICE
+    global WARMUP_ENABLED, WARMUP_STT_SECONDS, WARMUP_TTS_TEXT
+    global EXECUTOR_POOL_SIZES
+    global COMMAND_FUZZY_ENABLED, COMMAND_FUZZY_MIN_SCORE, COMMAND_FUZZY_MIN_MARGIN, COMMAND_EXACT_ONLY
+    global VAD_ENABLED, VAD_ENERGY_THRESHOLD_DB, VAD_SNR_MARGIN_DB, VAD_ZCR_MAX
+    global VAD_FRAME_MS, VAD_MIN_SPEECH_MS, VAD_HANGOVER_MS, VAD_PREROLL_MS
     global STT_KEYWORD, ACTIVATION_SOUND_PATH, COMMAND_SOUND_PATH, PHRASES_TO_EXIT
+    global ACTIVATION_FUZZY, ACTIVATION_MAX_DISTANCE_RATIO, ACTIVATION_SEARCH_TOKENS, ACTIVATION_MIN_SCORE
     global STT_MODEL_PATH # Для обновления производной конфигурации
 
     # Применяем загруженные значения, если они есть в YAML
@@ -174,6 +309,59 @@ def _parse_common_config(yaml_config: Dict[str, Any]) -> str:
     STT_CHANNELS = stt_settings.get("channels", DEFAULT_STT_CHANNELS)
     STT_BLOCKSIZE = stt_settings.get("blocksize", DEFAULT_STT_BLOCKSIZE)
     STT_DEVICE_ID = stt_settings.get("device_id", DEFAULT_STT_DEVICE_ID) # YAML null станет None
+    STT_FALLBACK_DEVICE_ID = stt_settings.get("fallback_device_id", DEFAULT_STT_FALLBACK_DEVICE_ID)
+    device_watch_settings = stt_settings.get("device_watch", {})
+    STT_DEVICE_WATCH = device_watch_settings.get("enabled", DEFAULT_STT_DEVICE_WATCH)
+    STT_DEVICE_REFRESH_INTERVAL = device_watch_settings.get("refresh_interval", DEFAULT_STT_DEVICE_REFRESH_INTERVAL)
+    STT_DEVICE_STALL_TIMEOUT = device_watch_settings.get("stall_timeout", DEFAULT_STT_DEVICE_STALL_TIMEOUT)
+    STT_CAPTURE_SAMPLERATE = stt_settings.get("capture_samplerate", DEFAULT_STT_CAPTURE_SAMPLERATE)
+    STT_RESUME_DISCARD_MS = stt_settings.get("resume_discard_ms", DEFAULT_STT_RESUME_DISCARD_MS)
+    STT_USE_GRAMMAR = stt_settings.get("use_grammar", DEFAULT_STT_USE_GRAMMAR)
+    STT_TWO_TIER = stt_settings.get("two_tier", DEFAULT_STT_TWO_TIER)
+    STT_MIN_CONFIDENCE = stt_settings.get("min_confidence", DEFAULT_STT_MIN_CONFIDENCE)
+    STT_MAX_ALTERNATIVES = stt_settings.get("max_alternatives", DEFAULT_STT_MAX_ALTERNATIVES)
+    worker_settings = stt_settings.get("worker", {})
+    STT_WORKER_ENABLED = worker_settings.get("enabled", DEFAULT_STT_WORKER_ENABLED)
+    STT_WORKER_CPU_AFFINITY = worker_settings.get("cpu_affinity", DEFAULT_STT_WORKER_CPU_AFFINITY)
+    STT_WORKER_SLOTS = worker_settings.get("slots", DEFAULT_STT_WORKER_SLOTS)
+    STT_SESSIONS = stt_settings.get("sessions") or DEFAULT_STT_SESSIONS
+    for number, session in enumerate(STT_SESSIONS):
+        session.setdefault("id", f"session-{number + 1}")
+    endpointer_settings = stt_settings.get("endpointer", {})
+    STT_ENDPOINTER_PROFILES = endpointer_settings.get("profiles", DEFAULT_STT_ENDPOINTER_PROFILES)
+    STT_ENDPOINTER_IDLE = endpointer_settings.get("idle", DEFAULT_STT_ENDPOINTER_IDLE)
+    STT_ENDPOINTER_ACTIVE = endpointer_settings.get("active", DEFAULT_STT_ENDPOINTER_ACTIVE)
+    STT_FORCE_FINAL_SILENCE_MS = endpointer_settings.get("force_final_silence_ms", DEFAULT_STT_FORCE_FINAL_SILENCE_MS)
+    partials_settings = stt_settings.get("partials", {})
+    STT_PARTIALS_ENABLED = partials_settings.get("enabled", DEFAULT_STT_PARTIALS_ENABLED)
+    STT_PARTIALS_STABLE_CHUNKS = partials_settings.get("stable_chunks", DEFAULT_STT_PARTIALS_STABLE_CHUNKS)
+    STT_PARTIALS_FIRE_COMMANDS = partials_settings.get("fire_commands", DEFAULT_STT_PARTIALS_FIRE_COMMANDS)
+    STT_DECODE_BLOCKSIZE = STT_BLOCKSIZE
+    low_latency_settings = stt_settings.get("low_latency", {})
+    STT_LOW_LATENCY = low_latency_settings.get("enabled", DEFAULT_STT_LOW_LATENCY)
+    if STT_LOW_LATENCY:
+        # Маленький аппаратный блок и отдельная порция декодера: меньше задержка, больше накладных расходов
+        STT_BLOCKSIZE = low_latency_settings.get("blocksize", DEFAULT_STT_LOW_LATENCY_BLOCKSIZE)
+        STT_DECODE_BLOCKSIZE = low_latency_settings.get("decode_blocksize", DEFAULT_STT_LOW_LATENCY_DECODE_BLOCKSIZE)
+    source_settings = stt_settings.get("source", {})
+    STT_SOURCE_TYPE = source_settings.get("type", DEFAULT_STT_SOURCE_TYPE)
+    STT_SOURCE_PATH = source_settings.get("path", DEFAULT_STT_SOURCE_PATH)
+    STT_SOURCE_REALTIME = source_settings.get("realtime", DEFAULT_STT_SOURCE_REALTIME)
+    buffer_settings = stt_settings.get("buffer", {})
+    STT_BUFFER_CAPACITY = buffer_settings.get("capacity", DEFAULT_STT_BUFFER_CAPACITY)
+    STT_OVERFLOW_POLICY = buffer_settings.get("overflow_policy", DEFAULT_STT_OVERFLOW_POLICY)
+    STT_HISTORY_MS = buffer_settings.get("history_ms", DEFAULT_STT_HISTORY_MS)
+
+    # Настройки VAD
+    vad_settings = yaml_config.get("vad", {})
+    VAD_ENABLED = vad_settings.get("enabled", DEFAULT_VAD_ENABLED)
+    VAD_ENERGY_THRESHOLD_DB = vad_settings.get("energy_threshold_db", DEFAULT_VAD_ENERGY_THRESHOLD_DB)
+    VAD_SNR_MARGIN_DB = vad_settings.get("snr_margin_db", DEFAULT_VAD_SNR_MARGIN_DB)
+    VAD_ZCR_MAX = vad_settings.get("zcr_max", DEFAULT_VAD_ZCR_MAX)
+    VAD_FRAME_MS = vad_settings.get("frame_ms", DEFAULT_VAD_FRAME_MS)
+    VAD_MIN_SPEECH_MS = vad_settings.get("min_speech_ms", DEFAULT_VAD_MIN_SPEECH_MS)
+    VAD_HANGOVER_MS = vad_settings.get("hangover_ms", DEFAULT_VAD_HANGOVER_MS)
+    VAD_PREROLL_MS = vad_settings.get("preroll_ms", DEFAULT_VAD_PREROLL_MS)
 
     # Настройки активации
     activation_settings = yaml_config.get("activation", {})
@@ -181,6 +369,11 @@ def _parse_common_config(yaml_config: Dict[str, Any]) -> str:
     STT_KEYWORD = _parse_local_value_by_key(activation_settings, "keyword", local)
     ACTIVATION_SOUND_PATH = activation_settings.get("activation_sound_path", DEFAULT_ACTIVATION_SOUND_PATH)
     COMMAND_SOUND_PATH = activation_settings.get("command_sound_path", DEFAULT_COMMAND_SOUND_PATH)
+    fuzzy_settings = activation_settings.get("fuzzy", {})
+    ACTIVATION_FUZZY = fuzzy_settings.get("enabled", DEFAULT_ACTIVATION_FUZZY)
+    ACTIVATION_MAX_DISTANCE_RATIO = fuzzy_settings.get("max_distance_ratio", DEFAULT_ACTIVATION_MAX_DISTANCE_RATIO)
+    ACTIVATION_SEARCH_TOKENS = fuzzy_settings.get("search_tokens", DEFAULT_ACTIVATION_SEARCH_TOKENS)
+    ACTIVATION_MIN_SCORE = fuzzy_settings.get("min_score", DEFAULT_ACTIVATION_MIN_SCORE)
 
     # TTS Настройки
     tts_settings = yaml_config.get("tts", {})
@@ -192,6 +385,23 @@ def _parse_common_config(yaml_config: Dict[str, Any]) -> str:
     TTS_VOICE = _parse_local_value_by_key(tts_settings, "voice", local)
     TTS_SAMPLERATE = tts_settings.get("samplerate", DEFAULT_TTS_SAMPLERATE)
     TTS_DEVICE = tts_settings.get("device", DEFAULT_TTS_DEVICE)
+
+    # Пулы потоков подсистем
+    EXECUTOR_POOL_SIZES = dict(DEFAULT_EXECUTOR_POOL_SIZES, **yaml_config.get("executors", {}))
+
+    # Приблизительный поиск команд
+    matching_settings = yaml_config.get("command_matching", {})
+    COMMAND_FUZZY_ENABLED = matching_settings.get("fuzzy", DEFAULT_COMMAND_FUZZY_ENABLED)
+    COMMAND_FUZZY_MIN_SCORE = matching_settings.get("min_score", DEFAULT_COMMAND_FUZZY_MIN_SCORE)
+    COMMAND_FUZZY_MIN_MARGIN = matching_settings.get("min_margin", DEFAULT_COMMAND_FUZZY_MIN_MARGIN)
+    COMMAND_EXACT_ONLY = matching_settings.get("exact_only", DEFAULT_COMMAND_EXACT_ONLY)
+
+    # Прогрев моделей
+    warmup_settings = yaml_config.get("warmup", {})
+    WARMUP_ENABLED = warmup_settings.get("enabled", DEFAULT_WARMUP_ENABLED)
+    WARMUP_STT_SECONDS = warmup_settings.get("stt_seconds", DEFAULT_WARMUP_STT_SECONDS)
+    WARMUP_TTS_TEXT = _parse_local_value_by_key(warmup_settings, "tts_text", local) \
+        if warmup_settings.get("tts_text") else DEFAULT_WARMUP_TTS_TEXT
     
     # Общие настройки
     general_settings = yaml_config.get("general", {})
@@ -256,11 +466,29 @@ def print_active_config() -> None:
     log.info(f"  Current local: {LOCAL}")
     log.info(f"  STT Model Path Base: {STT_MODEL_PATH_BASE}")
     log.info(f"  STT Model Full Path: {STT_MODEL_PATH}")
-    log.info(f"  Sample Rate: {STT_SAMPLERATE}")
+    log.info(f"  Sample Rate: {STT_SAMPLERATE} (capture: {STT_CAPTURE_SAMPLERATE or 'device native'})")
     log.info(f"  Channels: {STT_CHANNELS}")
     log.info(f"  Blocksize: {STT_BLOCKSIZE}")
-    log.info(f"  Device ID: {STT_DEVICE_ID}")
-    log.info(f"  Keyword: {STT_KEYWORD}")
+    log.info(f"  Decode Blocksize: {STT_DECODE_BLOCKSIZE} (low latency: {STT_LOW_LATENCY})")
+    log.info(f"  Grammar: {'command vocabulary' if STT_USE_GRAMMAR else 'disabled'}, "
+            f"two-tier (keyword while idle): {STT_TWO_TIER}")
+    log.info(f"  Partial results: {STT_PARTIALS_ENABLED} (stable after {STT_PARTIALS_STABLE_CHUNKS} chunks, "
+            f"fire commands: {STT_PARTIALS_FIRE_COMMANDS})")
+    log.info(f"  Min Confidence: {STT_MIN_CONFIDENCE}, N-best alternatives: {STT_MAX_ALTERNATIVES}")
+    log.info(f"  STT Worker Process: {STT_WORKER_ENABLED} (CPU affinity: {STT_WORKER_CPU_AFFINITY or 'all'}, "
+            f"slots: {STT_WORKER_SLOTS})")
+    log.info(f"  Extra Sessions: {[(s['id'], s.get('device_id')) for s in STT_SESSIONS] or 'none'}")
+    log.info(f"  Endpointer: idle '{STT_ENDPOINTER_IDLE or 'vosk'}', active '{STT_ENDPOINTER_ACTIVE or 'vosk'}', "
+            f"force final {STT_FORCE_FINAL_SILENCE_MS} ms after VAD hangover")
+    log.info(f"  Device ID: {STT_DEVICE_ID} (fallback: {STT_FALLBACK_DEVICE_ID}, "
+            f"watch: {STT_DEVICE_WATCH}, every {STT_DEVICE_REFRESH_INTERVAL} s)")
+    log.info(f"  Audio Source: {STT_SOURCE_TYPE} {STT_SOURCE_PATH or ''} (realtime: {STT_SOURCE_REALTIME})")
+    log.info(f"  Audio Buffer: {STT_BUFFER_CAPACITY} blocks, overflow policy: {STT_OVERFLOW_POLICY}, "
+            f"history: {STT_HISTORY_MS} ms")
+    log.info(f"  VAD: {'enabled' if VAD_ENABLED else 'disabled'} "
+            f"(threshold {VAD_ENERGY_THRESHOLD_DB} dBFS, hangover {VAD_HANGOVER_MS} ms, pre-roll {VAD_PREROLL_MS} ms)")
+    log.info(f"  Keyword: {STT_KEYWORD} (fuzzy: {ACTIVATION_FUZZY}, max distance ratio {ACTIVATION_MAX_DISTANCE_RATIO}, "
+            f"min score {ACTIVATION_MIN_SCORE}, exact in first {ACTIVATION_SEARCH_TOKENS} words)")
     log.info(f"  Activation Sound: {ACTIVATION_SOUND_PATH}")
     log.info(f"  Command Sound: {COMMAND_SOUND_PATH}")
     log.info(f"  TTS Language: {TTS_LANGUAGE}")
@@ -268,6 +496,10 @@ def print_active_config() -> None:
     log.info(f"  TTS Voice: {TTS_VOICE}")
     log.info(f"  TTS Sample Rate: {TTS_SAMPLERATE}")
     log.info(f"  TTS Device: {TTS_DEVICE}")
+    log.info(f"  Executor Pools: {EXECUTOR_POOL_SIZES}")
+    log.info(f"  Command Matching: fuzzy {COMMAND_FUZZY_ENABLED}, min score {COMMAND_FUZZY_MIN_SCORE}, "
+            f"min margin {COMMAND_FUZZY_MIN_MARGIN}, exact only: {COMMAND_EXACT_ONLY}")
+    log.info(f"  Warm-up: {WARMUP_ENABLED} (STT {WARMUP_STT_SECONDS} s, TTS text: {WARMUP_TTS_TEXT or 'keyword'})")
     log.info(f"  Phrases to Exit: {PHRASES_TO_EXIT}")
     log.info("------------------------------------")
 
@@ -1,23 +1,32 @@
 # main_application.py
 from typing import Any, Optional, Callable, Coroutine, TYPE_CHECKING, Type
 import asyncio
+import time
 from pydub import AudioSegment
 from pydub.playback import play
 import logging
 from tempfile import NamedTemporaryFile
 import subprocess
 from zumrad_iis import config # Используем относительный импорт, если main.py часть пакета zumrad_iis
-import sounddevice as sd
+from zumrad_iis.commands.command_matcher import FuzzyCommandMatcher
 from zumrad_iis.commands.command_processor import CommandExecutor, CommandProcessor, CommandRunner, CommandTranslator
 from zumrad_iis.commands.command_vocabulary import CommandVocabulary
 from zumrad_iis.commands.register.speak import AttentionOneCommand, SpeakCommand
 from zumrad_iis.commands.register.repeat_phrases import RepeatPhrasesCommand
 from zumrad_iis.commands.register.what_time_is_it import WhatTimeIsItCommand
 from zumrad_iis.services.audio_feedback_service import AudioFeedbackService
+from zumrad_iis.services.audio_device_registry import AudioDeviceRegistry
 from zumrad_iis.services.audio_input_service import AudioInputService
-from zumrad_iis.services.avosk_stt import STTService # Импортируем конфигурацию
+from zumrad_iis.services.executor_registry import ExecutorRegistry, run_blocking
+from zumrad_iis.services.avosk_stt import RecognitionMode, STTService, STTServiceProtocol # Импортируем конфигурацию
 from zumrad_iis.core.tts_interface import ITextToSpeech
+from zumrad_iis.services.startup_orchestrator import StartupOrchestrator
+from zumrad_iis.services.stt.endpointer import EndpointerProfile
+from zumrad_iis.services.stt.recognition_events import PartialEvent, RecognitionEvent, STTResult
+from zumrad_iis.services.stt.session_manager import SessionManager
 from zumrad_iis.services.stt.speech_recognizer import SpeechRecognizer
+from zumrad_iis.services.stt.stt_worker import ProcessSTTService
+from zumrad_iis.services.stt.voice_activity_detector import VoiceActivityDetector
 from zumrad_iis.tts_implementations.async_silero_tts import AsyncSileroTTS
 from zumrad_iis.services.activation_service import ActivationService
 from zumrad_iis.services.command_service import CommandService
@@ -45,39 +54,136 @@ class VoiceAssistant:
         # self.config: "config_module_type" = config_module
         # Инстанцирование сервисов
 
+        # Пулы потоков подсистем вместо общего исполнителя цикла событий
+        self.executors = ExecutorRegistry(config.EXECUTOR_POOL_SIZES)
+        # Общий для захвата и воспроизведения речи: учитывает открытые потоки PortAudio
+        self.device_registry = AudioDeviceRegistry(config.STT_DEVICE_REFRESH_INTERVAL)
+
         self.audio_in: AudioInputService = AudioInputService(
             config.STT_SAMPLERATE,
             config.STT_BLOCKSIZE,
             config.STT_DEVICE_ID,
-            config.STT_CHANNELS
+            config.STT_CHANNELS,
+            source = config.STT_SOURCE_TYPE,
+            source_path = config.STT_SOURCE_PATH,
+            source_realtime = config.STT_SOURCE_REALTIME,
+            buffer_capacity = config.STT_BUFFER_CAPACITY,
+            overflow_policy = config.STT_OVERFLOW_POLICY,
+            capture_samplerate = config.STT_CAPTURE_SAMPLERATE,
+            history_ms = config.STT_HISTORY_MS,
+            device_registry = self.device_registry,
+            fallback_device_id = config.STT_FALLBACK_DEVICE_ID,
+            watch_devices = config.STT_DEVICE_WATCH,
+            stall_timeout = config.STT_DEVICE_STALL_TIMEOUT
                                         )
-        self.stt = STTService(model_path = config.STT_MODEL_PATH,
-                                audio_input = self.audio_in,
-                                sample_rate = config.STT_SAMPLERATE
+        # Ключевое слово ищется одинаково при активации и в распознавателе (two_tier, ранняя активация)
+        self.activation_service = ActivationService(config.STT_KEYWORD,
+                                                    config.ACTIVATION_FUZZY,
+                                                    config.ACTIVATION_MAX_DISTANCE_RATIO,
+                                                    config.ACTIVATION_SEARCH_TOKENS,
+                                                    config.ACTIVATION_MIN_SCORE,
+                                                    config.command_vocabulary.canonicalizer)
+        stt_settings: dict[str, Any] = dict(
+                                model_path = config.STT_MODEL_PATH,
+                                sample_rate = config.STT_SAMPLERATE,
+                                vocabulary = config.command_vocabulary,
+                                keyword = config.STT_KEYWORD,
+                                use_grammar = config.STT_USE_GRAMMAR,
+                                two_tier = config.STT_TWO_TIER,
+                                emit_partials = config.STT_PARTIALS_ENABLED,
+                                partial_stable_chunks = config.STT_PARTIALS_STABLE_CHUNKS,
+                                idle_endpointer = EndpointerProfile.from_config(
+                                    config.STT_ENDPOINTER_IDLE, config.STT_ENDPOINTER_PROFILES),
+                                active_endpointer = EndpointerProfile.from_config(
+                                    config.STT_ENDPOINTER_ACTIVE, config.STT_ENDPOINTER_PROFILES),
+                                max_alternatives = config.STT_MAX_ALTERNATIVES,
+                                keyword_finder = self.activation_service.find_keyword
                             )
+        self.stt: STTServiceProtocol
+        if config.STT_WORKER_ENABLED:
+            # Декодер в отдельном процессе: не конкурирует с синтезом речи за интерпретатор
+            self.stt = ProcessSTTService(cpu_affinity = config.STT_WORKER_CPU_AFFINITY,
+                                        slots = config.STT_WORKER_SLOTS,
+                                        executors = self.executors,
+                                        **stt_settings)
+        else:
+            self.stt = STTService(audio_input = self.audio_in, executors = self.executors, **stt_settings)
+
+        # Дополнительные микрофоны (комнаты): свои распознаватели поверх общей модели
+        self._stt_settings: dict[str, Any] = stt_settings
+        self.session_manager: Optional[SessionManager] = \
+            SessionManager(self.executors) if config.STT_SESSIONS else None
+        self.session_inputs: dict[str, AudioInputService] = {
+            session["id"]: AudioInputService(
+                config.STT_SAMPLERATE,
+                config.STT_BLOCKSIZE,
+                session.get("device_id"),
+                config.STT_CHANNELS,
+                buffer_capacity = config.STT_BUFFER_CAPACITY,
+                capture_samplerate = config.STT_CAPTURE_SAMPLERATE,
+                history_ms = config.STT_HISTORY_MS, # Повтор сказанного после ключевого слова, как у основного
+                device_registry = self.device_registry,
+                watch_devices = False # Переключение устройств - только у основного микрофона
+            ) for session in config.STT_SESSIONS
+        }
+        self.session_activations: dict[str, ActivationService] = {
+            session["id"]: ActivationService(config.STT_KEYWORD,
+                                            config.ACTIVATION_FUZZY,
+                                            config.ACTIVATION_MAX_DISTANCE_RATIO,
+                                            config.ACTIVATION_SEARCH_TOKENS,
+                                            config.ACTIVATION_MIN_SCORE,
+                                            config.command_vocabulary.canonicalizer)
+            for session in config.STT_SESSIONS
+        }
         
         self.speech_recognizer = SpeechRecognizer(
             audio_in = self.audio_in,
             stt = self.stt,
             ready_handler = self.speech_recognizer_ready_handler,
             recognized_text_handler = self._process_recognized_text,
-            stop_handler = self._handle_recognition_stop
+            stop_handler = self._handle_recognition_stop,
+            vad = VoiceActivityDetector(
+                samplerate = config.STT_SAMPLERATE,
+                channels = config.STT_CHANNELS,
+                energy_threshold_db = config.VAD_ENERGY_THRESHOLD_DB,
+                snr_margin_db = config.VAD_SNR_MARGIN_DB,
+                zcr_max = config.VAD_ZCR_MAX,
+                frame_ms = config.VAD_FRAME_MS,
+                min_speech_ms = config.VAD_MIN_SPEECH_MS,
+                hangover_ms = config.VAD_HANGOVER_MS,
+                preroll_ms = config.VAD_PREROLL_MS
+            ) if config.VAD_ENABLED else None,
+            decode_blocksize = config.STT_DECODE_BLOCKSIZE,
+            resume_discard_ms = config.STT_RESUME_DISCARD_MS,
+            partial_handler = self._process_partial_text if config.STT_PARTIALS_ENABLED else None,
+            force_final_silence_ms = config.STT_FORCE_FINAL_SILENCE_MS
         )
 
         self.tts_service: ITextToSpeech = AsyncSileroTTS(
             language = config.TTS_LANGUAGE, # Используем config
             model_id = config.TTS_MODEL_ID, # Используем config
             sample_rate = config.TTS_SAMPLERATE, # Используем config
+            executors = self.executors,
+            device_registry = self.device_registry, # Речь не прерывается пересканированием устройств
             
             # device=torch.device(config.TTS_DEVICE) # Если нужно передавать torch.device
         )
 
-        self.activation_service = ActivationService(config.STT_KEYWORD)
+        # Параллельная загрузка моделей, см. initialize_systems()
+        self.startup = StartupOrchestrator()
+        self._startup_report_task: Optional[asyncio.Task] = None
+
         # self.command_service = CommandService()
+        command_matcher: Optional[FuzzyCommandMatcher] = \
+            FuzzyCommandMatcher(config.command_vocabulary,
+                                config.COMMAND_FUZZY_MIN_SCORE,
+                                config.COMMAND_FUZZY_MIN_MARGIN,
+                                config.COMMAND_EXACT_ONLY) \
+            if config.COMMAND_FUZZY_ENABLED else None
         self.command_processor = CommandProcessor(
             CommandExecutor(
-                AudioFeedbackService(config.COMMAND_SOUND_PATH)), 
-                CommandTranslator(vocabulary = config.command_vocabulary))
+                AudioFeedbackService(config.COMMAND_SOUND_PATH, self.executors)), 
+                CommandTranslator(vocabulary = config.command_vocabulary, matcher = command_matcher))
 
         # self.feedback = AudioFeedbackService()
         self.external_processes_service = ExternalProcessService()
@@ -90,7 +196,7 @@ class VoiceAssistant:
 
     # Вспомогательные методы, перенесенные и адаптированные из a_main.py
     def _check_is_exit_phrase(self, text: str) -> bool:
-        cmd: str | None = config.command_vocabulary.vocabulary_map.get(text)
+        cmd: str | None = config.command_vocabulary.lookup(config.command_vocabulary.canonicalize(text))
         return cmd is not None and cmd == config.CMD_QUIT
     
     async def _play_feedback_sound(self, sound_path: str):
@@ -109,9 +215,8 @@ class VoiceAssistant:
         try:
             # Загружаем аудиофайл с помощью pydub
             sound = AudioSegment.from_file(sound_path)
-            # Воспроизводим его в отдельном потоке, чтобы не блокировать asyncio
-            loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
-            await loop.run_in_executor(None, _play_with_ffplay, sound, PLAYER)
+            # Воспроизводим его в пуле audio_io, чтобы не блокировать asyncio
+            await run_blocking(self.executors, ExecutorRegistry.AUDIO_IO, _play_with_ffplay, sound, PLAYER)
         except Exception as e:
             log.error(f"Не удалось воспроизвести звук {sound_path} с помощью {PLAYER}: {e}")
 
@@ -147,25 +252,109 @@ class VoiceAssistant:
 
     def _set_repeat_mode(self, is_repeat: bool) -> None:
         self._is_repeat = is_repeat
+        self._update_recognition_mode()
+
+    def _update_recognition_mode(self) -> None:
+        """
+        В ожидании достаточно искать ключевое слово; полное распознавание нужно
+        после активации и в режиме повтора, где повторяется любая фраза.
+        """
+        is_full: bool = self.activation_service.is_active() or self._is_repeat
+        self.speech_recognizer.set_recognition_mode(RecognitionMode.FULL if is_full else RecognitionMode.KEYWORD)
+        if self.session_manager:
+            # У каждого микрофона своя активация
+            for session_id in self.session_manager.sessions:
+                is_full = self.session_activations[session_id].is_active() or self._is_repeat
+                self.session_manager.set_mode(session_id,
+                                            RecognitionMode.FULL if is_full else RecognitionMode.KEYWORD)
 
     def _trigger_repeat_that(self):
         self._is_repeat: bool = not self._is_repeat
     
     async def initialize_systems(self) -> None:
+        """
+        Загружает модели STT и TTS параллельно и возвращается, как только готово
+        распознавание: слушать можно начинать, пока синтез речи еще загружается.
+        """
         self._setup_commands() # Зарегистрируем команды
-        # ... инициализация других систем ...
+        self.startup.add("stt", self._initialize_stt)
+        self.startup.add("tts", self._initialize_tts)
+        self.startup.start()
+        # Без распознавания работать нельзя: при ошибке загрузка TTS отменяется,
+        # отчет о запуске выводится, ошибка пробрасывается в run()
+        await self.startup.wait_required("stt")
+        # Отчет о запуске появится, когда загрузятся все компоненты
+        self._startup_report_task = asyncio.create_task(self.startup.wait_all())
+
+    async def _initialize_stt(self) -> None:
         await self.speech_recognizer.initialize() # Инициализация SpeechRecognizer
-        # await self.stt.initialize() # Инициализация STT
+        if config.WARMUP_ENABLED:
+            # Первая фраза после запуска не должна платить за "холодный" граф декодера Vosk
+            try:
+                seconds: float = await self.stt.warm_up(config.WARMUP_STT_SECONDS)
+                log.info(f"VoiceAssistant: Прогрев STT: {seconds:.2f} с.")
+            except Exception as e:
+                log.warning(f"VoiceAssistant: Прогрев STT не удался: {e}")
+        await self._open_sessions()
 
+    async def _open_sessions(self) -> None:
+        """
+        Открывает сессии дополнительных микрофонов. Модель основного распознавателя
+        (если он работает в этом процессе) не загружается второй раз.
+        Микрофон, который не удалось открыть, пропускается.
+        """
+        if not self.session_manager:
+            return
+        if isinstance(self.stt, STTService) and self.stt.model is not None:
+            self.session_manager.register_model(config.STT_MODEL_PATH, self.stt.model)
+        stt_kwargs: dict[str, Any] = {key: value for key, value in self._stt_settings.items()
+                                    if key not in ("model_path", "sample_rate", "emit_partials")}
+        for session in config.STT_SESSIONS:
+            session_id: str = session["id"]
+            audio_input: AudioInputService = self.session_inputs[session_id]
+            try:
+                await self.session_manager.open_session(session_id,
+                                                        session.get("model_path") or config.STT_MODEL_PATH,
+                                                        config.STT_SAMPLERATE,
+                                                        self._process_session_event,
+                                                        **stt_kwargs)
+                audio_input.set_event_loop(asyncio.get_running_loop())
+                audio_input.start_capture()
+                self.session_manager.attach_audio(session_id, audio_input)
+            except Exception as e:
+                log.error(f"VoiceAssistant: Сессия '{session_id}' не открыта: {e}", exc_info=True)
+                audio_input.stop_capture()
+                await self.session_manager.close_session(session_id)
+
+    async def _process_session_event(self, session_id: str, event: RecognitionEvent) -> None:
+        """
+        Фраза с дополнительного микрофона обрабатывается так же, как с основного,
+        но с активацией этого микрофона: ключевое слово в одной комнате
+        не дает выполнить команду, сказанную в другой.
+        """
+        if isinstance(event, STTResult):
+            log.info(f"VoiceAssistant: Сессия '{session_id}': {event.text}")
+            await self._process_recognized_text(event, session_id)
+
+    async def _initialize_tts(self) -> None:
         log.info("VoiceAssistant: Инициализация сервиса синтеза речи...")
         if self.tts_service and hasattr(self.tts_service, 'load_and_init_model'):
             if not await self.tts_service.load_and_init_model():
                 log.error("Не удалось инициализировать сервис синтеза речи!")
                 # self.is_running = False # Раскомментируйте, если TTS критичен для работы
-            else:
-                log.info("Сервис синтеза речи успешно инициализирован.")
+                return
+            log.info("Сервис синтеза речи успешно инициализирован.")
         else:
             log.warning("TTS service does not have 'load_and_init_model' or is None.")
+            return
+        if config.WARMUP_ENABLED and hasattr(self.tts_service, 'warm_up'):
+            # Первый вызов Silero платит за JIT-компиляцию и оптимизацию графа
+            try:
+                seconds = await self.tts_service.warm_up(
+                    config.WARMUP_TTS_TEXT or config.STT_KEYWORD, config.TTS_VOICE)
+                log.info(f"VoiceAssistant: Прогрев TTS: {seconds:.2f} с.")
+            except Exception as e:
+                log.warning(f"VoiceAssistant: Прогрев TTS не удался: {e}")
 
     async def say(self, text: str, voice: Optional[str] = None):
         if await self.tts_service.is_ready():
@@ -183,11 +372,19 @@ class VoiceAssistant:
             print(Fore.RED + Back.YELLOW + Style.BRIGHT +f"{ps[0]}{config.STT_KEYWORD.capitalize()}{ps[1]}")
 
     # TODO: нужно подумать над улучшением обработки команд в этом методе, чтобы она стала более гибкой.
-    async def _process_recognized_text(self, recognized_text: str):
+    async def _process_recognized_text(self, result: STTResult, session_id: Optional[str] = None):
         """
         Эта корутина выполняется в основном цикле asyncio и обрабатывает распознанный текст.
+        `session_id` - дополнительный микрофон, с которого пришла фраза (None - основной):
+        активация и пауза захвата у каждого микрофона свои.
         """
-        log.debug(f"MainLoop CB <<: {recognized_text}")
+        activation: ActivationService = self._activation(session_id)
+        recognized_text: str = result.text
+        log.debug(f"MainLoop CB <<: {result}")
+        if result.confidence < config.STT_MIN_CONFIDENCE:
+            log.info(f"VoiceAssistant: Фраза '{recognized_text}' отброшена: "
+                    f"уверенность {result.confidence:.2f} ниже {config.STT_MIN_CONFIDENCE}.")
+            return
         
         if self._check_is_exit_phrase(recognized_text):
             log.debug("VoiceAssistant: Terminating work on exit command...")
@@ -199,25 +396,31 @@ class VoiceAssistant:
             return
         
         if self._is_repeat:
-            self.speech_recognizer.pause()
+            self._pause_input(session_id)
             log.debug("Pause Speech Recognition")
             await self.say(recognized_text)
-            # Добавляем небольшую паузу, чтобы аудиодрайвер успел освободить устройство перед возобновлением захвата.
-            await asyncio.sleep(0.1)
-            self.speech_recognizer.resume()
+            # Поток устройства не закрывался на время паузы, ждать освобождения драйвера не нужно.
+            self._resume_input(session_id)
             log.debug("Resume Speech Recognition")
         is_command_was_executed: bool = False  
-        if self.activation_service.is_active():
+        # Менее вероятные гипотезы (N-best) пробуются, если лучшая не является командой
+        alternatives: list[str] = [activation.strip_keyword(text) for text, _ in result.alternatives[1:]]
+        if activation.is_active():
+            # После ранней активации по промежуточной гипотезе фраза приходит целиком, с ключевым словом
+            recognized_text = activation.strip_keyword(recognized_text)
+            if not recognized_text:
+                return
             # Если self.command_service.execute_command может быть долгим,
             # его также стоит запускать через await asyncio.to_thread(...)
             # command_executed: bool = self.command_service.execute_command(recognized_text)
-            is_command_was_executed = await self.command_processor.process(recognized_text)
+            is_command_was_executed = await self.command_processor.process(recognized_text, alternatives)
             if is_command_was_executed:
                 log.info(f"VoiceAssistant: Команда '{recognized_text}' выполнена.")
                 print(Fore.BLUE + Back.GREEN + Style.BRIGHT + 
                       f"{config.interactive_dictionary[config.ITR_COMMAND_IS_DEFINED]} [{recognized_text}]")
-                self.activation_service.deactivate()
-                self.audio_in.clear_queue()
+                activation.deactivate()
+                self._update_recognition_mode()
+                self._input(session_id).clear_queue()
             else:
                 log.warning(f"Command is undefined: {recognized_text}")
                 print(Fore.GREEN + Back.RED + Style.BRIGHT + 
@@ -225,22 +428,24 @@ class VoiceAssistant:
                 # await self.say("Команда не распознана.", voice=config.TTS_VOICE)
         else: # Система не активирована
             processed_text_after_keyword: str | None = \
-                self.activation_service.check_and_trigger_activation(recognized_text)
+                activation.check_and_trigger_activation(recognized_text)
             
-            if self.activation_service.is_active(): # Если только что активировалась
-                await self._play_feedback_sound(config.ACTIVATION_SOUND_PATH)
-                self.audio_in.clear_queue()
+            if activation.is_active(): # Если только что активировалась
+                log.debug(f"VoiceAssistant: Ключевое слово: {activation.last_match}")
+                await self._on_activated(session_id)
 
                 if processed_text_after_keyword:
                     log.info(f"VoiceAssistant: Команда после активации: {processed_text_after_keyword}")
                     # command_executed = self.command_service.execute_command(processed_text_after_keyword)
                     
-                    is_command_was_executed = await self.command_processor.process(processed_text_after_keyword)
+                    is_command_was_executed = await self.command_processor.process(
+                        processed_text_after_keyword, alternatives)
                     if is_command_was_executed:
                         print(Fore.BLUE + Back.GREEN + Style.BRIGHT + 
                             f"{config.interactive_dictionary[config.ITR_COMMAND_IS_DEFINED]} [{processed_text_after_keyword}]")
-                        self.activation_service.deactivate()
-                        self.audio_in.clear_queue()
+                        activation.deactivate()
+                        self._update_recognition_mode()
+                        self._input(session_id).clear_queue()
                     else:
                         log.warning(f"Command is undefined after activation: {processed_text_after_keyword}")
                         print(Fore.GREEN + Back.RED + Style.BRIGHT + 
@@ -251,6 +456,67 @@ class VoiceAssistant:
                     log.info(f"VoiceAssistant: Ключевое слово '{config.STT_KEYWORD}' распознано! Жду вашу команду...")
                     # await self.say("Слушаю.", voice=config.TTS_VOICE)
 
+    async def _on_activated(self, session_id: Optional[str] = None) -> None:
+        self._update_recognition_mode()
+        # Пока звучит сигнал, аудио копится в истории захвата. Затем распознаватель
+        # получает все, что было сказано после ключевого слова, кроме самого сигнала.
+        self._pause_input(session_id)
+        sound_started: float = time.monotonic()
+        await self._play_feedback_sound(config.ACTIVATION_SOUND_PATH)
+        self._resume_input(session_id, replay = True,
+                        skip_interval = (sound_started, time.monotonic()))
+
+    def _activation(self, session_id: Optional[str]) -> ActivationService:
+        return self.session_activations[session_id] if session_id else self.activation_service
+
+    def _input(self, session_id: Optional[str]) -> AudioInputService:
+        return self.session_inputs[session_id] if session_id else self.audio_in
+
+    def _pause_input(self, session_id: Optional[str]) -> None:
+        if session_id:
+            self.session_inputs[session_id].pause_capture()
+        else:
+            self.speech_recognizer.pause()
+
+    def _resume_input(self,
+                    session_id: Optional[str],
+                    replay: bool = False,
+                    skip_interval: Optional[tuple[float, float]] = None) -> None:
+        if session_id:
+            self.session_inputs[session_id].resume_capture(replay = replay, skip_interval = skip_interval)
+        else:
+            self.speech_recognizer.resume(replay = replay, skip_interval = skip_interval)
+
+    async def _process_partial_text(self, event: PartialEvent):
+        """
+        Обрабатывает промежуточную гипотезу: активирует ассистента, как только в ней
+        появилось ключевое слово, и выполняет команду, как только стабильная гипотеза
+        совпала с фразой словаря, не дожидаясь конца фразы.
+        """
+        log.debug(f"MainLoop CB << (partial): {event.text}")
+        if self._is_repeat:
+            return
+        if not self.activation_service.is_active():
+            self.activation_service.check_and_trigger_activation(event.text)
+            if self.activation_service.is_active():
+                log.info(f"VoiceAssistant: Ключевое слово '{config.STT_KEYWORD}' найдено в промежуточной гипотезе.")
+                await self._on_activated()
+            return
+        if not event.is_stable or not config.STT_PARTIALS_FIRE_COMMANDS:
+            return
+        command_text: str = self.activation_service.strip_keyword(event.text)
+        if not command_text or self.command_processor.translator.translate(command_text) is None:
+            return
+        # Окончательный результат этой фразы уже не нужен
+        self.speech_recognizer.consume_utterance(event.utterance_id)
+        if await self.command_processor.process(command_text):
+            log.info(f"VoiceAssistant: Команда '{command_text}' выполнена по промежуточной гипотезе.")
+            print(Fore.BLUE + Back.GREEN + Style.BRIGHT + 
+                  f"{config.interactive_dictionary[config.ITR_COMMAND_IS_DEFINED]} [{command_text}]")
+            self.activation_service.deactivate()
+            self._update_recognition_mode()
+            self.audio_in.clear_queue()
+
     async def run(self):
         log.info("VoiceAssistant: Запуск основного приложения...")
         
@@ -280,11 +546,18 @@ class VoiceAssistant:
     
     async def _handle_recognition_stop(self):
         # ... остановка других сервисов ...
+        self.startup.cancel() # Модели, которые еще загружаются, уже не нужны
+        if self.session_manager:
+            for audio_input in self.session_inputs.values():
+                audio_input.stop_capture()
+            await self.session_manager.close()
         if self.tts_service and hasattr(self.tts_service, 'is_ready') and await self.tts_service.is_ready():
             await self.tts_service.destroy()
             log.info("Сервис синтеза речи остановлен.")
         else:
             log.info("Сервис синтеза речи не был инициализирован или уже остановлен.")
+        self.executors.log_stats()
+        self.executors.shutdown(wait=False)
 
 async def main():
     # Настройка логирования должна быть здесь, если run.py не используется как точка входа
@@ -295,12 +568,8 @@ async def main():
     )
     # 1. Загружаем конфигурацию из файла.
     config.load_and_apply_config()
-
-    # 2. Устанавливаем глобальные настройки для sounddevice, чтобы избежать конфликтов
-    # между потоками ввода и вывода. Это решает проблему "проглатывания" звука.
-    sd.default.samplerate = config.TTS_SAMPLERATE  # type: ignore
-    sd.default.channels = config.STT_CHANNELS      # type: ignore
-    log.info(f"Для стабильности работы все аудиопотоки будут использовать единую частоту: {sd.default.samplerate} Гц")
+    # Глобальные sd.default не трогаем: захват открывается на родной частоте устройства
+    # и ресемплируется в AudioInputService, воспроизведение использует частоту TTS.
 
     assistant = VoiceAssistant()
     # Основная логика запуска. Обработка исключений перенесена на уровень выше.
@@ -1,11 +1,33 @@
 from typing import Optional
 from zumrad_iis import config
+from zumrad_iis.commands.text_canonicalizer import TextCanonicalizer
+from zumrad_iis.services.wake_word_matcher import WakeWordMatch, WakeWordMatcher
 
 
 class ActivationService:
-    def __init__(self, keyword:str) -> None:
+    """
+    Активация ассистента ключевым словом.
+
+    С `fuzzy` ключевое слово ищется нечетко (WakeWordMatcher): с учетом искажений
+    распознавания и разбиения на несколько слов; неточное совпадение - только в начале фразы.
+    Без `fuzzy` фраза должна начинаться с ключевого слова буквально.
+    С `canonicalizer` ключевое слово и фраза сравниваются в канонической форме,
+    а текст после ключевого слова возвращается канонизированным.
+    """
+    def __init__(self,
+                keyword:str,
+                fuzzy: bool = True,
+                max_distance_ratio: float = 0.2,
+                search_tokens: int = 3,
+                min_score: float = 0.8,
+                canonicalizer: Optional[TextCanonicalizer] = None) -> None:
+        self._canonicalizer: Optional[TextCanonicalizer] = canonicalizer
+        keyword = self._canonicalize(keyword)
         self._keyword:str = keyword.lower() # Храним ключевое слово в нижнем регистре
         self._is_active:bool = False
+        self._matcher: Optional[WakeWordMatcher] = \
+            WakeWordMatcher(keyword, max_distance_ratio, search_tokens, min_score) if fuzzy else None
+        self.last_match: Optional[WakeWordMatch] = None # Последнее найденное ключевое слово
 
     def is_active(self) -> bool:
         return self._is_active
@@ -16,15 +38,36 @@ class ActivationService:
     def deactivate(self) -> None:
         self._is_active = False
 
+    def _canonicalize(self, text: str) -> str:
+        return self._canonicalizer.canonicalize(text) if self._canonicalizer else text
+
+    def find_keyword(self, text: str) -> Optional[WakeWordMatch]:
+        """Ищет ключевое слово в тексте; возвращает совпадение с оценкой и текстом после него."""
+        text = self._canonicalize(text)
+        if self._matcher:
+            return self._matcher.match(text)
+        processed_text = text.lower()
+        if processed_text.startswith(self._keyword):
+            return WakeWordMatch(1.0, 0, 0, 1, processed_text[len(self._keyword):].strip())
+        return None
+
     def check_and_trigger_activation(self, text:str) -> Optional[str]:
         """
         Проверяет, содержит ли текст ключевое слово активации.
         Если да, активирует сервис и возвращает текст после ключевого слова.
         Возвращает None, если ключевое слово не найдено или после него нет текста.
+        Оценка совпадения сохраняется в `last_match`.
         """
-        processed_text = text.lower()
-        if processed_text.startswith(self._keyword):
+        match: Optional[WakeWordMatch] = self.find_keyword(text)
+        if match:
+            self.last_match = match
             self.activate()
-            command_part = processed_text[len(self._keyword):].strip()
-            return command_part if command_part else None # Возвращаем часть команды или None, если только ключевое слово
-        return None
\ No newline at end of file
+            return match.remainder if match.remainder else None # Возвращаем часть команды или None, если только ключевое слово
+        return None
+
+    def strip_keyword(self, text: str) -> str:
+        """Возвращает текст без ключевого слова в начале."""
+        match: Optional[WakeWordMatch] = self.find_keyword(text)
+        if match:
+            return match.remainder
+        return text
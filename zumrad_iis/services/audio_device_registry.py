@@ -0,0 +1,176 @@
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import sounddevice as sd
+
+log: logging.Logger = logging.getLogger(__name__)
+
+# Вызывается из потока реестра на каждом опросе; аргумент - изменился ли список устройств
+DevicesListener = Callable[[bool], None]
+
+
+class AudioDeviceRegistry:
+    """
+    Кэш списка аудиоустройств с фоновым обновлением.
+
+    `sd.query_devices()` опрашивает PortAudio, поэтому результат кэшируется,
+    а фоновый поток "zumrad-audio-devices" периодически обновляет его
+    и сообщает слушателям об изменениях (подключение/отключение устройств).
+
+    PortAudio видит новые устройства только после переинициализации, а она
+    закрывает все потоки PortAudio процесса, в том числе воспроизведение речи.
+    Поэтому владельцы потоков отмечают их в реестре (`open_stream()`/`close_stream()`
+    или `with registry.stream():`), и `refresh(rescan=True)` переинициализирует
+    PortAudio, только когда ни один поток не открыт; иначе список не пересканируется.
+    Пока идет переинициализация, новые потоки ждут ее окончания.
+
+    :param refresh_interval: Период фонового обновления, секунды.
+    """
+    REFRESH_INTERVAL: float = 2.0
+
+    def __init__(self, refresh_interval: float = REFRESH_INTERVAL) -> None:
+        self.refresh_interval: float = refresh_interval
+        self._devices: Optional[List[Dict[str, Any]]] = None
+        self._signature: Tuple[Tuple[str, int], ...] = ()
+        self._lock = threading.Lock()
+        self._listeners: List[DevicesListener] = []
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._streams = threading.Condition() # Открытые потоки PortAudio и переинициализация
+        self._open_streams: int = 0
+        self._is_rescanning: bool = False
+        self.rescans: int = 0 # Сколько раз PortAudio переинициализирован: по нему видно, что список свежий
+
+    def open_stream(self) -> None:
+        """Отмечает открытие потока PortAudio; ждет, если сейчас идет переинициализация."""
+        with self._streams:
+            self._streams.wait_for(lambda: not self._is_rescanning)
+            self._open_streams += 1
+
+    def close_stream(self) -> None:
+        with self._streams:
+            self._open_streams = max(0, self._open_streams - 1)
+
+    @contextmanager
+    def stream(self) -> Iterator[None]:
+        """Поток PortAudio на время блока (например, воспроизведение sd.play)."""
+        self.open_stream()
+        try:
+            yield
+        finally:
+            self.close_stream()
+
+    def _rescan(self) -> bool:
+        """Переинициализирует PortAudio, если ни один поток не открыт."""
+        if not (hasattr(sd, "_terminate") and hasattr(sd, "_initialize")):
+            return False
+        with self._streams:
+            if self._open_streams:
+                log.info(f"AudioDeviceRegistry: Открыто потоков PortAudio: {self._open_streams}, "
+                        f"список устройств не пересканирован.")
+                return False
+            self._is_rescanning = True
+        try:
+            sd._terminate()
+            sd._initialize()
+        finally:
+            with self._streams:
+                self._is_rescanning = False
+                self._streams.notify_all()
+        self.rescans += 1
+        return True
+
+    def devices(self) -> List[Dict[str, Any]]:
+        """Кэшированный список устройств (при первом вызове - опрос PortAudio)."""
+        if self._devices is None:
+            self.refresh()
+        return self._devices or []
+
+    def input_devices(self) -> List[Tuple[int, Dict[str, Any]]]:
+        return [(i, d) for i, d in enumerate(self.devices()) if d.get("max_input_channels", 0) > 0]
+
+    def is_input(self, device_id: int) -> bool:
+        devices: List[Dict[str, Any]] = self.devices()
+        return 0 <= device_id < len(devices) and devices[device_id].get("max_input_channels", 0) > 0
+
+    def name_of(self, device_id: Optional[int]) -> Optional[str]:
+        if device_id is None:
+            device_id = self.default_input()
+        if device_id is None or not self.is_input(device_id):
+            return None
+        return self.devices()[device_id].get("name")
+
+    def find_input(self, name: str) -> Optional[int]:
+        """Номер устройства ввода по имени: после переинициализации PortAudio номера меняются."""
+        for i, device in self.input_devices():
+            if device.get("name") == name:
+                return i
+        return None
+
+    def default_input(self) -> Optional[int]:
+        """Устройство ввода по умолчанию, а если его нет - первое доступное."""
+        try:
+            index: int = int(sd.query_devices(kind="input")["index"])  # type: ignore[index]
+            if self.is_input(index):
+                return index
+        except Exception:
+            pass
+        inputs = self.input_devices()
+        return inputs[0][0] if inputs else None
+
+    def refresh(self, rescan: bool = False) -> bool:
+        """
+        Обновляет кэш и возвращает True, если список устройств изменился.
+
+        Args:
+            rescan: Переинициализировать PortAudio, чтобы увидеть новые устройства.
+                Выполняется, только если ни один поток PortAudio не открыт.
+        """
+        with self._lock:
+            if rescan:
+                self._rescan()
+            try:
+                devices: List[Dict[str, Any]] = [dict(d) for d in sd.query_devices()]  # type: ignore[union-attr]
+            except Exception as e:
+                log.warning(f"AudioDeviceRegistry: Не удалось получить список устройств: {e}")
+                devices = []
+            signature = tuple((d.get("name", ""), d.get("max_input_channels", 0)) for d in devices)
+            changed: bool = self._devices is not None and signature != self._signature
+            self._devices, self._signature = devices, signature
+        if changed:
+            log.info(f"AudioDeviceRegistry: Список устройств изменился, устройств ввода: {len(self.input_devices())}.")
+        return changed
+
+    def log_devices(self) -> None:
+        log.info("Доступные устройства для захвата голоса:")
+        for i, device in self.input_devices():
+            log.info(f"{i}: {device.get('name', '')}")
+
+    def add_listener(self, listener: DevicesListener) -> None:
+        if listener not in self._listeners:
+            self._listeners.append(listener)
+
+    def start(self) -> None:
+        """Запускает фоновое обновление."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="zumrad-audio-devices", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join()
+        self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop_event.wait(self.refresh_interval):
+            changed: bool = self.refresh()
+            for listener in self._listeners:
+                try:
+                    listener(changed)
+                except Exception as e:
+                    log.error(f"AudioDeviceRegistry: Ошибка в обработчике изменения устройств: {e}")
@@ -5,6 +5,9 @@ from pydub.playback import play
 import asyncio
 from tempfile import NamedTemporaryFile
 import subprocess
+from typing import Optional
+
+from zumrad_iis.services.executor_registry import ExecutorRegistry, run_blocking
 
 
 log: logging.Logger = logging.getLogger(__name__) 
@@ -36,8 +39,9 @@ class AudioFeedbackService:
     """
     Сервис для воспроизведения звуковых сигналов обратной связи.
     """
-    def __init__(self, sound_path: str) -> None:
+    def __init__(self, sound_path: str, executors: Optional[ExecutorRegistry] = None) -> None:
         self.sound_path: str = sound_path
+        self.executors: Optional[ExecutorRegistry] = executors # Пул audio_io; без реестра - исполнитель по умолчанию
 
     async def play_sound(self, sound_path: str):
         log.debug(f"Playing sound: {sound_path}")
@@ -55,8 +59,7 @@ class AudioFeedbackService:
         try:
             # Load audio file by `pydub`
             sound = AudioSegment.from_file(sound_path)
-            # Воспроизводим его в отдельном потоке, чтобы не блокировать asyncio
-            loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
-            await loop.run_in_executor(None, _play_with_ffplay, sound, PLAYER)
+            # Воспроизводим его в пуле audio_io, чтобы не блокировать asyncio
+            await run_blocking(self.executors, ExecutorRegistry.AUDIO_IO, _play_with_ffplay, sound, PLAYER)
         except Exception as e:
             log.error(f"Не удалось воспроизвести звук {sound_path} с помощью {PLAYER}: {e}")
@@ -0,0 +1,83 @@
+import logging
+from typing import Iterator, Optional, Tuple
+
+import numpy as np
+
+log: logging.Logger = logging.getLogger(__name__)
+
+
+class AudioHistoryBuffer:
+    """
+    История захвата: последние `duration_ms` аудио (PCM int16) с привязкой ко времени.
+
+    В отличие от AudioRingBuffer, блоки из истории не вычитываются потребителем:
+    она просто хранит все, что слышал микрофон, включая время паузы.
+    Каждая запись запоминает момент времени конца блока (`time.monotonic()`),
+    что позволяет переводить время в номер кадра и повторно подать
+    в распознаватель аудио за нужный интервал.
+
+    Пишет только поток колбэка захвата.
+
+    :param samplerate: Частота дискретизации.
+    :param channels: Количество перемежающихся каналов.
+    :param duration_ms: Глубина истории.
+    """
+    def __init__(self, samplerate: int, channels: int, duration_ms: int) -> None:
+        self.samplerate: int = samplerate
+        self.channels: int = channels
+        self.capacity_frames: int = max(1, samplerate * duration_ms // 1000)
+        self._data: np.ndarray = np.zeros((self.capacity_frames, channels), dtype=np.int16)
+        self._written: int = 0          # Всего записано кадров
+        self._written_at: float = 0.0   # Момент времени конца последнего блока
+
+    @property
+    def written_frames(self) -> int:
+        return self._written
+
+    @property
+    def oldest_frame(self) -> int:
+        """Номер самого старого кадра, который еще хранится в истории."""
+        return max(0, self._written - self.capacity_frames)
+
+    def write(self, block, timestamp: float) -> None:
+        """Добавляет блок PCM int16, закончившийся в момент `timestamp`."""
+        samples: np.ndarray = np.frombuffer(block, dtype=np.int16).reshape(-1, self.channels)
+        frames: int = len(samples)
+        if frames >= self.capacity_frames:
+            samples = samples[-self.capacity_frames:]
+        start: int = (self._written + frames - len(samples)) % self.capacity_frames
+        first: int = min(len(samples), self.capacity_frames - start)
+        self._data[start:start + first] = samples[:first]
+        self._data[:len(samples) - first] = samples[first:]
+        self._written += frames
+        self._written_at = timestamp
+
+    def frame_at(self, timestamp: float) -> int:
+        """Переводит момент времени в номер кадра (по времени последней записи)."""
+        frame: int = self._written - round((self._written_at - timestamp) * self.samplerate)
+        return min(self._written, max(self.oldest_frame, frame))
+
+    def read(self, start_frame: int,
+            skip: Optional[Tuple[int, int]] = None,
+            chunk_frames: int = 0,
+            end_frame: Optional[int] = None) -> Iterator[np.ndarray]:
+        """
+        Отдает аудио от кадра `start_frame` до кадра `end_frame` (None - до конца истории)
+        кусками не длиннее `chunk_frames` (0 - без ограничения), пропуская кадры
+        из интервала `skip` [начало, конец).
+        Выданные массивы - срезы истории, валидные до следующей записи.
+        """
+        start_frame = max(start_frame, self.oldest_frame)
+        end: int = self._written if end_frame is None else min(end_frame, self._written)
+        ranges: Tuple[Tuple[int, int], ...] = ((start_frame, end),)
+        if skip:
+            ranges = ((start_frame, min(skip[0], end)), (max(skip[1], start_frame), end))
+        for begin, end in ranges:
+            step: int = chunk_frames or (end - begin)
+            while begin < end:
+                size: int = min(step, end - begin)
+                offset: int = begin % self.capacity_frames
+                if offset + size > self.capacity_frames:
+                    size = self.capacity_frames - offset
+                yield self._data[offset:offset + size].reshape(-1)
+                begin += size
@@ -1,60 +1,211 @@
 import logging
-from typing import Optional
+import threading
+from itertools import islice
+from time import monotonic
+from typing import Optional, Tuple
 import asyncio
 import sounddevice as sd
+from zumrad_iis.services.audio_device_registry import AudioDeviceRegistry
+from zumrad_iis.services.audio_history_buffer import AudioHistoryBuffer
+from zumrad_iis.services.audio_resampler import PolyphaseResampler
+from zumrad_iis.services.audio_ring_buffer import AudioRingBuffer, OverflowPolicy
+from zumrad_iis.services.audio_sources import AudioSource, FileAudioSource
 
 log: logging.Logger = logging.getLogger(__name__) 
 
 
 class AudioInputService:
     DATA_FORMAT: str = "int16"  # Тип данных для аудиопотока
+    BUFFER_CAPACITY: int = 64   # Количество блоков в кольцевом буфере по умолчанию
+    SOURCE_DEVICE: str = "device"  # Захват с микрофона через sd.RawInputStream
+    SOURCE_FILE: str = "file"      # Воспроизведение WAV / сырого PCM / именованного канала
+    STALL_TIMEOUT: float = 2.0     # Секунд без колбэков, после которых устройство считается потерянным
     """
     Сервис для захвата аудиоданных с микрофона.
     Использует библиотеку sounddevice для захвата аудио в реальном времени.
+    Вместо микрофона может читать аудио из файла (см. FileAudioSource).
+
+    Устройство открывается на его собственной частоте (или на `capture_samplerate`),
+    а аудио приводится к частоте `samplerate` модели STT ресемплером
+    прямо в колбэке захвата. Потребители всегда получают аудио с частотой `samplerate`.
+
+    Список устройств берется из кэша AudioDeviceRegistry. Если устройство
+    пропало (поток остановился или колбэки перестали приходить), захват
+    переключается на резервное устройство без перезапуска приложения
+    и перезагрузки моделей. Автоматически обратно на основное устройство
+    захват не переключается: PortAudio не видит переподключенное устройство
+    без переинициализации, а она невозможна при открытом потоке захвата.
+    Вернуться на основное устройство можно вызовом reselect_device().
     """
-    def __init__(self, samplerate:int, blocksize:int, device_id:int | None, channels:int) -> None:
-        self.samplerate: int = samplerate
+    def __init__(self, samplerate:int, blocksize:int, device_id:int | None, channels:int,
+                source: str = SOURCE_DEVICE,
+                source_path: Optional[str] = None,
+                source_realtime: bool = True,
+                buffer_capacity: int = BUFFER_CAPACITY,
+                overflow_policy: str = OverflowPolicy.DROP_OLDEST,
+                capture_samplerate: Optional[int] = None,
+                history_ms: int = 0,
+                device_registry: Optional[AudioDeviceRegistry] = None,
+                fallback_device_id: Optional[int] = None,
+                watch_devices: bool = True,
+                stall_timeout: float = STALL_TIMEOUT) -> None:
+        self.samplerate: int = samplerate # Частота, которую получают потребители (частота модели STT)
         self.blocksize: int = blocksize
+        # Частота устройства. None - родная частота устройства, определяется при запуске захвата
+        self.requested_capture_samplerate: Optional[int] = capture_samplerate
+        self.capture_samplerate: int = capture_samplerate or samplerate
+        self._resampler: Optional[PolyphaseResampler] = None
         self.device_id: int | None = device_id
         self.channels: int = channels
-        self.audio_queue: asyncio.Queue = asyncio.Queue() # Меняем на asyncio.Queue
+        self.device_registry: AudioDeviceRegistry = device_registry or AudioDeviceRegistry()
+        self.fallback_device_id: Optional[int] = fallback_device_id # None - устройство по умолчанию
+        self.watch_devices: bool = watch_devices
+        self.stall_timeout: float = stall_timeout
+        self._current_device_id: Optional[int] = device_id # Устройство, открытое сейчас
+        self._preferred_device_name: Optional[str] = None  # Имя устройства device_id: номера меняются при переподключении
+        self._is_on_fallback: bool = False
+        # Устройство, поток которого пропал: пока PortAudio не переинициализирован
+        # (AudioDeviceRegistry.rescans), оно остается в кэше списка, но не выбирается
+        self._lost_device_name: Optional[str] = None
+        self._lost_at_rescan: int = 0
+        self._is_devices_logged: bool = False
+        self._last_callback_at: float = 0.0
+        self._stream_lock = threading.RLock() # Поток устройства пересоздается и из потока реестра устройств
+        if source not in (AudioInputService.SOURCE_DEVICE, AudioInputService.SOURCE_FILE):
+            raise ValueError(f"Unknown audio source: '{source}'.")
+        if source == AudioInputService.SOURCE_FILE and not source_path:
+            raise ValueError("Audio source 'file' requires a path to the file.")
+        self.source: str = source
+        self.source_path: Optional[str] = source_path
+        self.source_realtime: bool = source_realtime
+        # Блоки пишутся колбэком прямо в заранее выделенный буфер, без копии в `bytes`.
+        # Буфер ограничен: пока цикл распознавания занят, память не растет,
+        # а потери учитываются согласно политике переполнения.
+        if overflow_policy == OverflowPolicy.BLOCK and source == AudioInputService.SOURCE_DEVICE:
+            log.warning("AudioInputService: Политика 'block' блокирует колбэк PortAudio, "
+                        "при переполнении устройство будет терять данные (input overflow).")
+        if source == AudioInputService.SOURCE_FILE and not source_realtime \
+                and overflow_policy != OverflowPolicy.BLOCK:
+            # Файл без темпа реального времени читается быстрее распознавания:
+            # при любой другой политике буфер переполнится и аудио будет потеряно
+            log.info(f"AudioInputService: Файл читается с максимальной скоростью, "
+                    f"политика '{overflow_policy}' заменена на 'block'.")
+            overflow_policy = OverflowPolicy.BLOCK
+        # +1 кадр в слоте: после ресемплинга длина блока может колебаться на один кадр
+        self.audio_buffer: AudioRingBuffer = AudioRingBuffer(
+            buffer_capacity, (blocksize + 1) * channels, channels, overflow_policy)
         self._loop: Optional[asyncio.AbstractEventLoop] = None
-        self._stream = None
+        self._stream: Optional[AudioSource] = None
+        self._is_capturing: bool = False
+        self._is_finished: bool = False  # Файловый источник выдал все данные
+        # Пауза без закрытия устройства: колбэк просто не пропускает блоки в буфер
+        self._is_gated: bool = False
+        self._discard_frames_left: int = 0  # Сколько кадров отбросить после возобновления
+        # История захвата пишется всегда, даже на паузе: после паузы ее можно
+        # повторно подать в распознаватель (см. resume_capture(replay=True))
+        self.history: Optional[AudioHistoryBuffer] = \
+            AudioHistoryBuffer(samplerate, channels, history_ms) if history_ms > 0 else None
+        self._paused_at_frame: int = 0
+        # Интервалы кадров для повтора: (начало, (начало пропуска, конец пропуска) или None)
+        self._replay: Optional[Tuple[int, Optional[Tuple[int, int]]]] = None
+        # Событие "есть данные" и флаг уже запланированного пробуждения,
+        # чтобы не ставить в цикл событий по колбэку на каждый блок.
+        # Цикл событий будится только при наличии асинхронных потребителей,
+        # поток распознавания читает блоки напрямую через read_frame().
+        self._data_ready: asyncio.Event = asyncio.Event()
+        self._is_wakeup_scheduled: bool = False
+        self._async_waiters: int = 0
 
     def set_event_loop(self, loop: asyncio.AbstractEventLoop):
         """Устанавливает цикл событий asyncio для потокобезопасных операций."""
         self._loop = loop
 
     def _consume_audio_data_callback(self, indata, frames, time, status):
+        self._last_callback_at = monotonic()
         if status:
             log.debug(status)
-        
-        if self._loop:
-            # Это потокобезопасный способ добавления элементов в asyncio.Queue
-            # из другого потока (например, того, который использует sounddevice).
-            self._loop.call_soon_threadsafe(self.audio_queue.put_nowait, bytes(indata))
+        if self._resampler:
+            indata = self._resampler.process(indata)
+            frames = len(indata) // self.channels
+        if self.history:
+            self.history.write(indata, monotonic())
+        if self._is_gated:
+            return
+        if self._discard_frames_left > 0:
+            self._discard_frames_left -= frames
+            return
+
+        if self._replay is not None and self.history:
+            # Повтор выполняется в потоке колбэка, поэтому между историей
+            # и живыми блоками нет ни пропусков, ни повторов
+            self._replay_history(self.history, self._replay)
         else:
-            log.warning("AudioInputService: Цикл событий не установлен. Аудиоданные могут быть потеряны.")
+            self.audio_buffer.write(indata)
+        if self._async_waiters and self._loop:
+            # Будим ожидающих в цикле событий не чаще одного раза на пачку блоков:
+            # пока пробуждение не обработано, новые блоки просто копятся в буфере.
+            if not self._is_wakeup_scheduled:
+                self._is_wakeup_scheduled = True
+                self._loop.call_soon_threadsafe(self._wakeup)
+
+    def _replay_history(self, history: AudioHistoryBuffer, replay: Tuple[int, Optional[Tuple[int, int]]]) -> None:
+        """
+        Подает в буфер очередную порцию повтора из истории.
+
+        Пока повтор не закончен, живые блоки в буфер напрямую не пишутся:
+        они уже есть в истории и будут поданы следом за аудио паузы.
+        За один колбэк в буфер пишется не больше блоков, чем в нем свободно,
+        поэтому повтор не вытесняет сам себя из небольшого буфера
+        (low_latency), а догоняет живой звук за несколько колбэков.
+        """
+        cursor, skip = replay
+        if cursor < history.oldest_frame:
+            log.warning(f"AudioInputService: История не хранит начало повтора, потеряно "
+                        f"{(history.oldest_frame - cursor) / self.samplerate:.2f} s.")
+            cursor = history.oldest_frame
+        if skip and cursor >= skip[0]:
+            cursor, skip = max(cursor, skip[1]), None
+        end: int = skip[0] if skip else history.written_frames
+        free_blocks: int = self.audio_buffer.capacity - len(self.audio_buffer)
+        for chunk in islice(history.read(cursor, None, self.blocksize, end), free_blocks):
+            self.audio_buffer.write(chunk)
+            cursor += len(chunk) // self.channels
+        if skip and cursor >= skip[0]:
+            cursor, skip = max(cursor, skip[1]), None
+        self._replay = (cursor, skip) if cursor < history.written_frames else None
+
+    def _wakeup(self) -> None:
+        self._is_wakeup_scheduled = False
+        self._data_ready.set()
+
+    def _on_source_finished(self) -> None:
+        """Вызывается из потока источника, когда файл прочитан до конца."""
+        log.info("AudioInputService: Источник аудио исчерпан.")
+        self._is_finished = True
+        self.audio_buffer.interrupt()
+        if self._loop:
+            self._loop.call_soon_threadsafe(self._wakeup)
 
     def check_capture_device(self):
-        devices = sd.query_devices()
-        name:str = ""
-        log.info(f"Доступные устройства для захвата голоса:")
-        if devices:
-            for i, device in enumerate(devices):
-                name = device.get("name", "") if isinstance(device, dict) else str(device)
-                log.info(f"{i}: {name}")
-        if self.device_id is not None and self.device_id >= len(devices):
-            log.info(f"Устройство с ID {self.device_id} не найдено.")
-            exit(1)
-        current_device = sd.query_devices(self.device_id, 'input')
-        if current_device:
-            name = current_device.get("name", "") if isinstance(current_device, dict) else str(current_device)
-            log.info(f"Используется устройство: {name}")
-            
+        if self.source == AudioInputService.SOURCE_FILE:
+            log.info(f"Источник аудио: файл '{self.source_path}', "
+                    f"{'в реальном времени' if self.source_realtime else 'с максимальной скоростью'}. "
+                    f"Частота дискретизации: {self.samplerate}, "
+                    f"Размер блока: {self.blocksize}, "
+                    f"Каналы: {self.channels}")
+            return
+        if not self._is_devices_logged:
+            # Список устройств выводится один раз, дальше используется кэш реестра
+            self.device_registry.log_devices()
+            self._is_devices_logged = True
+        self._current_device_id = self._resolve_device()
+        log.info(f"Используется устройство: {self.device_registry.name_of(self._current_device_id)}")
+
+        self._configure_capture_rate()
         log.info(f"Используемые параметры захвата: "
-                f"ID устройства: {self.device_id}, "
-                f"Частота дискретизации: {self.samplerate}, "
+                f"ID устройства: {self._current_device_id}, "
+                f"Частота дискретизации: {self.capture_samplerate}"
+                f"{f' -> {self.samplerate}' if self._resampler else ''}, "
                 f"Размер блока: {self.blocksize}, "
                 f"Каналы: {self.channels}, ")
     
@@ -65,43 +216,327 @@ class AudioInputService:
         # Для простоты, можно создать поток и закрывать его в методе stop().
         # Либо, VoiceAssistant будет использовать 'with service.capture_context():'
         # Пока оставим как есть, но это место для улучшения.
-        self._stream = sd.RawInputStream(
-            samplerate=self.samplerate,
-            blocksize=self.blocksize,
-            device=self.device_id,
+        with self._stream_lock:
+            if self.source == AudioInputService.SOURCE_DEVICE:
+                self._current_device_id = self._resolve_device()
+            self._configure_capture_rate()
+            self._stream = self._create_source()
+            self._is_capturing = True
+            self._is_finished = False
+            self._is_gated = False
+            self._last_callback_at = monotonic()
+            self._stream.start()
+            self._mark_stream_opened()
+        log.info("Audio capture started.")
+        if self.source == AudioInputService.SOURCE_DEVICE and self.watch_devices:
+            self.device_registry.add_listener(self._on_devices_polled)
+            self.device_registry.start()
+
+    def _resolve_device(self) -> Optional[int]:
+        """
+        Выбирает устройство для захвата: заданное (по имени, если номера сменились),
+        иначе резервное, иначе устройство ввода по умолчанию.
+        """
+        registry: AudioDeviceRegistry = self.device_registry
+        if self.device_id is None:
+            # Устройство по умолчанию PortAudio выбирает сам
+            if registry.default_input() is None:
+                raise RuntimeError("No audio input devices available.")
+            self._is_on_fallback = False
+            return None
+        if self._preferred_device_name is None:
+            self._preferred_device_name = registry.name_of(self.device_id)
+        preferred: Optional[int] = registry.find_input(self._preferred_device_name) \
+            if self._preferred_device_name else None
+        if preferred is not None and not self._is_lost(preferred):
+            self._is_on_fallback = False
+            return preferred
+        log.warning(f"AudioInputService: Устройство с ID {self.device_id} "
+                    f"({self._preferred_device_name or 'нет в списке'}) недоступно, используется резервное.")
+        self._is_on_fallback = True
+        if self.fallback_device_id is not None and registry.is_input(self.fallback_device_id) \
+                and not self._is_lost(self.fallback_device_id):
+            return self.fallback_device_id
+        default: Optional[int] = registry.default_input()
+        if default is not None and not self._is_lost(default):
+            return default
+        for device_id, _ in registry.input_devices():
+            if not self._is_lost(device_id):
+                return device_id
+        raise RuntimeError("No audio input devices available.")
+
+    def _is_lost(self, device_id: int) -> bool:
+        return self._lost_device_name is not None \
+            and self.device_registry.name_of(device_id) == self._lost_device_name
+
+    def _mark_device_lost(self) -> None:
+        """Запоминает текущее устройство как пропавшее до следующей переинициализации PortAudio."""
+        if self._current_device_id is None:
+            return # Устройство по умолчанию выбирает PortAudio
+        self._lost_device_name = self.device_registry.name_of(self._current_device_id)
+        self._lost_at_rescan = self.device_registry.rescans
+
+    def _on_devices_polled(self, changed: bool) -> None:
+        """
+        Вызывается из потока реестра устройств: проверяет живость потока захвата,
+        а если прошлая попытка открыть устройство не удалась - повторяет ее.
+        """
+        if not self._is_capturing:
+            return
+        if self._stream is None:
+            log.info("AudioInputService: Повторная попытка открыть устройство захвата...")
+            self._restart_stream(rescan=True)
+            return
+        is_active: bool = bool(getattr(self._stream, "active", True))
+        is_stalled: bool = monotonic() - self._last_callback_at > self.stall_timeout
+        if not is_active or is_stalled:
+            log.warning("AudioInputService: Поток захвата остановился, переключение устройства...")
+            self._mark_device_lost()
+            self._restart_stream(rescan=True)
+
+    def reselect_device(self) -> None:
+        """
+        Пересоздает поток захвата с пересканированием устройств: например, чтобы
+        вернуться на переподключенное основное устройство после переключения на резервное.
+        Пересканирование пропускается, если открыт другой поток PortAudio (воспроизведение речи).
+        """
+        if self.source != AudioInputService.SOURCE_DEVICE:
+            return
+        log.info("AudioInputService: Повторный выбор устройства захвата...")
+        self._restart_stream(rescan=True)
+
+    def _mark_stream_opened(self) -> None:
+        if self.source == AudioInputService.SOURCE_DEVICE:
+            self.device_registry.open_stream()
+
+    def _mark_stream_closed(self) -> None:
+        if self.source == AudioInputService.SOURCE_DEVICE:
+            self.device_registry.close_stream()
+
+    def _restart_stream(self, rescan: bool) -> None:
+        """
+        Пересоздает поток устройства. Буферы, ресемплер и модели STT/TTS не трогаются,
+        потребители просто продолжают читать буфер.
+        """
+        with self._stream_lock:
+            if not self._is_capturing:
+                return
+            if self._stream:
+                try:
+                    self._stream.stop()
+                    self._stream.close()
+                except Exception as e:
+                    log.debug(f"AudioInputService: Ошибка при закрытии потерянного потока: {e}")
+                self._stream = None
+                self._mark_stream_closed()
+            started: float = monotonic()
+            # Поток захвата закрыт: если не идет воспроизведение, PortAudio переинициализируется
+            self.device_registry.refresh(rescan=rescan)
+            if self.device_registry.rescans > self._lost_at_rescan:
+                self._lost_device_name = None # Список устройств свежий: пропавшего в нем уже нет
+            try:
+                self._current_device_id = self._resolve_device()
+                self._configure_capture_rate()
+                self._stream = self._create_source()
+                self._last_callback_at = monotonic()
+                self._stream.start()
+                self._mark_stream_opened()
+            except Exception as e:
+                # Следующий опрос реестра повторит попытку, не выбирая это устройство
+                log.error(f"AudioInputService: Не удалось открыть устройство захвата: {e}")
+                self._mark_device_lost()
+                if self._stream:
+                    try:
+                        self._stream.close()
+                    except Exception:
+                        pass
+                self._stream = None
+                self._last_callback_at = monotonic()
+                return
+        log.info(f"AudioInputService: Захват переключен на устройство "
+                f"'{self.device_registry.name_of(self._current_device_id)}' "
+                f"за {(monotonic() - started) * 1000:.0f} мс.")
+
+    def _configure_capture_rate(self) -> None:
+        """
+        Определяет частоту захвата и при необходимости создает ресемплер.
+        Файловый источник всегда читается с частотой `samplerate`.
+        """
+        rate: int = self.samplerate
+        if self.source == AudioInputService.SOURCE_DEVICE:
+            rate = self.requested_capture_samplerate or self._query_native_samplerate()
+        self.capture_samplerate = rate
+        if self._resampler is None or self._resampler.in_rate != rate:
+            self._resampler = PolyphaseResampler(rate, self.samplerate, self.channels) \
+                if rate != self.samplerate else None
+            if self._resampler:
+                log.info(f"AudioInputService: Захват на частоте {rate} Гц с ресемплингом в {self.samplerate} Гц.")
+        elif self._resampler:
+            self._resampler.reset()
+
+    def _query_native_samplerate(self) -> int:
+        try:
+            device_id: Optional[int] = self._current_device_id
+            if device_id is None:
+                device_id = self.device_registry.default_input()
+            device = self.device_registry.devices()[device_id]  # type: ignore[index]
+            return int(device["default_samplerate"])
+        except Exception as e:
+            log.warning(f"AudioInputService: Не удалось определить частоту устройства, "
+                        f"используется {self.samplerate} Гц: {e}")
+            return self.samplerate
+
+    @property
+    def capture_blocksize(self) -> int:
+        """Размер блока устройства в кадрах: та же длительность, что и у `blocksize`."""
+        return round(self.blocksize * self.capture_samplerate / self.samplerate)
+
+    def _create_source(self) -> AudioSource:
+        if self.source == AudioInputService.SOURCE_FILE and self.source_path:
+            return FileAudioSource(
+                path=self.source_path,
+                samplerate=self.samplerate,
+                blocksize=self.blocksize,
+                channels=self.channels,
+                callback=self._consume_audio_data_callback,
+                finished_callback=self._on_source_finished,
+                realtime=self.source_realtime
+            )
+        return sd.RawInputStream(
+            samplerate=self.capture_samplerate,
+            blocksize=self.capture_blocksize,
+            device=self._current_device_id,
             dtype=AudioInputService.DATA_FORMAT,
             channels=self.channels,
             callback=self._consume_audio_data_callback
         )
-        self._stream.start()
-        log.info("Audio capture started.")
 
-    
-    
     def stop_capture(self):
-        if self._stream:
-            self._stream.stop()
-            self._stream.close()
-            # Помещаем значение-сигнал для разблокировки ожидающих вызовов queue.get()
-            self.audio_queue.put_nowait(None)
-            log.info("Audio capture stopped.")
+        # Сначала останавливаем реестр, чтобы он не пересоздал поток во время остановки.
+        # Без слежения реестр может быть общим с другим захватом: его не трогаем
+        if self.watch_devices:
+            self.device_registry.stop()
+        with self._stream_lock:
+            self._is_capturing = False
+            if self._stream:
+                self._stream.stop()
+                self._stream.close()
+                self._stream = None
+                self._mark_stream_closed()
+                log.info("Audio capture stopped.")
+                self.log_buffer_stats()
+        # Разблокируем ожидающие вызовы get_data() и read_frame(),
+        # они получат сигнал остановки (None)
+        self._data_ready.set()
+        self.audio_buffer.interrupt()
         self.clear_queue()
 
-    async def get_data(self) -> Optional[bytes]:
+    def pause_capture(self) -> None:
+        """
+        Приостанавливает доставку аудио, не закрывая поток устройства.
+        Уже накопленные блоки отбрасываются, история захвата продолжает писаться.
+
+        Точка паузы для повтора - первый кадр, который потребитель еще не получил:
+        отброшенные из буфера блоки не теряются, а повторяются вместе с аудио паузы.
+        """
+        self._is_gated = True
+        cleared_frames: int = self.audio_buffer.cleared_frames
+        # Повтор, не законченный до паузы, продолжится с того же места
+        replay, self._replay = self._replay, None
+        # Колбэк, прошедший проверку паузы, мог записать блок в историю, но не в буфер:
+        # такой блок либо попадет в буфер до clear_queue() и будет учтен ниже,
+        # либо после нее и будет прочитан потребителем - повтора без пропусков и дублей.
+        written: int = replay[0] if replay else (self.history.written_frames if self.history else 0)
+        self.clear_queue()
+        if self.history:
+            self._paused_at_frame = written - (self.audio_buffer.cleared_frames - cleared_frames)
+
+    def resume_capture(self,
+                    discard_ms: int = 0,
+                    replay: bool = False,
+                    skip_interval: Optional[Tuple[float, float]] = None) -> None:
+        """
+        Возобновляет доставку аудио после pause_capture().
+
+        Args:
+            discard_ms: Сколько миллисекунд аудио отбросить сразу после возобновления
+                (например, хвост собственного голоса ассистента).
+            replay: Подать в буфер аудио, захваченное за время паузы (из истории),
+                перед живыми блоками. Требует history_ms > 0.
+            skip_interval: Интервал (начало, конец) по time.monotonic(), который
+                не повторяется, например время звучания сигнала активации.
         """
-        Извлекает аудиоданные из очереди.
-        Асинхронно ожидает, пока элемент не станет доступен.
+        self._discard_frames_left = self.samplerate * discard_ms // 1000
+        if replay and self.history:
+            skip: Optional[Tuple[int, int]] = None
+            if skip_interval:
+                skip = (self.history.frame_at(skip_interval[0]), self.history.frame_at(skip_interval[1]))
+            self._replay = (self._paused_at_frame, skip)
+        else:
+            self._replay = None
+        self._is_gated = False
+
+    @property
+    def is_capturing(self) -> bool:
+        return self._is_capturing
+
+    @property
+    def stream_latency(self) -> float:
+        """Входная задержка устройства в секундах по данным PortAudio (0 для файлового источника)."""
+        return float(getattr(self._stream, "latency", 0.0) or 0.0)
+
+    @property
+    def is_finished(self) -> bool:
+        """True, если файловый источник выдал все данные и буфер прочитан."""
+        return self._is_finished and not len(self.audio_buffer)
+
+    def read_frame(self, timeout: Optional[float] = None) -> Optional[memoryview]:
+        """
+        Потокобезопасное блокирующее чтение очередного блока для потока распознавания.
+        Не использует цикл событий asyncio.
 
         Returns:
-            Аудиоданные в виде байтов, или None, если получен сигнал остановки.
+            memoryview на байты блока, валидный до следующего чтения,
+            или None по истечении `timeout` или при остановке захвата.
         """
-        # Теперь это асинхронное ожидание
-        return await self.audio_queue.get()
+        return self.audio_buffer.read(timeout)
 
-    def clear_queue(self):
-        while not self.audio_queue.empty():
+    async def get_data(self) -> Optional[memoryview]:
+        """
+        Извлекает очередной блок из кольцевого буфера.
+        Асинхронно ожидает, пока блок не станет доступен.
+
+        Returns:
+            memoryview на байты блока, валидный до следующего вызова get_data(),
+            или None, если захват остановлен.
+        """
+        while True:
+            data: Optional[memoryview] = self.audio_buffer.read_nowait()
+            if data is not None:
+                return data
+            if not self._is_capturing or self._is_finished:
+                return None
+            self._async_waiters += 1
             try:
-                self.audio_queue.get_nowait()
-            except asyncio.QueueEmpty:
-                break
-        log.debug("Audio queue cleared.")
\ No newline at end of file
+                self._data_ready.clear()
+                # Повторная проверка: блок мог прийти между read_nowait() и clear()
+                if len(self.audio_buffer):
+                    continue
+                await self._data_ready.wait()
+            finally:
+                self._async_waiters -= 1
+
+    def clear_queue(self):
+        dropped: int = self.audio_buffer.clear()
+        if dropped:
+            log.info(f"Audio queue cleared. Dropped blocks: {dropped}, "
+                    f"total cleared audio: {self.audio_buffer.cleared_frames / self.samplerate:.2f} s.")
+        else:
+            log.debug("Audio queue cleared.")
+
+    def log_buffer_stats(self) -> None:
+        stats = self.audio_buffer.stats()
+        log.info(f"Audio buffer: policy '{self.audio_buffer.overflow_policy}', "
+                f"capacity {stats['capacity']}, high-water mark {stats['high_water_mark']}, "
+                f"dropped {stats['dropped_blocks']} blocks ({stats['dropped_frames'] / self.samplerate:.2f} s), "
+                f"cleared {stats['cleared_blocks']} blocks ({stats['cleared_frames'] / self.samplerate:.2f} s).")
\ No newline at end of file
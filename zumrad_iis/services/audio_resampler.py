@@ -0,0 +1,82 @@
+import logging
+from math import gcd
+
+import numpy as np
+
+log: logging.Logger = logging.getLogger(__name__)
+
+
+class PolyphaseResampler:
+    """
+    Потоковый полифазный ресемплер PCM int16 (например, 48000 / 44100 Гц -> 16000 Гц).
+
+    Частоты сводятся к дроби L/M (повышение в L раз, понижение в M раз).
+    ФНЧ-прототип (оконный sinc, окно Кайзера) раскладывается на L фаз
+    по `taps_per_phase` коэффициентов, и для каждого выходного отсчета
+    считается только одна фаза. Все выходные отсчеты блока считаются
+    сразу (векторно, NumPy).
+
+    Между блоками сохраняются хвост входного сигнала и фаза следующего
+    выходного отсчета, поэтому на границах блоков нет разрывов,
+    а длина выхода в среднем точно соответствует отношению частот.
+
+    :param in_rate: Частота входного сигнала (частота устройства).
+    :param out_rate: Требуемая частота (частота модели STT).
+    :param channels: Количество перемежающихся каналов.
+    :param zero_crossings: Полуширина фильтра в периодах новой частоты Найквиста:
+        больше - круче срез, больше нагрузка на CPU.
+    """
+    KAISER_BETA: float = 8.0
+    CUTOFF_RATIO: float = 0.9  # Срез фильтра относительно новой частоты Найквиста
+
+    def __init__(self, in_rate: int, out_rate: int, channels: int = 1, zero_crossings: int = 8) -> None:
+        if in_rate <= 0 or out_rate <= 0:
+            raise ValueError(f"Sample rates must be positive: {in_rate} -> {out_rate}")
+        divisor: int = gcd(in_rate, out_rate)
+        self.in_rate: int = in_rate
+        self.out_rate: int = out_rate
+        self.channels: int = channels
+        self.up: int = out_rate // divisor    # L
+        self.down: int = in_rate // divisor   # M
+        # Длина фильтра растет с коэффициентом понижения, чтобы срез оставался крутым
+        self.taps_per_phase: int = -(-2 * zero_crossings * max(self.up, self.down) // self.up)
+        self._phases: np.ndarray = self._design_filter()
+        self._taps: np.ndarray = np.arange(self.taps_per_phase)
+        # Последние taps_per_phase - 1 входных кадров предыдущего блока
+        self._history: np.ndarray = np.zeros((self.taps_per_phase - 1, channels), dtype=np.float32)
+        # Позиция следующего выходного отсчета на сетке частоты in_rate * L, от начала очередного блока
+        self._position: int = 0
+
+    def _design_filter(self) -> np.ndarray:
+        """Возвращает коэффициенты, разложенные по фазам: массив (L, taps_per_phase)."""
+        length: int = self.up * self.taps_per_phase
+        cutoff: float = PolyphaseResampler.CUTOFF_RATIO / max(self.up, self.down)
+        n: np.ndarray = np.arange(length) - (length - 1) / 2.0
+        prototype: np.ndarray = cutoff * np.sinc(cutoff * n) * np.kaiser(length, PolyphaseResampler.KAISER_BETA)
+        # Усиление L компенсирует нули, вставленные при повышении частоты
+        prototype *= self.up / prototype.sum()
+        # Фаза p использует коэффициенты h[p], h[p + L], h[p + 2L], ...
+        return prototype.reshape(self.taps_per_phase, self.up).T.astype(np.float32)
+
+    def output_frames(self, in_frames: int) -> int:
+        """Максимальная длина выхода (в кадрах) для входного блока в `in_frames` кадров."""
+        return -(-in_frames * self.up // self.down) + 1
+
+    def process(self, block) -> np.ndarray:
+        """Ресемплирует блок PCM int16 и возвращает массив int16 (перемежающиеся каналы)."""
+        samples: np.ndarray = np.frombuffer(block, dtype=np.int16).reshape(-1, self.channels)
+        frames: int = len(samples)
+        extended: np.ndarray = np.concatenate((self._history, samples.astype(np.float32)))
+        # Выходной отсчет n опирается на входной кадр (position + n*M) // L текущего блока
+        count: int = max(0, -(-(frames * self.up - self._position) // self.down))
+        positions: np.ndarray = self._position + np.arange(count) * self.down
+        bases: np.ndarray = positions // self.up + (self.taps_per_phase - 1)
+        window: np.ndarray = extended[bases[:, None] - self._taps[None, :]]  # (count, taps, channels)
+        result: np.ndarray = np.einsum("nk,nkc->nc", self._phases[positions % self.up], window)
+        self._position += count * self.down - frames * self.up
+        self._history = extended[frames:]
+        return np.clip(np.rint(result), -32768, 32767).astype(np.int16).reshape(-1)
+
+    def reset(self) -> None:
+        self._history.fill(0.0)
+        self._position = 0
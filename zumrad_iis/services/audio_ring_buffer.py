@@ -0,0 +1,181 @@
+import logging
+import threading
+from collections import deque
+from typing import Deque, Dict, List, Optional
+
+import numpy as np
+
+log: logging.Logger = logging.getLogger(__name__)
+
+
+class OverflowPolicy:
+    """Политики поведения кольцевого буфера при переполнении."""
+    DROP_OLDEST = "drop_oldest"  # Вытеснить самый старый непрочитанный блок
+    DROP_NEWEST = "drop_newest"  # Отбросить пришедший блок
+    BLOCK = "block"              # Ждать, пока читатель освободит место (для файловых источников)
+
+    ALL = (DROP_OLDEST, DROP_NEWEST, BLOCK)
+
+
+class AudioRingBuffer:
+    """
+    Кольцевой буфер аудиоблоков на заранее выделенном массиве int16.
+
+    Колбэк захвата копирует блок прямо в свободный слот буфера, без
+    промежуточного `bytes`. Потребитель получает `memoryview` на слот,
+    который остается валидным до следующего вызова `read_nowait()`:
+    один слот всегда зарезервирован за читателем и не перезаписывается.
+
+    Слоты адресуются через очереди индексов, поэтому при переполнении
+    можно отбросить самый старый блок, не задевая слот читателя.
+
+    Буфер потокобезопасен: поток распознавания может ждать блоки в `read()`
+    напрямую, минуя цикл событий asyncio.
+
+    :param capacity: Максимум непрочитанных блоков.
+    :param block_samples: Семплов int16 в одном слоте (с учетом каналов).
+    :param channels: Количество каналов, для учета потерь в кадрах.
+    :param overflow_policy: Одна из констант OverflowPolicy.
+    :param block_timeout: Для политики BLOCK - сколько секунд писатель ждет
+        свободного места, прежде чем отбросить блок.
+    """
+    def __init__(self,
+                capacity: int,
+                block_samples: int,
+                channels: int = 1,
+                overflow_policy: str = OverflowPolicy.DROP_OLDEST,
+                block_timeout: float = 1.0,
+                ) -> None:
+        if capacity < 1:
+            raise ValueError(f"Capacity of audio buffer must be positive: {capacity}")
+        if overflow_policy not in OverflowPolicy.ALL:
+            raise ValueError(f"Unknown overflow policy: '{overflow_policy}'. "
+                            f"Acceptable values: {', '.join(OverflowPolicy.ALL)}.")
+        self.capacity: int = capacity
+        self.block_samples: int = block_samples
+        self.overflow_policy: str = overflow_policy
+        self.block_timeout: float = block_timeout
+        slots_count: int = capacity + 1               # +1 слот, удерживаемый читателем
+        self._data: np.ndarray = np.zeros((slots_count, block_samples), dtype=np.int16)
+        self._views: List[memoryview] = [memoryview(self._data[i]).cast("B") for i in range(slots_count)]
+        self._slot_bytes: int = block_samples * self._data.itemsize
+        self._frame_bytes: int = channels * self._data.itemsize
+        self._lengths: List[int] = [0] * slots_count  # Длина данных в слоте, в байтах
+        self._free: Deque[int] = deque(range(slots_count))
+        self._ready: Deque[int] = deque()
+        self._held: Optional[int] = None              # Слот, выданный читателю
+        self._lock = threading.Condition()
+        self._blocked_writers: int = 0
+        # --- Учет потерь ---
+        self.dropped_blocks: int = 0                  # Блоки, потерянные из-за переполнения
+        self.dropped_frames: int = 0
+        self.cleared_blocks: int = 0                  # Блоки, выброшенные через clear()
+        self.cleared_frames: int = 0
+        self.truncated: int = 0                       # Блоки, не поместившиеся в слот целиком
+        self.high_water_mark: int = 0                 # Максимум одновременно непрочитанных блоков
+
+    def write(self, indata) -> bool:
+        """
+        Копирует блок из буфера PortAudio в свободный слот.
+        Вызывается из потока аудио-колбэка или файлового источника.
+        При переполнении действует согласно `overflow_policy`.
+
+        Returns:
+            False, если пришедший блок был отброшен.
+        """
+        source: memoryview = memoryview(indata).cast("B")
+        nbytes: int = source.nbytes
+        if nbytes > self._slot_bytes:
+            nbytes = self._slot_bytes
+            self.truncated += 1
+        with self._lock:
+            if len(self._ready) >= self.capacity and self.overflow_policy == OverflowPolicy.BLOCK:
+                self._blocked_writers += 1
+                try:
+                    self._lock.wait_for(lambda: len(self._ready) < self.capacity, self.block_timeout)
+                finally:
+                    self._blocked_writers -= 1
+            if len(self._ready) < self.capacity:
+                slot: int = self._free.popleft()
+            elif self.overflow_policy == OverflowPolicy.DROP_OLDEST:
+                slot = self._ready.popleft()
+                self._account_drop(self._lengths[slot])
+            else:
+                # DROP_NEWEST или истек таймаут ожидания BLOCK
+                self._account_drop(nbytes)
+                return False
+            self._views[slot][:nbytes] = source[:nbytes]
+            self._lengths[slot] = nbytes
+            self._ready.append(slot)
+            if len(self._ready) > self.high_water_mark:
+                self.high_water_mark = len(self._ready)
+            self._lock.notify()
+        return True
+
+    def _account_drop(self, nbytes: int) -> None:
+        self.dropped_blocks += 1
+        self.dropped_frames += nbytes // self._frame_bytes
+
+    def read_nowait(self) -> Optional[memoryview]:
+        """
+        Возвращает следующий блок как memoryview (байты PCM int16) или None,
+        если непрочитанных блоков нет. Предыдущий выданный слот освобождается.
+        """
+        return self.read(timeout=0)
+
+    def read(self, timeout: Optional[float] = None) -> Optional[memoryview]:
+        """
+        Блокирующее чтение следующего блока.
+        Ждет не дольше `timeout` секунд (None - без ограничения) и возвращает None,
+        если блок так и не появился или ожидание прервано через `interrupt()`.
+        """
+        with self._lock:
+            if self._held is not None:
+                self._free.append(self._held)
+                self._held = None
+            if not self._ready and timeout != 0:
+                self._lock.wait(timeout)
+            if not self._ready:
+                return None
+            slot: int = self._ready.popleft()
+            self._held = slot
+            nbytes: int = self._lengths[slot]
+            if self._blocked_writers:
+                # Освободилось место: будим писателя, ждущего по политике BLOCK
+                self._lock.notify_all()
+        view: memoryview = self._views[slot]
+        return view if nbytes == self._slot_bytes else view[:nbytes]
+
+    def interrupt(self) -> None:
+        """Будит все потоки, ожидающие в `read()`."""
+        with self._lock:
+            self._lock.notify_all()
+
+    def clear(self) -> int:
+        """Отбрасывает все непрочитанные блоки с учетом потерь. Возвращает их количество."""
+        with self._lock:
+            dropped: int = len(self._ready)
+            for slot in self._ready:
+                self.cleared_frames += self._lengths[slot] // self._frame_bytes
+            self.cleared_blocks += dropped
+            self._free.extend(self._ready)
+            self._ready.clear()
+            if self._blocked_writers:
+                self._lock.notify_all()
+        return dropped
+
+    def stats(self) -> Dict[str, int]:
+        """Снимок счетчиков заполнения и потерь."""
+        return {
+            "capacity": self.capacity,
+            "pending": len(self._ready),
+            "high_water_mark": self.high_water_mark,
+            "dropped_blocks": self.dropped_blocks,
+            "dropped_frames": self.dropped_frames,
+            "cleared_blocks": self.cleared_blocks,
+            "cleared_frames": self.cleared_frames,
+            "truncated": self.truncated,
+        }
+
+    def __len__(self) -> int:
+        return len(self._ready)
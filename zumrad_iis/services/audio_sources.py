@@ -0,0 +1,169 @@
+import logging
+import os
+import threading
+import time
+import wave
+from typing import Any, BinaryIO, Callable, Optional, Protocol
+
+log: logging.Logger = logging.getLogger(__name__)
+
+# Та же сигнатура, что и у колбэка sd.RawInputStream: (indata, frames, time, status)
+AudioCallback = Callable[[Any, int, Any, Any], None]
+
+
+class AudioSource(Protocol):
+    """
+    Интерфейс бэкенда захвата для AudioInputService.
+    sd.RawInputStream удовлетворяет ему без адаптеров.
+    """
+    def start(self) -> None:
+        ...
+
+    def stop(self) -> None:
+        ...
+
+    def close(self) -> None:
+        ...
+
+
+class FileAudioSource(AudioSource):
+    """
+    Источник аудио, воспроизводящий PCM int16 из WAV-файла, сырого дампа PCM
+    или именованного канала (FIFO) блоками по `blocksize` кадров.
+
+    Позволяет прогонять весь конвейер распознавания без микрофона.
+    В режиме `realtime` блоки выдаются с темпом реального аудио, иначе -
+    так быстро, как их успевает принимать потребитель.
+
+    :param path: Путь к файлу. Формат определяется по расширению: `.wav` - WAV, иначе сырой PCM.
+    :param samplerate: Ожидаемая частота дискретизации.
+    :param blocksize: Размер блока в кадрах.
+    :param channels: Количество каналов.
+    :param callback: Колбэк с сигнатурой колбэка sd.RawInputStream.
+    :param finished_callback: Вызывается после выдачи последнего блока.
+    :param realtime: Выдавать блоки в темпе реального времени.
+    """
+    SAMPLE_WIDTH: int = 2  # int16
+    JOIN_TIMEOUT: float = 2.0  # Сколько stop() ждет поток чтения, заблокированный на FIFO
+
+    def __init__(self,
+                path: str,
+                samplerate: int,
+                blocksize: int,
+                channels: int,
+                callback: AudioCallback,
+                finished_callback: Optional[Callable[[], None]] = None,
+                realtime: bool = True,
+                ) -> None:
+        self.path: str = path
+        self.samplerate: int = samplerate
+        self.blocksize: int = blocksize
+        self.channels: int = channels
+        self.callback: AudioCallback = callback
+        self.finished_callback: Optional[Callable[[], None]] = finished_callback
+        self.realtime: bool = realtime
+        self.is_wav: bool = os.path.splitext(path)[1].lower() == ".wav"
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._handle: Optional[Any] = None # Открытый файл: stop() закрывает его, чтобы прервать чтение
+        self.blocks_read: int = 0
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="zumrad-file-audio", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        handle: Optional[Any] = self._handle
+        if handle is not None:
+            try:
+                handle.close()
+            except Exception as e:
+                log.debug(f"FileAudioSource: Ошибка закрытия '{self.path}': {e}")
+        thread: Optional[threading.Thread] = self._thread
+        if thread and thread is not threading.current_thread():
+            # Поток может ждать писателя FIFO в open() или данных в read(): не ждем его бесконечно
+            thread.join(FileAudioSource.JOIN_TIMEOUT)
+            if thread.is_alive():
+                log.warning(f"FileAudioSource: Поток чтения '{self.path}' не завершился "
+                            f"за {FileAudioSource.JOIN_TIMEOUT} с, оставлен в фоне.")
+        self._thread = None
+
+    def close(self) -> None:
+        self.stop()
+
+    @property
+    def active(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def _open(self) -> tuple[Any, Callable[[int], bytes]]:
+        """Открывает источник и возвращает (объект для закрытия, функцию чтения кадров)."""
+        if self.is_wav:
+            wav: wave.Wave_read = wave.open(self.path, "rb")
+            if (wav.getframerate() != self.samplerate or wav.getnchannels() != self.channels
+                    or wav.getsampwidth() != FileAudioSource.SAMPLE_WIDTH):
+                wav.close()
+                raise ValueError(f"WAV file '{self.path}' has format "
+                                f"{wav.getframerate()} Hz, {wav.getnchannels()} ch, {wav.getsampwidth() * 8} bit; "
+                                f"expected {self.samplerate} Hz, {self.channels} ch, 16 bit.")
+            return wav, wav.readframes
+        # Сырой PCM или именованный канал: open() блокируется, пока в канал не придет писатель.
+        # Без буферизации: close() из stop() не ждет блокировку буфера, занятую read()
+        raw: BinaryIO = open(self.path, "rb", buffering=0)
+        frame_bytes: int = self.channels * FileAudioSource.SAMPLE_WIDTH
+
+        def read_frames(frames: int) -> bytes:
+            # Канал отдает данные кусками: дочитываем до целого блока или конца данных
+            size: int = frames * frame_bytes
+            data: bytes = b""
+            while len(data) < size and not self._stop_event.is_set():
+                chunk: Optional[bytes] = raw.read(size - len(data))
+                if not chunk:
+                    break
+                data += chunk
+            return data
+        return raw, read_frames
+
+    def _run(self) -> None:
+        frame_bytes: int = self.channels * FileAudioSource.SAMPLE_WIDTH
+        block_duration: float = self.blocksize / self.samplerate
+        try:
+            handle, read_frames = self._open()
+            self._handle = handle
+        except Exception as e:
+            log.error(f"FileAudioSource: Не удалось открыть '{self.path}': {e}")
+            self._finish()
+            return
+        log.info(f"FileAudioSource: Воспроизведение '{self.path}' "
+                f"({'в реальном времени' if self.realtime else 'с максимальной скоростью'}).")
+        started: float = time.monotonic()
+        try:
+            while not self._stop_event.is_set():
+                data: bytes = read_frames(self.blocksize)
+                if not data:
+                    break
+                frames: int = len(data) // frame_bytes
+                self.callback(data, frames, None, None)
+                self.blocks_read += 1
+                if self.realtime:
+                    # Темп считаем от момента старта, чтобы не накапливать дрейф от sleep()
+                    delay: float = started + self.blocks_read * block_duration - time.monotonic()
+                    if delay > 0 and self._stop_event.wait(delay):
+                        break
+        except Exception as e:
+            if not self._stop_event.is_set(): # Иначе файл закрыт из stop()
+                log.error(f"FileAudioSource: Ошибка чтения '{self.path}': {e}")
+        finally:
+            self._handle = None
+            handle.close()
+            elapsed: float = time.monotonic() - started
+            log.info(f"FileAudioSource: Выдано блоков: {self.blocks_read}, "
+                    f"аудио {self.blocks_read * block_duration:.2f} с за {elapsed:.2f} с.")
+            self._finish()
+
+    def _finish(self) -> None:
+        if self.finished_callback and not self._stop_event.is_set():
+            self.finished_callback()
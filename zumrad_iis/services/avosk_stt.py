@@ -1,10 +1,20 @@
 import asyncio
-from typing import Optional, Protocol
+import time
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Protocol
 import logging
 from vosk import Model, KaldiRecognizer
 import json
+import numpy as np
 
-from zumrad_iis.services.audio_input_service import AudioInputService
+from zumrad_iis.commands.command_vocabulary import Vocabulary
+from zumrad_iis.services.executor_registry import ExecutorRegistry, run_blocking
+from zumrad_iis.services.stt.endpointer import EndpointerProfile
+from zumrad_iis.services.stt.recognition_events import PartialEvent, RecognitionEvent, STTResult, WordInfo
+from zumrad_iis.services.wake_word_matcher import WakeWordMatch, WakeWordMatcher
+
+if TYPE_CHECKING:
+    # Только для аннотаций: процесс распознавания (stt_worker_entry) не импортирует sounddevice
+    from zumrad_iis.services.audio_input_service import AudioInputService
 
 log = logging.getLogger(__name__) 
 
@@ -24,60 +34,454 @@ log = logging.getLogger(__name__)
 class Messages():
     FAILED_TO_LOAD_STT_MODEL = "Failed to load STT model from"
 
+class RecognitionMode():
+    KEYWORD = "keyword"  # Только ключевое слово: крошечная грамматика, минимум CPU в режиме ожидания
+    FULL = "full"        # Полное распознавание (или по грамматике словаря команд)
+
 # Interface. In Python Protocol is Interface
 class STTServiceProtocol(Protocol):  
+    utterance_id: int # Номер текущей фразы
     async def initialize(self) -> None:
         """
         Инициализация сервиса распознавания речи.
         Может включать загрузку модели, настройку параметров и т.д.
         """
         ...
-    def transcribe(self, audio_data: bytes) -> str:
+    def transcribe(self, audio_data: bytes | memoryview) -> Optional[STTResult]:
+        ...
+    def accept(self, audio_data: bytes | memoryview) -> Optional[RecognitionEvent]:
+        """Потоковое распознавание: окончательные и промежуточные результаты как события."""
+        ...
+    def finalize(self) -> Optional[STTResult]:
+        """Принудительно завершает текущую фразу (например, после паузы в речи по VAD)."""
+        ...
+    def reset_utterance(self) -> None:
+        ...
+    def set_mode(self, mode: str) -> None:
+        """Переключает режим распознавания (RecognitionMode). Вызывается из потока распознавания."""
+        ...
+    def close(self) -> None:
+        """Освобождает ресурсы сервиса после остановки распознавания."""
+        ...
+    async def warm_up(self, seconds: float = 1.0) -> float:
+        """Прогоняет через декодер синтетическое аудио; возвращает затраченное время, секунды."""
         ...
 
 class STTService(STTServiceProtocol):
+    """
+    Распознавание речи на Vosk.
+
+    Если задан словарь команд и `use_grammar`, распознаватель ограничивается
+    грамматикой: фразы словаря, ключевое слово, ключевое слово с каждой фразой
+    и "[unk]" для всего остального. Декодирование по маленькой грамматике дешевле,
+    а результат точно совпадает с фразами словаря. Грамматику поддерживают
+    только модели с динамическим графом (small-модели Vosk); слова, которых
+    нет в модели, Vosk пропускает с предупреждением.
+    Грамматика перестраивается, когда меняется `vocabulary.revision`.
+
+    В двухуровневом режиме (`two_tier`) в ожидании работает распознаватель
+    с грамматикой из одного ключевого слова. Аудио текущей фразы при этом
+    копится; когда в ней найдено ключевое слово, сервис переключается
+    на полный распознаватель и заново декодирует эту фразу целиком,
+    так что команда, сказанная сразу после ключевого слова, не теряется.
+    Если сервис переключился сам (по промежуточной гипотезе), а окончательный
+    результат фразы ключевого слова не содержит, ассистент не активируется -
+    и сервис сам возвращается к ключевому слову.
+    Ключевое слово в гипотезе ищет `keyword_finder` - тот же поиск, что активирует
+    ассистента (ActivationService.find_keyword); по умолчанию - WakeWordMatcher.
+
+    С `max_alternatives` полный распознаватель выдает N-best гипотезы
+    (STTResult.alternatives); уверенность слов Vosk в этом режиме не сообщает.
+
+    Профили эндпойнтера (`idle_endpointer`, `active_endpointer`) задают, как быстро
+    Vosk завершает фразу в ожидании и после активации. Если Vosk не поддерживает
+    их настройку, профиль полного распознавателя эмулируется (см. EndpointerProfile).
+
+    Уже загруженную модель можно передать в `model` (см. SessionManager):
+    тогда initialize() создает только распознаватели, и несколько сервисов
+    делят одну модель в памяти.
+    """
+    UNKNOWN_WORD: str = "[unk]"
+    MAX_UTTERANCE_SECONDS: int = 10  # Сколько аудио фразы хранить для повторного декодирования
+
     def __init__(self,
                 model_path: str,
-                audio_input: AudioInputService,
+                audio_input: "AudioInputService",
                 sample_rate: int,
+                vocabulary: Optional[Vocabulary] = None,
+                keyword: Optional[str] = None,
+                use_grammar: bool = False,
+                two_tier: bool = False,
+                emit_partials: bool = False,
+                partial_stable_chunks: int = 2,
+                idle_endpointer: Optional[EndpointerProfile] = None,
+                active_endpointer: Optional[EndpointerProfile] = None,
+                max_alternatives: int = 0,
+                executors: Optional[ExecutorRegistry] = None,
+                model: Optional[Model] = None,
+                keyword_finder: Optional[Callable[[str], Optional[WakeWordMatch]]] = None,
                 ):
 
         self.model_path = model_path
         self.sample_rate = sample_rate
         self.audio_input = audio_input
-        self.model: Optional[Model] = None
-        self.recognizer: Optional[KaldiRecognizer] = None
+        self.vocabulary: Optional[Vocabulary] = vocabulary
+        self.keyword: Optional[str] = keyword.lower() if keyword else None
+        self.use_grammar: bool = use_grammar and vocabulary is not None
+        self.two_tier: bool = two_tier and self.keyword is not None
+        self._find_keyword: Optional[Callable[[str], Optional[WakeWordMatch]]] = \
+            keyword_finder or (WakeWordMatcher(self.keyword).match if self.keyword else None)
+        self._grammar_revision: int = -1 # Версия словаря, по которой построена грамматика
+        self.model: Optional[Model] = model
+        self.recognizer: Optional[KaldiRecognizer] = None # Текущий распознаватель
+        self._full_recognizer: Optional[KaldiRecognizer] = None
+        self._keyword_recognizer: Optional[KaldiRecognizer] = None
+        self.mode: str = RecognitionMode.FULL
+        self._utterance: bytearray = bytearray() # Аудио текущей фразы в режиме ключевого слова
+        self._is_self_switched: bool = False # FULL включен по ключевому слову самим сервисом, а не set_mode()
+        self._max_utterance_bytes: int = sample_rate * 2 * STTService.MAX_UTTERANCE_SECONDS
+        # Промежуточные гипотезы: выдаются при изменении и еще раз, когда
+        # не менялись partial_stable_chunks порций подряд (стабильная гипотеза)
+        self.emit_partials: bool = emit_partials
+        self.partial_stable_chunks: int = partial_stable_chunks
+        self.utterance_id: int = 0
+        self._last_partial: str = ""
+        self._partial_repeats: int = 0
+        self._partial_changed_at: int = 0 # Байт фразы, на котором гипотеза изменилась в последний раз
+        # Учет для real-time factor текущей фразы
+        self._bytes_per_second: int = sample_rate * 2
+        self._utterance_bytes: int = 0
+        self._decode_seconds: float = 0.0
+        self.idle_endpointer: Optional[EndpointerProfile] = idle_endpointer
+        self.active_endpointer: Optional[EndpointerProfile] = active_endpointer
+        self._is_listening_active: bool = False # Ассистент активирован (профиль active_endpointer)
+        self._is_endpointer_native: bool = True # False - Vosk не настраивает эндпойнтер, профиль эмулируется
+        self.max_alternatives: int = max_alternatives # N-best гипотез полного распознавателя, 0 - только лучшая
+        self.executors: Optional[ExecutorRegistry] = executors # Пулы model_loading и compute
 
-    def transcribe(self, audio_data: bytes) -> str:
+    def transcribe(self, audio_data: bytes | memoryview) -> Optional[STTResult]:
         """
         Processes an audio chunk. If the chunk completes an utterance,
-        returns the recognized text. Otherwise, returns an empty string.
+        returns the recognition result (text, words, timing). Otherwise, returns None.
+        """
+        event: Optional[RecognitionEvent] = self.accept(audio_data)
+        return event if isinstance(event, STTResult) else None
+
+    def accept(self, audio_data: bytes | memoryview) -> Optional[RecognitionEvent]:
+        """
+        Потоковый вариант transcribe(): возвращает STTResult, если порция завершила фразу,
+        PartialEvent, если изменилась (или стабилизировалась) промежуточная гипотеза,
+        иначе None. Промежуточные гипотезы выдаются только при `emit_partials`.
         """
         if not self.recognizer:
             log.warning("VoskSTTService: Распознаватель не инициализирован. Сначала вызовите initialize().")
-            return ""
-
-        if self.recognizer.AcceptWaveform(audio_data):
-            result_json = self.recognizer.Result()
-            try:
-                result_dict = json.loads(result_json)
-                return result_dict.get("text", "")
-            except json.JSONDecodeError:
-                log.error(f"VoskSTTService: Failed to decode JSON from Vosk: {result_json}")
-                return ""
-        return "" # No complete utterance recognized from this chunk yet
+            return None
+        if self.use_grammar and self.vocabulary and self.vocabulary.revision != self._grammar_revision:
+            self._apply_grammar()
+
+        # cffi-обертка Vosk принимает только `bytes` как `const char *`,
+        # поэтому блок из кольцевого буфера копируется здесь, в потоке распознавания.
+        if not isinstance(audio_data, bytes):
+            audio_data = bytes(audio_data)
+        self._utterance_bytes += len(audio_data)
+        if self.mode == RecognitionMode.KEYWORD:
+            return self._spot_keyword(audio_data)
+        if self._feed(audio_data):
+            return self._final(self._parse_json(self.recognizer.Result()))
+        profile: Optional[EndpointerProfile] = self._emulated_endpointer()
+        if not self.emit_partials and profile is None:
+            return None # No complete utterance recognized from this chunk yet
+        partial: Optional[PartialEvent] = self._partial()
+        if profile is not None and self._is_emulated_endpoint(profile):
+            return self._final(self._parse_json(self.recognizer.FinalResult()))
+        return partial if self.emit_partials else None
+
+    def _feed(self, audio_data: bytes) -> bool:
+        """AcceptWaveform с учетом времени декодирования фразы."""
+        started: float = time.perf_counter()
+        is_final: bool = bool(self.recognizer and self.recognizer.AcceptWaveform(audio_data))
+        self._decode_seconds += time.perf_counter() - started
+        return is_final
+
+    def _final(self, result: Dict[str, Any]) -> Optional[STTResult]:
+        """Закрывает текущую фразу: следующая порция начнет новую."""
+        alternatives: List[Dict[str, Any]] = result.get("alternatives", [])
+        if alternatives:
+            result = alternatives[0]
+        text: str = result.get("text", "")
+        stt_result = STTResult(
+            text,
+            self.utterance_id,
+            tuple(WordInfo(w.get("word", ""), w.get("conf", 1.0), w.get("start", 0.0), w.get("end", 0.0))
+                for w in result.get("result", ())),
+            self._utterance_bytes / self._bytes_per_second,
+            self._decode_seconds,
+            tuple((a.get("text", ""), a.get("confidence", 0.0)) for a in alternatives),
+        )
+        self._start_utterance()
+        if self._is_self_switched and not self._has_keyword(text):
+            # Ключевое слово было в ложной промежуточной гипотезе: активации не будет
+            log.debug("VoskSTTService: Ключевого слова в результате нет, возврат к ключевому слову.")
+            self.set_mode(RecognitionMode.KEYWORD)
+        return stt_result if text else None
+
+    def _start_utterance(self) -> None:
+        self.utterance_id += 1
+        self._last_partial = ""
+        self._partial_repeats = 0
+        self._partial_changed_at = 0
+        self._utterance_bytes = 0
+        self._decode_seconds = 0.0
+
+    def _partial(self) -> Optional[PartialEvent]:
+        if not self.recognizer:
+            return None
+        text: str = self._parse_json(self.recognizer.PartialResult()).get("partial", "")
+        if not text:
+            return None
+        if text != self._last_partial:
+            self._last_partial = text
+            self._partial_repeats = 0
+            self._partial_changed_at = self._utterance_bytes
+            return PartialEvent(text, self.utterance_id, is_stable=self.partial_stable_chunks == 0)
+        self._partial_repeats += 1
+        if self._partial_repeats == self.partial_stable_chunks:
+            return PartialEvent(text, self.utterance_id, is_stable=True)
+        return None
+
+    def _emulated_endpointer(self) -> Optional[EndpointerProfile]:
+        """Профиль, который нужно эмулировать для полного распознавателя, или None."""
+        if self._is_endpointer_native or self.mode != RecognitionMode.FULL:
+            return None
+        return self._current_endpointer()
+
+    def _is_emulated_endpoint(self, profile: EndpointerProfile) -> bool:
+        """
+        Эмуляция эндпойнтера: гипотеза не менялась `end_seconds` аудио
+        (после речи идет тишина или шум) или фраза длиннее `t_max`.
+        """
+        if profile.t_max is not None and self._utterance_bytes >= profile.t_max * self._bytes_per_second:
+            return True
+        end_seconds: Optional[float] = profile.end_seconds
+        if end_seconds is None or not self._last_partial:
+            return False
+        return self._utterance_bytes - self._partial_changed_at >= end_seconds * self._bytes_per_second
+
+    def finalize(self) -> Optional[STTResult]:
+        """
+        Принудительно завершает текущую фразу (FinalResult), не дожидаясь эндпойнтера Vosk,
+        например после паузы в речи по VAD. Если с прошлого результата аудио не было, возвращает None.
+        """
+        if not self.recognizer or not self._utterance_bytes:
+            return None
+        if self.mode == RecognitionMode.KEYWORD:
+            event: Optional[RecognitionEvent] = self._keyword_final(self._parse_text(self.recognizer.FinalResult()))
+            return event if isinstance(event, STTResult) else None
+        return self._final(self._parse_json(self.recognizer.FinalResult()))
+
+    def reset_utterance(self) -> None:
+        """Отбрасывает текущую фразу (например, команда уже выполнена по промежуточной гипотезе)."""
+        if self.recognizer:
+            self.recognizer.Reset()
+        self._utterance.clear()
+        self._start_utterance()
+
+    def _parse_json(self, result_json: str) -> Dict[str, Any]:
+        try:
+            return json.loads(result_json)
+        except json.JSONDecodeError:
+            log.error(f"VoskSTTService: Failed to decode JSON from Vosk: {result_json}")
+            return {}
+
+    def _parse_text(self, result_json: str) -> str:
+        return self._parse_json(result_json).get("text", "")
+
+    def _spot_keyword(self, audio_data: bytes) -> Optional[RecognitionEvent]:
+        """Режим ожидания: ищет ключевое слово, остальная речь не выдается."""
+        self._utterance += audio_data
+        if len(self._utterance) > self._max_utterance_bytes:
+            del self._utterance[:len(self._utterance) - self._max_utterance_bytes]
+        if not self.recognizer:
+            return None
+        if self._feed(audio_data):
+            spotted: str = self._parse_text(self.recognizer.Result())
+        elif self.emit_partials:
+            # Ключевое слово в промежуточной гипотезе: переключаемся, не дожидаясь конца фразы
+            spotted = self._parse_json(self.recognizer.PartialResult()).get("partial", "")
+            if not self._has_keyword(spotted):
+                return None
+            return self._switch_to_full(is_final=False)
+        else:
+            return None
+        return self._keyword_final(spotted)
+
+    def _keyword_final(self, spotted: str) -> Optional[RecognitionEvent]:
+        """Фраза в режиме ключевого слова закончилась: без ключевого слова она отбрасывается."""
+        if not self._has_keyword(spotted):
+            self._utterance.clear()
+            self._start_utterance()
+            return None
+        return self._switch_to_full(is_final=True)
+
+    def _switch_to_full(self, is_final: bool) -> Optional[RecognitionEvent]:
+        """
+        Переходит к полному распознаванию и заново декодирует накопленную фразу:
+        в ней после ключевого слова может быть и команда.
+        """
+        log.debug("VoskSTTService: Ключевое слово найдено, переход к полному распознаванию.")
+        utterance: bytes = bytes(self._utterance)
+        self.set_mode(RecognitionMode.FULL)
+        self._is_self_switched = True
+        if self.recognizer is None:
+            return None
+        if not is_final:
+            # Фраза продолжается уже в полном распознавателе
+            if self._feed(utterance):
+                return self._final(self._parse_json(self.recognizer.Result()))
+            return self._partial()
+        self._feed(utterance)
+        result: Dict[str, Any] = self._parse_json(self.recognizer.FinalResult())
+        best: Dict[str, Any] = (result.get("alternatives") or [result])[0]
+        if not self._has_keyword(best.get("text", "")):
+            result = {"text": self.keyword or ""}
+        return self._final(result)
+
+    def _has_keyword(self, text: str) -> bool:
+        return self._find_keyword is not None and self._find_keyword(text) is not None
+
+    def set_mode(self, mode: str) -> None:
+        """
+        Переключает распознаватель. Без `two_tier` всегда используется полный,
+        меняется только профиль эндпойнтера.
+        Должен вызываться из потока распознавания: KaldiRecognizer не потокобезопасен.
+        """
+        self._is_self_switched = False # Режим задан явно (например, ассистент активирован)
+        is_active: bool = mode == RecognitionMode.FULL
+        if is_active != self._is_listening_active:
+            self._is_listening_active = is_active
+            if not self.two_tier:
+                self._apply_endpointer(self._full_recognizer, self._current_endpointer())
+        if not self.two_tier or mode == self.mode:
+            return
+        self.mode = mode
+        self.recognizer = self._keyword_recognizer if mode == RecognitionMode.KEYWORD else self._full_recognizer
+        self._utterance.clear()
+        self._last_partial = ""
+        self._partial_repeats = 0
+        self._partial_changed_at = 0
+        if self.recognizer is not None:
+            self.recognizer.Reset()
+        log.debug(f"VoskSTTService: Режим распознавания: {mode}.")
 
     async def initialize(self) -> None:
         log.info("VoskSTTService: Инициализация сервиса распознавания речи...")
-        log.info(f"VoskSTTService: Загрузка модели из {self.model_path}...")
-
-        # Выполняем блокирующую загрузку в отдельном потоке, чтобы не блокировать event loop
-        loop = asyncio.get_running_loop()
-        self.model = await loop.run_in_executor(None, Model, self.model_path)
+        if self.model is None:
+            log.info(f"VoskSTTService: Загрузка модели из {self.model_path}...")
+            # Выполняем блокирующую загрузку в пуле model_loading, чтобы не блокировать event loop
+            self.model = await run_blocking(self.executors, ExecutorRegistry.MODEL_LOADING, Model, self.model_path)
 
         if not self.model:
             raise RuntimeError(f"{Messages.FAILED_TO_LOAD_STT_MODEL} {self.model_path}.")
 
-        self.recognizer = KaldiRecognizer(self.model, self.sample_rate)
-        self.recognizer.SetWords(True)
-        log.info("VoskSTTService: Сервис распознавания речи успешно инициализирован.")
\ No newline at end of file
+        if self.use_grammar:
+            self._apply_grammar()
+        else:
+            self._full_recognizer = KaldiRecognizer(self.model, self.sample_rate)
+            self._setup_full_recognizer()
+        self.recognizer = self._full_recognizer
+        if self.two_tier:
+            keyword_grammar: str = json.dumps([self.keyword, STTService.UNKNOWN_WORD], ensure_ascii=False)
+            self._keyword_recognizer = KaldiRecognizer(self.model, self.sample_rate, keyword_grammar)
+            self._keyword_recognizer.SetWords(True)
+            self._apply_endpointer(self._keyword_recognizer, self.idle_endpointer)
+            self.mode = RecognitionMode.KEYWORD
+            self.recognizer = self._keyword_recognizer
+            log.info(f"VoskSTTService: Двухуровневое распознавание: в ожидании ищется только '{self.keyword}'.")
+        log.info("VoskSTTService: Сервис распознавания речи успешно инициализирован.")
+
+    def close(self) -> None:
+        """Модель и распознаватели освобождаются вместе с объектом: отдельных ресурсов нет."""
+        pass
+
+    async def warm_up(self, seconds: float = 1.0) -> float:
+        """
+        Прогревает декодер до начала распознавания: первая фраза после загрузки модели
+        декодируется заметно медленнее. Должен вызываться до запуска потока распознавания.
+        Возвращает затраченное время, секунды.
+        """
+        return await run_blocking(self.executors, ExecutorRegistry.COMPUTE, self.warm_up_blocking, seconds)
+
+    def warm_up_blocking(self, seconds: float = 1.0) -> float:
+        """Синхронная часть warm_up(): слабый шум порциями по 100 мс через все распознаватели."""
+        started: float = time.perf_counter()
+        noise: bytes = np.random.default_rng(0).normal(0.0, 300.0, int(self.sample_rate * seconds)) \
+            .astype(np.int16).tobytes()
+        chunk_bytes: int = self.sample_rate // 10 * 2
+        for recognizer in (self._full_recognizer, self._keyword_recognizer):
+            if recognizer is None:
+                continue
+            for offset in range(0, len(noise), chunk_bytes):
+                recognizer.AcceptWaveform(noise[offset:offset + chunk_bytes])
+            recognizer.FinalResult()
+            recognizer.Reset()
+        self._utterance.clear()
+        self._utterance_bytes = 0
+        self._decode_seconds = 0.0
+        return time.perf_counter() - started
+
+    def build_grammar(self) -> List[str]:
+        """
+        Список фраз грамматики: словарь, ключевое слово, ключевое слово + фраза и [unk].
+        Фраза словаря входит и в исходном, и в каноническом написании: вариант,
+        который словарь сводит к одной фразе ("to'liq ish" / "toliq ish"), Vosk
+        тоже должен уметь выдать.
+        """
+        phrases: List[str] = []
+        if self.vocabulary:
+            for phrase in self.vocabulary.phrases():
+                phrases.extend((phrase.lower(), self.vocabulary.canonicalize(phrase)))
+        if self.keyword:
+            # Команда может прозвучать сразу после ключевого слова, одной фразой
+            phrases.extend([self.keyword] + [f"{self.keyword} {phrase}" for phrase in phrases])
+        phrases.append(STTService.UNKNOWN_WORD)
+        return list(dict.fromkeys(phrases))
+
+    def _apply_grammar(self) -> None:
+        """Строит (или перестраивает) полный распознаватель по текущей версии словаря."""
+        if not self.model:
+            return
+        revision: int = self.vocabulary.revision if self.vocabulary else 0
+        phrases: List[str] = self.build_grammar()
+        grammar: str = json.dumps(phrases, ensure_ascii=False)
+        if self._full_recognizer and hasattr(self._full_recognizer, "SetGrammar"):
+            self._full_recognizer.SetGrammar(grammar)
+        else:
+            self._full_recognizer = KaldiRecognizer(self.model, self.sample_rate, grammar)
+            self._setup_full_recognizer()
+            if self.mode == RecognitionMode.FULL:
+                self.recognizer = self._full_recognizer
+        self._grammar_revision = revision
+        log.info(f"VoskSTTService: Грамматика распознавателя построена по словарю "
+                f"(версия {revision}, фраз: {len(phrases)}).")
+
+    def _setup_full_recognizer(self) -> None:
+        if self._full_recognizer is None:
+            return
+        self._full_recognizer.SetWords(True)
+        if self.max_alternatives > 0:
+            self._full_recognizer.SetMaxAlternatives(self.max_alternatives)
+        self._apply_endpointer(self._full_recognizer, self._current_endpointer())
+
+    def _current_endpointer(self) -> Optional[EndpointerProfile]:
+        """Профиль полного распознавателя: в двухуровневом режиме он работает только после активации."""
+        return self.active_endpointer if self._is_listening_active or self.two_tier else self.idle_endpointer
+
+    def _apply_endpointer(self, recognizer: Optional[KaldiRecognizer], profile: Optional[EndpointerProfile]) -> None:
+        if recognizer is None or profile is None:
+            return
+        is_native: bool = profile.apply(recognizer)
+        if not is_native and self._is_endpointer_native:
+            log.warning("VoskSTTService: Эта версия Vosk не поддерживает настройку эндпойнтера, "
+                        "профиль полного распознавателя эмулируется через FinalResult.")
+        self._is_endpointer_native = is_native
+        log.debug(f"VoskSTTService: Профиль эндпойнтера: {profile}.")
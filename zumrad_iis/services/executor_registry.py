@@ -0,0 +1,169 @@
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+log: logging.Logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class ExecutorPool:
+    """
+    Пул потоков подсистемы с метриками: глубина очереди, время ожидания в очереди
+    и время выполнения задач.
+
+    :param name: Имя пула (префикс имен потоков "zumrad-<name>").
+    :param max_workers: Размер пула.
+    """
+    def __init__(self, name: str, max_workers: int) -> None:
+        self.name: str = name
+        self.max_workers: int = max(1, max_workers)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=f"zumrad-{name}")
+        self._lock = threading.Lock()
+        self.queued: int = 0            # Задач ждут свободного потока
+        self.active: int = 0            # Задач выполняется
+        self.max_queued: int = 0
+        self.completed: int = 0
+        self.cancelled: int = 0         # Задач отменено до начала выполнения
+        self.total_wait: float = 0.0    # Суммарное ожидание в очереди, секунды
+        self.max_wait: float = 0.0
+        self.total_run: float = 0.0     # Суммарное время выполнения, секунды
+
+    async def run(self, func: Callable[..., T], *args: Any) -> T:
+        """
+        Выполняет блокирующую функцию в пуле, не блокируя цикл событий.
+        Задача, отмененная до начала выполнения (отмена ожидающей корутины
+        или shutdown(wait=False)), уходит из очереди без выполнения.
+        """
+        submitted: float = time.perf_counter()
+        is_queued: bool = True # Задача учтена в `queued`; снимает ее оттуда либо _job, либо отмена
+        with self._lock:
+            self.queued += 1
+            self.max_queued = max(self.max_queued, self.queued)
+
+        def _dequeue() -> bool:
+            """Снимает задачу с учета в очереди (вызывается под _lock); False - уже снята."""
+            nonlocal is_queued
+            if not is_queued:
+                return False
+            is_queued = False
+            self.queued -= 1
+            return True
+
+        def _job() -> T:
+            started: float = time.perf_counter()
+            wait: float = started - submitted
+            with self._lock:
+                _dequeue()
+                self.active += 1
+                self.total_wait += wait
+                self.max_wait = max(self.max_wait, wait)
+            if wait > 0.1:
+                log.debug(f"ExecutorPool '{self.name}': Задача ждала в очереди {wait * 1000:.0f} мс.")
+            try:
+                return func(*args)
+            finally:
+                with self._lock:
+                    self.active -= 1
+                    self.completed += 1
+                    self.total_run += time.perf_counter() - started
+
+        def _on_done(future: Future) -> None:
+            if future.cancelled():
+                with self._lock:
+                    if _dequeue():
+                        self.cancelled += 1
+
+        try:
+            future: Future = self._executor.submit(_job)
+        except RuntimeError:
+            # Пул уже остановлен
+            with self._lock:
+                _dequeue()
+            raise
+        future.add_done_callback(_on_done)
+        # Отмена ожидающей корутины отменяет и задачу, если она еще в очереди
+        return await asyncio.wrap_future(future)
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            average_wait: float = self.total_wait / self.completed if self.completed else 0.0
+            return {
+                "workers": self.max_workers,
+                "queued": self.queued,
+                "active": self.active,
+                "max_queued": self.max_queued,
+                "completed": self.completed,
+                "cancelled": self.cancelled,
+                "average_wait_ms": average_wait * 1000,
+                "max_wait_ms": self.max_wait * 1000,
+                "total_run_s": self.total_run,
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait, cancel_futures=not wait)
+
+
+class ExecutorRegistry:
+    """
+    Отдельные пулы потоков для подсистем вместо общего исполнителя цикла событий:
+    всплеск звуков обратной связи не задерживает воспроизведение речи,
+    а загрузка модели - ни то, ни другое.
+
+    :param sizes: Размеры пулов по именам; пулы, которых нет в словаре, создаются с DEFAULT_SIZES.
+    """
+    AUDIO_IO: str = "audio_io"                # Звуки обратной связи
+    SPEECH_PLAYBACK: str = "speech_playback"  # Воспроизведение синтезированной речи
+    MODEL_LOADING: str = "model_loading"      # Загрузка моделей STT и TTS
+    COMPUTE: str = "compute"                  # Синтез и прогрев моделей
+    DECODING: str = "decoding"                # Декодирование сессий SessionManager
+
+    DEFAULT_SIZES: Dict[str, int] = {
+        AUDIO_IO: 2,
+        SPEECH_PLAYBACK: 1,
+        MODEL_LOADING: 2,
+        COMPUTE: 2,
+        DECODING: 2,
+    }
+
+    def __init__(self, sizes: Optional[Dict[str, int]] = None) -> None:
+        self._sizes: Dict[str, int] = dict(ExecutorRegistry.DEFAULT_SIZES, **(sizes or {}))
+        self._pools: Dict[str, ExecutorPool] = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str) -> ExecutorPool:
+        """Пул по имени; создается при первом обращении."""
+        with self._lock:
+            pool: Optional[ExecutorPool] = self._pools.get(name)
+            if pool is None:
+                pool = ExecutorPool(name, self._sizes.get(name, 1))
+                self._pools[name] = pool
+            return pool
+
+    async def run(self, name: str, func: Callable[..., T], *args: Any) -> T:
+        return await self.get(name).run(func, *args)
+
+    def log_stats(self) -> None:
+        for name, pool in self._pools.items():
+            s = pool.stats()
+            log.info(f"ExecutorRegistry: Пул '{name}' ({s['workers']} потоков): задач {s['completed']}, "
+                    f"отменено {s['cancelled']}, очередь до {s['max_queued']}, ожидание в среднем {s['average_wait_ms']:.1f} мс "
+                    f"(макс. {s['max_wait_ms']:.1f} мс), выполнение {s['total_run_s']:.1f} с.")
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            pools = list(self._pools.values())
+            self._pools.clear()
+        for pool in pools:
+            pool.shutdown(wait=wait)
+
+
+async def run_blocking(executors: Optional[ExecutorRegistry], pool: str, func: Callable[..., T], *args: Any) -> T:
+    """Выполняет блокирующую функцию в пуле подсистемы, а без реестра - в исполнителе цикла событий по умолчанию."""
+    if executors is not None:
+        return await executors.run(pool, func, *args)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, func, *args)
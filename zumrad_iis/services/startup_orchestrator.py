@@ -0,0 +1,100 @@
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Sequence, Tuple
+
+log: logging.Logger = logging.getLogger(__name__)
+
+# Корутина загрузки компонента
+StartupStep = Callable[[], Awaitable[Any]]
+
+
+class StartupOrchestrator:
+    """
+    Параллельная загрузка независимых компонентов (модели STT, TTS и т.д.).
+
+    Каждый компонент загружается в своей задаче asyncio, как только готовы
+    его зависимости, поэтому время запуска определяется самым медленным
+    компонентом, а не суммой. Время загрузки каждого компонента замеряется.
+    Дождаться можно отдельного компонента (`wait`), например чтобы начать
+    слушать, пока синтез речи еще загружается, или всех сразу (`wait_all`).
+    """
+    def __init__(self) -> None:
+        self._steps: Dict[str, Tuple[StartupStep, Tuple[str, ...]]] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self.timings: Dict[str, float] = {} # Время загрузки компонентов, секунды
+        self._started_at: float = 0.0
+
+    def add(self, name: str, step: StartupStep, depends_on: Sequence[str] = ()) -> None:
+        """Регистрирует компонент; `depends_on` - компоненты, которые нужно загрузить раньше."""
+        if name in self._steps:
+            raise ValueError(f"Startup step '{name}' is already registered")
+        for dependency in depends_on:
+            if dependency not in self._steps:
+                raise ValueError(f"Startup step '{name}' depends on unknown step '{dependency}'")
+        self._steps[name] = (step, tuple(depends_on))
+
+    def start(self) -> None:
+        """Запускает загрузку всех зарегистрированных компонентов."""
+        self._started_at = time.perf_counter()
+        for name in self._steps:
+            if name not in self._tasks:
+                self._tasks[name] = asyncio.create_task(self._run_step(name), name=f"startup-{name}")
+
+    async def _run_step(self, name: str) -> Any:
+        step, depends_on = self._steps[name]
+        for dependency in depends_on:
+            await self._tasks[dependency]
+        started: float = time.perf_counter()
+        try:
+            result: Any = await step()
+        finally:
+            self.timings[name] = time.perf_counter() - started
+        log.info(f"StartupOrchestrator: '{name}' загружен за {self.timings[name]:.2f} с.")
+        return result
+
+    async def wait(self, name: str) -> Any:
+        """Ждет загрузки компонента и возвращает результат его корутины (исключение пробрасывается)."""
+        if name not in self._tasks:
+            raise KeyError(f"Startup step '{name}' is not started")
+        return await asyncio.shield(self._tasks[name])
+
+    async def wait_required(self, name: str) -> Any:
+        """
+        Как wait(), но для компонента, без которого запуск бессмыслен: если его загрузка
+        не удалась (или ожидание отменено), остальные загрузки отменяются, отчет
+        выводится после их завершения, а исключение пробрасывается.
+        """
+        try:
+            return await self.wait(name)
+        except BaseException:
+            self.cancel()
+            await self.wait_all()
+            raise
+
+    async def wait_all(self) -> Dict[str, Optional[BaseException]]:
+        """Ждет все компоненты и логирует отчет; возвращает ошибки по компонентам (None - успешно)."""
+        names = list(self._tasks)
+        results = await asyncio.gather(*(self._tasks[name] for name in names), return_exceptions=True)
+        errors: Dict[str, Optional[BaseException]] = {
+            name: result if isinstance(result, BaseException) else None for name, result in zip(names, results)
+        }
+        for name, error in errors.items():
+            if isinstance(error, asyncio.CancelledError):
+                log.info(f"StartupOrchestrator: Загрузка '{name}' отменена.")
+            elif error is not None:
+                log.error(f"StartupOrchestrator: Ошибка загрузки '{name}': {error}")
+        self.report()
+        return errors
+
+    def cancel(self) -> None:
+        """Отменяет незавершенные загрузки (например, при остановке до окончания запуска)."""
+        for task in self._tasks.values():
+            if not task.done():
+                task.cancel()
+
+    def report(self) -> None:
+        total: float = time.perf_counter() - self._started_at
+        details: str = ", ".join(f"{name} {seconds:.2f} с" for name, seconds in self.timings.items())
+        log.info(f"StartupOrchestrator: Запуск за {total:.2f} с ({details}; "
+                f"последовательно - {sum(self.timings.values()):.2f} с).")
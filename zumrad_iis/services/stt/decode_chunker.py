@@ -0,0 +1,55 @@
+import logging
+from typing import Iterator
+
+import numpy as np
+
+log: logging.Logger = logging.getLogger(__name__)
+
+
+class DecodeChunker:
+    """
+    Перенарезает блоки захвата на порции заданного размера для декодера.
+
+    Если порция меньше блока захвата, блок режется на срезы memoryview без копирования.
+    Если больше - блоки копятся в заранее выделенном буфере, и наружу отдается
+    memoryview на него. Выданная порция валидна до следующей итерации генератора `push()`.
+
+    :param chunk_samples: Размер порции в семплах int16 (с учетом каналов).
+    """
+    SAMPLE_WIDTH: int = 2  # int16
+
+    def __init__(self, chunk_samples: int) -> None:
+        if chunk_samples < 1:
+            raise ValueError(f"Decode chunk size must be positive: {chunk_samples}")
+        self.chunk_bytes: int = chunk_samples * DecodeChunker.SAMPLE_WIDTH
+        self._accumulator: np.ndarray = np.zeros(chunk_samples, dtype=np.int16)
+        self._view: memoryview = memoryview(self._accumulator).cast("B")
+        self._filled: int = 0  # Байт в накопителе
+
+    def push(self, block: bytes | memoryview) -> Iterator[memoryview]:
+        """Принимает блок захвата и отдает готовые порции для декодера."""
+        data: memoryview = memoryview(block).cast("B")
+        offset: int = 0
+        size: int = data.nbytes
+        if self._filled:
+            # Дополняем начатую порцию
+            take: int = min(self.chunk_bytes - self._filled, size)
+            self._view[self._filled:self._filled + take] = data[:take]
+            self._filled += take
+            offset = take
+            if self._filled < self.chunk_bytes:
+                return
+            self._filled = 0
+            yield self._view
+        # Целые порции отдаем срезами исходного блока, без копирования
+        while size - offset >= self.chunk_bytes:
+            yield data[offset:offset + self.chunk_bytes]
+            offset += self.chunk_bytes
+        rest: int = size - offset
+        if rest:
+            self._view[:rest] = data[offset:]
+            self._filled = rest
+
+    def reset(self) -> None:
+        """Отбрасывает начатую порцию."""
+        self._filled = 0
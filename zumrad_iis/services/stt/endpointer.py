@@ -0,0 +1,88 @@
+import logging
+from typing import Any, Dict, Optional
+
+log: logging.Logger = logging.getLogger(__name__)
+
+
+class EndpointerProfile:
+    """
+    Профиль эндпойнтера Vosk: сколько тишины ждать, прежде чем считать фразу законченной.
+
+    Короткий профиль быстрее завершает короткие команды ("выход"), но может
+    разрезать фразу на паузе; длинный - наоборот. Задается режимом Vosk
+    (`SetEndpointerMode`) и, при необходимости, явными задержками
+    (`SetEndpointerDelays`).
+
+    Vosk 0.3.45, закрепленный в poetry.lock, этих методов не имеет. Тогда
+    STTService эмулирует профиль через FinalResult: фраза завершается, когда
+    промежуточная гипотеза не менялась `end_seconds` или фраза длится дольше
+    `t_max`. Так профиль может только ускорить завершение фразы: отложить
+    эндпойнтер самого Vosk ("long") нельзя.
+
+    :param name: Имя профиля из config.yaml.
+    :param mode: "default" | "short" | "long" | "very_long".
+    :param t_start_max: Максимум тишины до начала речи, секунды.
+    :param t_end: Тишина после речи, завершающая фразу, секунды.
+    :param t_max: Максимальная длина фразы, секунды.
+    """
+    __slots__ = ("name", "mode", "t_start_max", "t_end", "t_max")
+
+    # Значения vosk.EndpointerMode
+    MODES: Dict[str, int] = {"default": 0, "short": 1, "long": 2, "very_long": 3}
+    # Тишина после речи для эмуляции режима без явного t_end:
+    # режим "short" Vosk вдвое сокращает стандартные 0.5 с
+    MODE_END_SECONDS: Dict[str, float] = {"short": 0.25}
+
+    def __init__(self,
+                name: str,
+                mode: str = "default",
+                t_start_max: Optional[float] = None,
+                t_end: Optional[float] = None,
+                t_max: Optional[float] = None,
+                ) -> None:
+        if mode not in EndpointerProfile.MODES:
+            raise ValueError(f"Unknown endpointer mode '{mode}' in profile '{name}'.")
+        self.name: str = name
+        self.mode: str = mode
+        self.t_start_max: Optional[float] = t_start_max
+        self.t_end: Optional[float] = t_end
+        self.t_max: Optional[float] = t_max
+
+    @classmethod
+    def from_config(cls, name: Optional[str], profiles: Dict[str, Dict[str, Any]]) -> Optional["EndpointerProfile"]:
+        """Профиль по имени из секции stt.endpointer.profiles; None - оставить настройки Vosk."""
+        if not name:
+            return None
+        settings: Optional[Dict[str, Any]] = profiles.get(name)
+        if settings is None:
+            log.warning(f"EndpointerProfile: Профиль '{name}' не найден в конфигурации, используются настройки Vosk.")
+            return None
+        return cls(name,
+                settings.get("mode", "default"),
+                settings.get("t_start_max"),
+                settings.get("t_end"),
+                settings.get("t_max"))
+
+    @property
+    def end_seconds(self) -> Optional[float]:
+        """Тишина после речи, завершающая фразу при эмуляции; None - не эмулируется."""
+        return self.t_end if self.t_end is not None else EndpointerProfile.MODE_END_SECONDS.get(self.mode)
+
+    def apply(self, recognizer: Any) -> bool:
+        """
+        Настраивает KaldiRecognizer. Вызывается из потока, который работает с распознавателем.
+
+        Returns:
+            False, если эта версия Vosk не поддерживает настройку эндпойнтера
+            и профиль нужно эмулировать.
+        """
+        if not hasattr(recognizer, "SetEndpointerMode"):
+            return False
+        recognizer.SetEndpointerMode(EndpointerProfile.MODES[self.mode])
+        if None not in (self.t_start_max, self.t_end, self.t_max) and hasattr(recognizer, "SetEndpointerDelays"):
+            recognizer.SetEndpointerDelays(self.t_start_max, self.t_end, self.t_max)
+        return True
+
+    def __repr__(self) -> str:
+        return (f"EndpointerProfile({self.name!r}, mode={self.mode}, "
+                f"t_start_max={self.t_start_max}, t_end={self.t_end}, t_max={self.t_max})")
@@ -0,0 +1,88 @@
+from typing import Tuple, Union
+
+
+class PartialEvent:
+    """
+    Промежуточная гипотеза распознавания (PartialResult Vosk).
+
+    :param text: Текст гипотезы.
+    :param utterance_id: Номер фразы; у всех событий одной фразы он одинаковый.
+    :param is_stable: Гипотеза не менялась заданное число порций подряд.
+    """
+    __slots__ = ("text", "utterance_id", "is_stable")
+
+    def __init__(self, text: str, utterance_id: int, is_stable: bool = False) -> None:
+        self.text: str = text
+        self.utterance_id: int = utterance_id
+        self.is_stable: bool = is_stable
+
+    def __repr__(self) -> str:
+        return f"PartialEvent({self.text!r}, utterance={self.utterance_id}, stable={self.is_stable})"
+
+
+class WordInfo:
+    """
+    Слово окончательного результата (SetWords Vosk).
+
+    :param word: Слово.
+    :param conf: Уверенность, 0..1.
+    :param start: Начало слова, секунды от начала потока распознавателя.
+    :param end: Конец слова, секунды.
+    """
+    __slots__ = ("word", "conf", "start", "end")
+
+    def __init__(self, word: str, conf: float, start: float, end: float) -> None:
+        self.word: str = word
+        self.conf: float = conf
+        self.start: float = start
+        self.end: float = end
+
+    def __repr__(self) -> str:
+        return f"WordInfo({self.word!r}, conf={self.conf:.2f}, {self.start:.2f}-{self.end:.2f})"
+
+
+class STTResult:
+    """
+    Окончательный результат фразы (Result / FinalResult Vosk).
+
+    :param text: Распознанный текст.
+    :param utterance_id: Номер фразы.
+    :param words: Слова с уверенностью и временем (пусто, если Vosk их не выдал).
+    :param audio_seconds: Длительность аудио фразы, переданного в декодер.
+    :param decode_seconds: Время, затраченное декодером на фразу (wall-time).
+    :param alternatives: N-best гипотезы (текст, оценка Vosk), лучшая первой;
+        пусто, если альтернативы не запрашивались.
+    """
+    __slots__ = ("text", "utterance_id", "words", "audio_seconds", "decode_seconds", "alternatives")
+
+    def __init__(self,
+                text: str,
+                utterance_id: int,
+                words: Tuple[WordInfo, ...] = (),
+                audio_seconds: float = 0.0,
+                decode_seconds: float = 0.0,
+                alternatives: Tuple[Tuple[str, float], ...] = (),
+                ) -> None:
+        self.text: str = text
+        self.utterance_id: int = utterance_id
+        self.words: Tuple[WordInfo, ...] = words
+        self.audio_seconds: float = audio_seconds
+        self.decode_seconds: float = decode_seconds
+        self.alternatives: Tuple[Tuple[str, float], ...] = alternatives
+
+    @property
+    def confidence(self) -> float:
+        """Уверенность фразы - минимальная по словам (1.0, если слов нет)."""
+        return min((w.conf for w in self.words), default=1.0)
+
+    @property
+    def rtf(self) -> float:
+        """Real-time factor: время декодирования к длительности аудио."""
+        return self.decode_seconds / self.audio_seconds if self.audio_seconds else 0.0
+
+    def __repr__(self) -> str:
+        return (f"STTResult({self.text!r}, utterance={self.utterance_id}, "
+                f"confidence={self.confidence:.2f}, rtf={self.rtf:.3f})")
+
+
+RecognitionEvent = Union[PartialEvent, STTResult]
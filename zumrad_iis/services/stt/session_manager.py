@@ -0,0 +1,241 @@
+import asyncio
+import logging
+import threading
+from typing import Any, Callable, Coroutine, Dict, Optional
+
+from vosk import Model
+
+from zumrad_iis.services.audio_input_service import AudioInputService
+from zumrad_iis.services.avosk_stt import Messages, STTService
+from zumrad_iis.services.executor_registry import ExecutorRegistry, run_blocking
+from zumrad_iis.services.stt.recognition_events import RecognitionEvent, STTResult
+
+log: logging.Logger = logging.getLogger(__name__)
+
+# Обработчик событий сессии: (id сессии, событие)
+SessionHandler = Callable[[str, RecognitionEvent], Coroutine[Any, Any, None]]
+
+
+class RecognitionSession:
+    """
+    Сессия распознавания: свой STTService (свои KaldiRecognizer) поверх общей модели
+    и обработчик результатов. Распознаватель сессии не потокобезопасен, поэтому
+    все обращения к нему идут под `_decode_lock`; порции, поданные через feed(),
+    дополнительно упорядочены `_feed_lock`.
+    """
+    def __init__(self, session_id: str, model_path: str, stt: STTService, handler: SessionHandler) -> None:
+        self.session_id: str = session_id
+        self.model_path: str = model_path
+        self.stt: STTService = stt
+        self.handler: SessionHandler = handler
+        self._feed_lock = asyncio.Lock() # asyncio.Lock пропускает ожидающих по порядку: порции не переставляются
+        self._decode_lock = threading.Lock()
+        self._pending_mode: Optional[str] = None # Режим, который применится перед следующей порцией
+        self._is_open: bool = True
+        self._pump_thread: Optional[threading.Thread] = None # Чтение из AudioInputService, см. attach_audio()
+        self.results_count: int = 0
+
+    def decode(self, audio_data: bytes | memoryview) -> Optional[RecognitionEvent]:
+        """Подает порцию в распознаватель сессии. Вызывается из потока декодирования."""
+        with self._decode_lock:
+            self._apply_pending_mode()
+            return self.stt.accept(audio_data)
+
+    def finalize(self) -> Optional[STTResult]:
+        with self._decode_lock:
+            self._apply_pending_mode()
+            return self.stt.finalize()
+
+    def _apply_pending_mode(self) -> None:
+        if self._pending_mode is not None:
+            mode, self._pending_mode = self._pending_mode, None
+            self.stt.set_mode(mode)
+
+
+class SessionManager:
+    """
+    Несколько сессий распознавания (микрофонов, комнат) в одном процессе.
+
+    Каждая модель Vosk загружается один раз и делится между сессиями: сессия
+    создает только свои KaldiRecognizer, поэтому память растет с числом сессий,
+    а не моделей. Модель выгружается, когда закрыта последняя использующая ее сессия.
+
+    Аудио подается вызовом feed() (декодирование в пуле decoding ExecutorRegistry)
+    или из AudioInputService (attach_audio()): тогда у сессии свой поток декодирования,
+    который читает блоки через read_frame() без перехода в цикл событий на каждый блок,
+    как поток SpeechRecognizer. Результаты доставляются обработчику своей сессии в цикле событий.
+    """
+    READ_TIMEOUT: float = 0.5 # Как часто поток сессии перепроверяет, что она открыта
+    JOIN_TIMEOUT: float = 2.0
+
+    def __init__(self, executors: Optional[ExecutorRegistry] = None) -> None:
+        self.executors: Optional[ExecutorRegistry] = executors
+        self._models: Dict[str, Model] = {}
+        self._model_loads: Dict[str, asyncio.Task] = {} # Загрузка идет один раз, даже если сессии открываются одновременно
+        self._sessions: Dict[str, RecognitionSession] = {}
+
+    @property
+    def sessions(self) -> Dict[str, RecognitionSession]:
+        return dict(self._sessions)
+
+    @property
+    def loaded_models(self) -> int:
+        return len(self._models)
+
+    def register_model(self, model_path: str, model: Model) -> None:
+        """Добавляет в кэш модель, уже загруженную другим сервисом (например, основным STTService)."""
+        self._models.setdefault(model_path, model)
+
+    async def get_model(self, model_path: str) -> Model:
+        """Модель из кэша; при первом обращении загружается в пуле model_loading."""
+        model: Optional[Model] = self._models.get(model_path)
+        if model is not None:
+            return model
+        load: Optional[asyncio.Task] = self._model_loads.get(model_path)
+        if load is None:
+            log.info(f"SessionManager: Загрузка модели из {model_path}...")
+            load = asyncio.ensure_future(
+                run_blocking(self.executors, ExecutorRegistry.MODEL_LOADING, Model, model_path))
+            self._model_loads[model_path] = load
+        try:
+            model = await asyncio.shield(load)
+        finally:
+            self._model_loads.pop(model_path, None)
+        if not model:
+            raise RuntimeError(f"{Messages.FAILED_TO_LOAD_STT_MODEL} {model_path}.")
+        self._models[model_path] = model
+        return model
+
+    async def open_session(self,
+                        session_id: str,
+                        model_path: str,
+                        sample_rate: int,
+                        handler: SessionHandler,
+                        **stt_kwargs: Any,
+                        ) -> RecognitionSession:
+        """
+        Открывает сессию. `stt_kwargs` - параметры STTService (vocabulary, keyword,
+        use_grammar, two_tier, ...), у каждой сессии могут быть свои.
+        """
+        if session_id in self._sessions:
+            raise ValueError(f"Recognition session '{session_id}' is already open")
+        model: Model = await self.get_model(model_path)
+        stt = STTService(model_path=model_path,
+                        audio_input=None,  # type: ignore[arg-type] # Аудио подает SessionManager
+                        sample_rate=sample_rate,
+                        executors=self.executors,
+                        model=model,
+                        **stt_kwargs)
+        try:
+            await stt.initialize()
+        except Exception:
+            self._release_model(model_path)
+            raise
+        session = RecognitionSession(session_id, model_path, stt, handler)
+        self._sessions[session_id] = session
+        log.info(f"SessionManager: Сессия '{session_id}' открыта (модель {model_path}, "
+                f"сессий: {len(self._sessions)}, моделей: {len(self._models)}).")
+        return session
+
+    async def feed(self, session_id: str, audio_data: bytes | memoryview) -> Optional[RecognitionEvent]:
+        """Декодирует порцию аудио сессии и доставляет событие (если есть) ее обработчику."""
+        session: RecognitionSession = self._get_session(session_id)
+        if not isinstance(audio_data, bytes):
+            audio_data = bytes(audio_data) # Блок захвата валиден только до следующего чтения
+        async with session._feed_lock:
+            event: Optional[RecognitionEvent] = await run_blocking(
+                self.executors, ExecutorRegistry.DECODING, session.decode, audio_data)
+        await self._deliver(session, event)
+        return event
+
+    async def finalize(self, session_id: str) -> Optional[STTResult]:
+        """Принудительно завершает текущую фразу сессии (см. STTService.finalize)."""
+        session: RecognitionSession = self._get_session(session_id)
+        async with session._feed_lock:
+            result: Optional[STTResult] = await run_blocking(
+                self.executors, ExecutorRegistry.DECODING, session.finalize)
+        await self._deliver(session, result)
+        return result
+
+    def set_mode(self, session_id: str, mode: str) -> None:
+        """Режим распознавания сессии; применяется в потоке декодирования перед следующей порцией."""
+        self._get_session(session_id)._pending_mode = mode
+
+    def set_mode_all(self, mode: str) -> None:
+        for session in self._sessions.values():
+            session._pending_mode = mode
+
+    def attach_audio(self, session_id: str, audio_input: AudioInputService) -> None:
+        """
+        Подает в сессию аудио из AudioInputService, пока захват не остановлен
+        или сессия не закрыта. Вызывается из цикла событий.
+        """
+        session: RecognitionSession = self._get_session(session_id)
+        if session._pump_thread and session._pump_thread.is_alive():
+            raise ValueError(f"Recognition session '{session_id}' already has an audio input")
+        session._pump_thread = threading.Thread(
+            target=self._pump, args=(session, audio_input, asyncio.get_running_loop()),
+            name=f"zumrad-session-{session_id}", daemon=True)
+        session._pump_thread.start()
+
+    def _pump(self, session: RecognitionSession, audio_input: AudioInputService,
+            loop: asyncio.AbstractEventLoop) -> None:
+        """Тело потока декодирования сессии."""
+        log.debug(f"SessionManager: Поток аудио сессии '{session.session_id}' запущен.")
+        while session._is_open and audio_input.is_capturing:
+            audio_data: Optional[memoryview] = audio_input.read_frame(SessionManager.READ_TIMEOUT)
+            if audio_data is None:
+                if audio_input.is_finished:
+                    break
+                continue # Таймаут или остановка захвата: перепроверяем условия
+            try:
+                event: Optional[RecognitionEvent] = session.decode(audio_data)
+            except Exception as e:
+                log.error(f"SessionManager: Ошибка распознавания в сессии '{session.session_id}': {e}", exc_info=True)
+                continue
+            if event is not None and not loop.is_closed():
+                asyncio.run_coroutine_threadsafe(self._deliver(session, event), loop)
+        log.debug(f"SessionManager: Поток аудио сессии '{session.session_id}' завершен.")
+
+    async def _deliver(self, session: RecognitionSession, event: Optional[RecognitionEvent]) -> None:
+        if event is None:
+            return
+        if isinstance(event, STTResult):
+            session.results_count += 1
+        try:
+            await session.handler(session.session_id, event)
+        except Exception as e:
+            log.error(f"SessionManager: Ошибка обработчика сессии '{session.session_id}': {e}", exc_info=True)
+
+    async def close_session(self, session_id: str) -> None:
+        """Закрывает сессию; модель выгружается, если ее больше никто не использует."""
+        session: Optional[RecognitionSession] = self._sessions.pop(session_id, None)
+        if session is None:
+            return
+        session._is_open = False
+        thread: Optional[threading.Thread] = session._pump_thread
+        if thread is not None:
+            # Поток замечает закрытие не позже READ_TIMEOUT
+            await run_blocking(self.executors, ExecutorRegistry.DECODING, thread.join, SessionManager.JOIN_TIMEOUT)
+            if thread.is_alive():
+                log.warning(f"SessionManager: Поток аудио сессии '{session_id}' не завершился вовремя.")
+        async with session._feed_lock: # Дожидаемся декодирования, которое уже идет
+            session.stt.close()
+        self._release_model(session.model_path)
+        log.info(f"SessionManager: Сессия '{session_id}' закрыта (результатов: {session.results_count}).")
+
+    def _release_model(self, model_path: str) -> None:
+        if any(s.model_path == model_path for s in self._sessions.values()):
+            return
+        if self._models.pop(model_path, None) is not None:
+            log.info(f"SessionManager: Модель {model_path} выгружена.")
+
+    async def close(self) -> None:
+        for session_id in list(self._sessions):
+            await self.close_session(session_id)
+
+    def _get_session(self, session_id: str) -> RecognitionSession:
+        session: Optional[RecognitionSession] = self._sessions.get(session_id)
+        if session is None:
+            raise KeyError(f"Recognition session '{session_id}' is not open")
+        return session
@@ -1,10 +1,14 @@
 # speech_recognizer.py
-from typing import Optional, Callable, Coroutine, Any
+from typing import Optional, Callable, Coroutine, Any, Tuple
 import asyncio
 import logging
-import concurrent.futures
+import threading
+import time
 from zumrad_iis.services.audio_input_service import AudioInputService
 from zumrad_iis.services.avosk_stt import Messages, STTServiceProtocol
+from zumrad_iis.services.stt.decode_chunker import DecodeChunker
+from zumrad_iis.services.stt.recognition_events import PartialEvent, RecognitionEvent, STTResult
+from zumrad_iis.services.stt.voice_activity_detector import VoiceActivityDetector
 
 log = logging.getLogger(__name__) 
 
@@ -13,26 +17,66 @@ class SpeechRecognizer:
     Класс для управления процессом распознавания речи.
     Отвечает за получение аудиоданных, передачу их в STT-сервис
     и отправку распознанного текста в обработчик.
-    Работает в отдельном потоке, чтобы не блокировать основной цикл asyncio.
+    Работает в выделенном потоке "zumrad-recognition", чтобы не блокировать основной цикл asyncio.
     """
+    READ_TIMEOUT: float = 0.5  # Секунд ожидания блока, после которых перепроверяется is_running
+    JOIN_TIMEOUT: float = 5.0  # Сколько ждать выхода потока распознавания при остановке
+    # Перезапуск потока после временной ошибки: пауза растет от RESTART_DELAY до MAX_RESTART_DELAY
+    RESTART_DELAY: float = 0.5
+    MAX_RESTART_DELAY: float = 8.0
+    MAX_RESTARTS: int = 5
+    HEALTHY_RUN_SECONDS: float = 60.0 # Проход без ошибок дольше этого обнуляет счетчик перезапусков
+
     def __init__(self,
                 audio_in: AudioInputService,
                 stt: STTServiceProtocol, # Interface for realization of VoskSTTService
                 ready_handler: Callable[[], Coroutine[Any, Any, None]],
-                recognized_text_handler: Callable[[str], Coroutine[Any, Any, None]],
-                stop_handler: Callable[[], Coroutine[Any, Any, None]]
+                recognized_text_handler: Callable[[STTResult], Coroutine[Any, Any, None]],
+                stop_handler: Callable[[], Coroutine[Any, Any, None]],
+                vad: Optional[VoiceActivityDetector] = None,
+                decode_blocksize: Optional[int] = None,
+                resume_discard_ms: int = 0,
+                partial_handler: Optional[Callable[[PartialEvent], Coroutine[Any, Any, None]]] = None,
+                force_final_silence_ms: int = 0
                 ):
         self.audio_in = audio_in
         self.stt = stt
+        self.vad = vad # Если задан, тишина не передается в STT-сервис
+        # Размер порции (в кадрах), которой аудио подается в декодер.
+        # Отличается от размера блока захвата в режиме низкой задержки.
+        self.decode_blocksize: int = decode_blocksize or audio_in.blocksize
+        self._chunker: Optional[DecodeChunker] = None
+        if self.decode_blocksize != audio_in.blocksize:
+            self._chunker = DecodeChunker(self.decode_blocksize * audio_in.channels)
+        self.added_latency_ms: float = 0.0 # Задержка буферизации до декодера, см. _report_latency()
+        self.resume_discard_ms: int = resume_discard_ms # Сколько аудио отбросить после resume()
+        # Тишина по VAD (после hangover), после которой фраза завершается принудительно; 0 - сразу по окончании
+        # hangover. Тишину VAD в Vosk не передает, поэтому его эндпойнтер (~1 с тишины) фразу сам не завершит
+        self.force_final_silence_ms: int = force_final_silence_ms if vad else 0
+        if force_final_silence_ms and not vad:
+            log.warning("SpeechRecognizer: Принудительное завершение фразы по тишине требует VAD и отключено.")
+        self._force_final_bytes: int = audio_in.samplerate * force_final_silence_ms // 1000 * audio_in.channels * 2
+        self._silence_bytes: int = -1 # Тишина по VAD после последней порции речи; -1 - фраза уже завершена
+        self._is_reset_pending: bool = False # Сброс состояния конвейера, выполняется в потоке распознавания
+        self._pending_mode: Optional[str] = None # Режим распознавания, который применит поток распознавания
+        # Фраза, уже обработанная по промежуточной гипотезе: ее дальнейшие события не доставляются
+        self._consumed_utterance: Optional[int] = None
+        self._is_utterance_reset_pending: bool = False
+        # Суммарные аудио и время декодирования окончательных результатов, см. _log_decode_stats()
+        self._results_count: int = 0
+        self._audio_seconds: float = 0.0
+        self._decode_seconds: float = 0.0
         self._base_event_loop: Optional[asyncio.AbstractEventLoop] = None
         self.ready_handler = ready_handler
         self.recognized_text_handler = recognized_text_handler
+        self.partial_handler = partial_handler # Необязательный обработчик промежуточных гипотез
         self.stop_handler = stop_handler # Корутина для завершения работы систем
         self.is_running = False
-        self._is_pause = False
         self._recognition_exeption: Optional[Exception] = None
         
-        self._recognition_task: Optional[asyncio.Task] = None
+        self._recognition_thread: Optional[threading.Thread] = None
+        self._thread_finished: Optional[asyncio.Event] = None # Устанавливается потоком при выходе
+        self._stop_event = threading.Event() # Прерывает паузу перед перезапуском
         
     def set_event_loop(self, loop: asyncio.AbstractEventLoop):
         """Устанавливает цикл событий asyncio для потокобезопасных операций."""
@@ -40,78 +84,161 @@ class SpeechRecognizer:
         
     async def initialize(self):
         log.info("SpeechRecognizer: Инициализация сервиса распознавания речи...")
+        if hasattr(self.stt, "set_event_handler"):
+            # Распознавание в отдельном процессе: порции не ждут ответа воркера,
+            # события приходят из потока его ответов
+            self.stt.set_event_handler(self._dispatch)
         await self.stt.initialize()
             
     def _threaded_recognition_loop(self) -> None:
         """
-        Этот цикл выполняется в одном, выделенном потоке, чтобы обеспечить
-        сохранность состояния для stateful STT-библиотек (Vosk).
-        Он синхронно получает аудио, распознает его и передает результат
-        в основной цикл событий asyncio для асинхронной обработки.
+        Тело выделенного потока распознавания "zumrad-recognition".
+        Все обращения к stateful STT-библиотеке (Vosk) идут из этого одного потока.
+
+        Поток сам себя перезапускает после временной ошибки: модель при этом
+        не перезагружается, сбрасываются только порции, VAD и текущая фраза.
+        Перезапуски идут с растущей паузой; если ошибки повторяются чаще,
+        чем раз в HEALTHY_RUN_SECONDS, больше MAX_RESTARTS раз, распознавание останавливается.
         """
-        if not self._base_event_loop:
-            log.error("SpeechRecognizer: Цикл событий не установлен. Цикл распознавания не может быть запущен.")
-            raise RuntimeError("Event loop is not set for SpeechRecognizer.")
-        log.debug("SpeechRecognizer: Потоковый цикл распознавания речи запущен.")
-        self.ready_handler()
-        
+        log.debug("SpeechRecognizer: Поток распознавания речи запущен.")
         try:
+            self.ready_handler()
+            restarts: int = 0
             while self.is_running:
-                # 1. Получаем данные из asyncio-очереди, блокируя текущий поток (не event loop)
-                # до тех пор, пока корутина не завершится в основном цикле.
-                if not self._is_pause:
-                    future = asyncio.run_coroutine_threadsafe(self.audio_in.get_data(), self._base_event_loop)
-                    audio_data = future.result()  # Блокирующий вызов
-
-                    if audio_data is None:
-                        log.info("SpeechRecognizer: Поток аудио ввода завершился в цикле распознавания.")
+                started: float = time.monotonic()
+                try:
+                    self._recognition_pass()
+                    break # Штатное завершение: остановка или конец источника аудио
+                except Exception as e:
+                    if self._is_critical_error(e):
+                        log.critical(f"SpeechRecognizer: Критическая ошибка в потоке распознавания: {e}", exc_info=True)
                         break
-                    if not self.is_running:  # Проверка после блокирующего вызова
+                    if time.monotonic() - started > SpeechRecognizer.HEALTHY_RUN_SECONDS:
+                        restarts = 0
+                    restarts += 1
+                    if restarts > SpeechRecognizer.MAX_RESTARTS:
+                        log.error(f"SpeechRecognizer: Ошибки повторяются ({e}), распознавание остановлено.",
+                                exc_info=True)
                         break
-
-                    # 2. CPU-bound операция выполняется в том же потоке, что и предыдущая итерация.
-                    # Это решает проблему сброса состояния в Vosk.
-                    recognized_text = self.stt.transcribe(audio_data)
-
-                    if not recognized_text:
-                        continue
-
-                    log.debug(f"Thread Recon >>: {recognized_text}")
-                    # 3. Передаем результат обратно в основной event loop для безопасного выполнения
-                    # асинхронного обработчика.
-                    asyncio.run_coroutine_threadsafe(
-                        self.recognized_text_handler(recognized_text),
-                        self._base_event_loop
-                    )
-        except concurrent.futures.CancelledError:
-            # Обработка отмены future.result() в Windows
-            log.info("SpeechRecognizer: Потоковый цикл распознавания прерван (concurrent.futures.CancelledError).")
-            # is_running уже должен быть False, но на всякий случай:
-            self.is_running = False
-        except asyncio.CancelledError:
-            log.info("SpeechRecognizer: Потоковый цикл распознавания отменен (CancelledError).")
-        except Exception as e:
-            if self._is_critical_error(e):
-                # Это может произойти в Windows при отмене. Не считаем это ошибкой.
-                log.critical("Критическая ошибка в потоковом цикле распознавания: {e}", exc_info=True)
-                if self._base_event_loop.is_running():
-                    asyncio.run_coroutine_threadsafe(self.stop(), self._base_event_loop)
-            else:
-                log.error(f"SpeechRecognizer: Временная ошибка в потоковом цикле распознавания: {e}")
-                # Здесь можно добавить логику обработки временных ошибок, например:
-                # 1. Попробовать перезапустить цикл распознавания после небольшой задержки.
-                # 2. Увеличить задержку после нескольких неудачных попыток.
-                # 3. Ограничить количество попыток перезапуска, чтобы избежать бесконечного цикла.
-                # Например:
-                # asyncio.sleep(1)
-                # if self.is_running: # Проверяем, не остановлен ли сервис извне
-                #     asyncio.run_coroutine_threadsafe(self.start(), self._base_event_loop)
+                    delay: float = min(SpeechRecognizer.RESTART_DELAY * 2 ** (restarts - 1),
+                                    SpeechRecognizer.MAX_RESTART_DELAY)
+                    log.error(f"SpeechRecognizer: Временная ошибка в потоке распознавания: {e}. "
+                            f"Перезапуск через {delay:.1f} с ({restarts}/{SpeechRecognizer.MAX_RESTARTS}).")
+                    if self._stop_event.wait(delay):
+                        break
+                    self._reset_pipeline()
+                    self.stt.reset_utterance()
         finally:
-            # Безопасно передаем управление в основной поток для остановки
-            log.debug("SpeechRecognizer: Блок finally. Гарантированный вызов stop().")
-            # if self._base_event_loop.is_running():
-                # asyncio.run_coroutine_threadsafe(self.stop(), self._base_event_loop)
-                
+            log.debug("SpeechRecognizer: Поток распознавания речи завершен.")
+            # start() ждет это событие в цикле asyncio
+            if self._base_event_loop and not self._base_event_loop.is_closed() and self._thread_finished:
+                self._base_event_loop.call_soon_threadsafe(self._thread_finished.set)
+
+    def _recognition_pass(self) -> None:
+        """Один проход цикла распознавания: до остановки, конца источника или исключения."""
+        while self.is_running:
+            # 1. Ждем блок из буфера захвата, блокируя только текущий поток.
+            # Занятый цикл событий (TTS, обработчики команд) не задерживает аудио.
+            audio_data = self.audio_in.read_frame(timeout=SpeechRecognizer.READ_TIMEOUT)
+
+            if not self.is_running:  # Проверка после блокирующего вызова
+                break
+            if audio_data is None:
+                if self.audio_in.is_finished:
+                    log.info("SpeechRecognizer: Поток аудио ввода завершился в цикле распознавания.")
+                    break
+                # Таймаут, пауза или остановка захвата: перепроверяем is_running
+                continue
+
+            if self._pending_mode is not None:
+                # KaldiRecognizer переключается только в потоке, который с ним работает
+                mode, self._pending_mode = self._pending_mode, None
+                self.stt.set_mode(mode)
+
+            if self._is_utterance_reset_pending:
+                self._is_utterance_reset_pending = False
+                if self.stt.utterance_id == self._consumed_utterance:
+                    self.stt.reset_utterance()
+
+            if self._is_reset_pending:
+                # Аудио до паузы и после нее не должно склеиваться в одну порцию
+                self._is_reset_pending = False
+                self._reset_pipeline()
+
+            # 2. Блок захвата нарезается на порции декодера (если размеры различаются),
+            # VAD отсеивает тишину: в начале речи добавляет пре-ролл,
+            # а тихие порции вовсе не попадают в AcceptWaveform.
+            portions = self._chunker.push(audio_data) if self._chunker else (audio_data,)
+            for portion in portions:
+                chunks = self.vad.process(portion) if self.vad else (portion,)
+                for chunk in chunks:
+                    self._transcribe(chunk)
+                if self.vad:
+                    self._track_silence(portion, bool(chunks))
+
+    def _reset_pipeline(self) -> None:
+        if self._chunker:
+            self._chunker.reset()
+        if self.vad:
+            self.vad.reset()
+        self._silence_bytes = -1
+
+    def _transcribe(self, chunk: bytes | memoryview) -> None:
+        # 3. CPU-bound операция выполняется в том же потоке, что и предыдущая итерация.
+        # Это решает проблему сброса состояния в Vosk.
+        self._dispatch(self.stt.accept(chunk))
+
+    def _track_silence(self, portion: bytes | memoryview, has_speech: bool) -> None:
+        """
+        Считает тишину после речи (VAD уже отдал hangover) и, когда она достигает
+        force_final_silence_ms, завершает фразу (FinalResult), не дожидаясь эндпойнтера Vosk.
+        """
+        if has_speech:
+            self._silence_bytes = 0
+            return
+        if self._silence_bytes < 0:
+            return
+        self._silence_bytes += memoryview(portion).nbytes
+        if self._silence_bytes >= self._force_final_bytes:
+            self._silence_bytes = -1
+            self._dispatch(self.stt.finalize())
+
+    def _dispatch(self, event: Optional[RecognitionEvent]) -> None:
+        if event is None or not self._base_event_loop:
+            return
+
+        # 4. Передаем результат обратно в основной event loop для безопасного выполнения
+        # асинхронного обработчика.
+        if isinstance(event, STTResult):
+            log.debug(f"Thread Recon >>: {event.text} (уверенность {event.confidence:.2f}, "
+                    f"декодирование {event.decode_seconds * 1000:.0f} мс, RTF {event.rtf:.3f})")
+            self._results_count += 1
+            self._audio_seconds += event.audio_seconds
+            self._decode_seconds += event.decode_seconds
+            asyncio.run_coroutine_threadsafe(self._deliver_final(event), self._base_event_loop)
+        elif self.partial_handler:
+            log.debug(f"Thread Recon >> (partial): {event.text}")
+            asyncio.run_coroutine_threadsafe(self._deliver_partial(event), self._base_event_loop)
+
+    async def _deliver_final(self, event: STTResult) -> None:
+        # Проверка выполняется уже в цикле событий: обработчик промежуточной гипотезы,
+        # запланированный раньше, успевает пометить фразу обработанной
+        if event.utterance_id != self._consumed_utterance:
+            await self.recognized_text_handler(event)
+
+    async def _deliver_partial(self, event: PartialEvent) -> None:
+        if self.partial_handler and event.utterance_id != self._consumed_utterance:
+            await self.partial_handler(event)
+
+    def consume_utterance(self, utterance_id: int) -> None:
+        """
+        Помечает фразу обработанной (например, команда выполнена по промежуточной гипотезе):
+        ее окончательный результат не будет доставлен, а распознаватель будет сброшен.
+        Вызывается из цикла событий.
+        """
+        self._consumed_utterance = utterance_id
+        self._is_utterance_reset_pending = True
+
     def _is_critical_error(self, e: Exception) -> bool:
         """Определяет, является ли ошибка критической."""
         # Пример: Считаем ошибкой загрузки модели критической.
@@ -126,73 +253,114 @@ class SpeechRecognizer:
         
     async def start(self):
         """
-        Запускает процесс распознавания речи.
-        Создает выделенный поток для цикла распознавания, чтобы обеспечить
-        целостность состояния STT-сервиса.
+        Запускает процесс распознавания речи в выделенном потоке "zumrad-recognition"
+        и ждет его завершения. Поток не занимает пул исполнителей цикла событий,
+        которым пользуются воспроизведение звука и загрузка моделей.
         """
         log.info("SpeechRecognizer: Запуск распознавания речи...")
+        if not self._base_event_loop:
+            log.error("SpeechRecognizer: Цикл событий не установлен. Цикл распознавания не может быть запущен.")
+            raise RuntimeError("Event loop is not set for SpeechRecognizer.")
         self.audio_in.check_capture_device()
         self.audio_in.start_capture()
+        self._report_latency()
         self.is_running = True
-        
-        # Запускаем цикл в отдельном потоке.
-        # asyncio.to_thread гарантирует, что вся функция _threaded_recognition_loop
-        # будет выполнена в одном потоке из пула.
-        self._recognition_task = asyncio.create_task(
-            asyncio.to_thread(self._threaded_recognition_loop)
-        )
-        
-        try:
-            if self._recognition_task:
-                await self._recognition_task # Основное ожидание завершения задачи распознавания
-            else:
-                # Эта ситуация не должна возникнуть, если инициализация прошла успешно
-                log.error("SpeechRecognizer: Задача распознавания не была создана. Завершение работы.")
-                # self.is_running = False потому что флаг установится ниже в final
+        self._stop_event.clear()
+        self._thread_finished = asyncio.Event()
+        self._recognition_thread = threading.Thread(
+            target=self._threaded_recognition_loop, name="zumrad-recognition", daemon=True)
+        self._recognition_thread.start()
 
+        try:
+            await self._thread_finished.wait() # Основное ожидание завершения потока распознавания
         except KeyboardInterrupt:
             # Это ожидаемое исключение при Ctrl+C. Логируем как info, не как ошибку.
             log.info("\nSpeechRecognizer: Получен сигнал KeyboardInterrupt (Ctrl+C). Начинается остановка...")
-            # Не нужно пробрасывать исключение, finally выполнит очистку.
         except asyncio.CancelledError:
             # Это стандартный способ asyncio остановить задачу. Тоже не ошибка.
             log.info("SpeechRecognizer: Задача распознавания была отменена. Это штатное завершение.")
-            # Не нужно пробрасывать исключение, так как это часть процесса остановки.
-        except Exception as e:
-            # А вот это уже настоящая, непредвиденная ошибка.
-            log.exception(f"SpeechRecognizer: Произошла критическая ошибка в задаче распознавания: {e}")
-            raise # Пробрасываем, чтобы внешний код знал о проблеме.
         finally:
             log.debug("SpeechRecognizer: Блок finally. Гарантированный вызов stop().")
             await self.stop()
     
+    def _report_latency(self) -> None:
+        """
+        Оценивает задержку, которую вносит буферизация до декодера:
+        порция не попадает в Vosk, пока не накоплена целиком, а блок захвата -
+        пока его не отдаст устройство.
+        """
+        samplerate: int = self.audio_in.samplerate
+        capture_ms: float = self.audio_in.blocksize * 1000 / samplerate
+        decode_ms: float = self.decode_blocksize * 1000 / samplerate
+        device_ms: float = self.audio_in.stream_latency * 1000
+        self.added_latency_ms = max(capture_ms, decode_ms) + device_ms
+        log.info(f"SpeechRecognizer: Блок захвата {capture_ms:.0f} мс, порция декодера {decode_ms:.0f} мс, "
+                f"задержка устройства {device_ms:.0f} мс. "
+                f"Добавленная задержка до декодера: ~{self.added_latency_ms:.0f} мс.")
+
+    def _log_decode_stats(self) -> None:
+        if not self._results_count:
+            return
+        rtf: float = self._decode_seconds / self._audio_seconds if self._audio_seconds else 0.0
+        log.info(f"SpeechRecognizer: Фраз распознано: {self._results_count}, "
+                f"аудио {self._audio_seconds:.1f} с, декодирование {self._decode_seconds:.1f} с, RTF {rtf:.3f}.")
+
+    def set_recognition_mode(self, mode: str) -> None:
+        """
+        Запрашивает переключение режима распознавания (RecognitionMode).
+        Переключение выполнится в потоке распознавания перед следующим блоком,
+        поэтому уже накопленное в буфере аудио попадет в новый распознаватель.
+        """
+        self._pending_mode = mode
+
     def pause(self):
-        self._is_pause = True
-        self.audio_in.stop_capture()
-        pass
+        """
+        Приостанавливает распознавание. Поток устройства остается открытым,
+        блоки просто не пропускаются в буфер, поэтому resume() не платит
+        за повторное открытие устройства.
+        """
+        self.audio_in.pause_capture()
+        self._is_reset_pending = True
     
-    def resume(self):
-        self._is_pause = False
-        self.audio_in.start_capture()
-        pass
+    def resume(self, replay: bool = False, skip_interval: Optional[Tuple[float, float]] = None):
+        """
+        Возобновляет распознавание.
+
+        Args:
+            replay: Распознать и то, что было сказано во время паузы (из истории захвата).
+            skip_interval: Интервал (по time.monotonic()), который не нужно распознавать,
+                например звук сигнала активации.
+        """
+        self.audio_in.resume_capture(0 if replay else self.resume_discard_ms, replay, skip_interval)
     
+    async def _join_recognition_thread(self) -> None:
+        """Ждет выхода потока распознавания: он перепроверяет is_running не реже READ_TIMEOUT."""
+        thread: Optional[threading.Thread] = self._recognition_thread
+        if thread is None or thread is threading.current_thread():
+            return
+        if self._thread_finished:
+            try:
+                await asyncio.wait_for(self._thread_finished.wait(), SpeechRecognizer.JOIN_TIMEOUT)
+            except asyncio.TimeoutError:
+                log.warning("SpeechRecognizer: Поток распознавания не завершился вовремя.")
+                return
+        thread.join(timeout=SpeechRecognizer.READ_TIMEOUT)
+        self._recognition_thread = None
+        log.info("SpeechRecognizer: Поток распознавания остановлен.")
+
     async def stop(self):
         if self.is_running:
             log.info("SpeechRecognizer: Начало процедуры остановки...")
             self.is_running = False
 
-            if self._recognition_task and not self._recognition_task.done():
-                log.info("SpeechRecognizer: Отмена задачи распознавания...")
-                self._recognition_task.cancel()
-                try:
-                    await self._recognition_task
-                except asyncio.CancelledError:
-                    # Это ожидаемое исключение после отмены задачи.
-                    log.info("SpeechRecognizer: Задача распознавания успешно отменена и завершена.")
-                except Exception as e_cancel: # Переименовал переменную, чтобы не конфликтовала с внешней 'e'
-                    log.error(f"SpeechRecognizer: Ошибка при ожидании отмены задачи распознавания: {e_cancel}")
+            self._stop_event.set()
+            await self._join_recognition_thread()
 
             self.audio_in.stop_capture()
+            self.stt.close()
+            if self.vad:
+                self.vad.log_stats()
+            self._log_decode_stats()
             ## необязательный безопасный вызов, так как вызывается он в любом случае из базового loop
             # asyncio.run_coroutine_threadsafe(self.stop_handler(), self._base_event_loop)
             await self.stop_handler() # прямой вызов в том же event_loop
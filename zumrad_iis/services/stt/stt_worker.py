@@ -0,0 +1,306 @@
+import logging
+import multiprocessing
+import sys
+import threading
+from concurrent.futures import Future
+from contextlib import contextmanager
+from multiprocessing import shared_memory
+from multiprocessing.connection import Connection
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from zumrad_iis.commands.command_vocabulary import Vocabulary
+from zumrad_iis.services.executor_registry import ExecutorRegistry, run_blocking
+from zumrad_iis.services.avosk_stt import Messages, RecognitionMode, STTServiceProtocol
+from zumrad_iis.services.stt import stt_worker_entry
+from zumrad_iis.services.stt.recognition_events import RecognitionEvent, STTResult
+
+log: logging.Logger = logging.getLogger(__name__)
+
+# Получатель событий распознавания в конвейерном режиме, см. ProcessSTTService.set_event_handler()
+EventHandler = Callable[[RecognitionEvent], None]
+
+
+@contextmanager
+def _worker_main_module() -> Iterator[None]:
+    """
+    На время запуска процесса подменяет главный модуль: spawn импортирует его
+    в дочернем процессе, и вместо run.py (PyTorch, sounddevice) импортируется
+    только stt_worker_entry.
+    """
+    main_module = sys.modules["__main__"]
+    sys.modules["__main__"] = stt_worker_entry
+    try:
+        yield
+    finally:
+        sys.modules["__main__"] = main_module
+
+
+class ProcessSTTService(STTServiceProtocol):
+    """
+    STTService в отдельном процессе ("zumrad-stt-worker").
+
+    Декодер Vosk не делит интерпретатор и кэши CPU с синтезом речи (PyTorch),
+    а процесс можно закрепить за своими ядрами (`cpu_affinity`).
+
+    Аудио передается через кольцо слотов в `multiprocessing.shared_memory`:
+    порция копируется в свободный слот, а по каналу (Pipe) уходит только номер
+    слота и длина. Порция длиннее слота передается по каналу целиком.
+    Воркер выполняет команды строго по порядку, поэтому порядок порций
+    и команд (set_mode, reset_utterance, finalize) сохраняется.
+
+    Ответы воркера читает отдельный поток. Если задан получатель событий
+    (set_event_handler()), accept() и finalize() не ждут ответа: в воркере
+    одновременно обрабатываются до `slots` порций, а события распознавания
+    доставляются получателю из потока ответов в порядке порций. Слот
+    занимается повторно только после ответа на порцию, которая его занимала.
+    Без получателя вызовы синхронные, как у STTService.
+
+    Интерфейс - тот же STTServiceProtocol; параметры распознавания передаются
+    в STTService воркера как есть.
+
+    :param cpu_affinity: Номера ядер для процесса воркера (только Linux), None - без ограничения.
+    :param slots: Количество слотов кольца (порций в обработке).
+    :param slot_seconds: Размер слота в секундах аудио.
+    """
+    SLOTS: int = 4
+    SLOT_SECONDS: float = 1.0
+    START_TIMEOUT: float = 120.0  # Загрузка большой модели может занимать десятки секунд
+    WAIT_TIMEOUT: float = 0.5     # Как часто ожидание слота перепроверяет, что воркер жив
+
+    def __init__(self,
+                model_path: str,
+                sample_rate: int,
+                vocabulary: Optional[Vocabulary] = None,
+                cpu_affinity: Optional[List[int]] = None,
+                slots: int = SLOTS,
+                slot_seconds: float = SLOT_SECONDS,
+                executors: Optional[ExecutorRegistry] = None,
+                **stt_kwargs: Any,
+                ) -> None:
+        self.model_path: str = model_path
+        self.sample_rate: int = sample_rate
+        self.vocabulary: Optional[Vocabulary] = vocabulary
+        self.cpu_affinity: Optional[List[int]] = cpu_affinity
+        self.slots: int = max(1, slots)
+        self.slot_bytes: int = int(sample_rate * slot_seconds) * 2
+        self._stt_kwargs: Dict[str, Any] = stt_kwargs
+        self.executors: Optional[ExecutorRegistry] = executors # Пулы родительского процесса
+        # Состояние воркера на момент последнего ответа
+        self.utterance_id: int = 0
+        self.mode: str = RecognitionMode.FULL
+        self._vocabulary_revision: int = vocabulary.revision if vocabulary else 0
+        self._memory: Optional[shared_memory.SharedMemory] = None
+        self._connection: Optional[Connection] = None
+        self._process: Optional[multiprocessing.process.BaseProcess] = None
+        self._event_handler: Optional[EventHandler] = None
+        # --- Команды в обработке ---
+        self._state = threading.Condition(threading.RLock()) # Слоты, команды без ответа, ошибка воркера
+        self._sequence: int = 0
+        self._next_slot: int = 0
+        self._busy_slots: int = 0
+        self._pending: Dict[int, str] = {}           # Номер команды -> операция
+        self._waiters: Dict[int, Future] = {}         # Синхронные вызовы, ждущие ответа
+        self._error: Optional[Exception] = None       # Ошибка асинхронной команды, поднимается следующим вызовом
+        self._is_worker_lost: bool = False
+        self._reader: Optional[threading.Thread] = None
+
+    def set_event_handler(self, handler: Optional[EventHandler]) -> None:
+        """
+        Включает конвейерный режим: accept() и finalize() возвращают None,
+        а события распознавания передаются `handler` из потока ответов воркера.
+        """
+        self._event_handler = handler
+
+    async def initialize(self) -> None:
+        log.info("ProcessSTTService: Запуск процесса распознавания речи...")
+        # spawn: дочерний процесс не наследует потоки PortAudio и PyTorch родителя
+        context = multiprocessing.get_context("spawn")
+        self._memory = shared_memory.SharedMemory(create=True, size=self.slots * self.slot_bytes)
+        self._connection, child_connection = context.Pipe()
+        stt_kwargs: Dict[str, Any] = dict(self._stt_kwargs,
+                                        model_path=self.model_path,
+                                        sample_rate=self.sample_rate,
+                                        vocabulary=self.vocabulary)
+        self._process = context.Process(
+            target=stt_worker_entry.worker_main,
+            args=(child_connection, self._memory.name, stt_kwargs, self.cpu_affinity),
+            name="zumrad-stt-worker",
+            daemon=True,
+        )
+        with _worker_main_module():
+            self._process.start()
+        child_connection.close()
+
+        ready: bool = await run_blocking(self.executors, ExecutorRegistry.MODEL_LOADING,
+                                        self._connection.poll, ProcessSTTService.START_TIMEOUT)
+        if not ready:
+            self.close()
+            raise RuntimeError(f"{Messages.FAILED_TO_LOAD_STT_MODEL} {self.model_path}: STT worker did not start.")
+        _, status, payload, self.utterance_id, self.mode = self._connection.recv()
+        if status != "ready":
+            self.close()
+            raise RuntimeError(f"{Messages.FAILED_TO_LOAD_STT_MODEL} {self.model_path}: {payload}")
+        self._reader = threading.Thread(target=self._read_responses, name="zumrad-stt-worker-reader", daemon=True)
+        self._reader.start()
+        log.info(f"ProcessSTTService: Процесс распознавания запущен (pid {self._process.pid}, "
+                f"ядра: {self.cpu_affinity or 'все'}, слотов: {self.slots}).")
+
+    def transcribe(self, audio_data: bytes | memoryview) -> Optional[STTResult]:
+        event: Optional[RecognitionEvent] = self.accept(audio_data)
+        return event if isinstance(event, STTResult) else None
+
+    def accept(self, audio_data: bytes | memoryview) -> Optional[RecognitionEvent]:
+        if not self._memory:
+            log.warning("ProcessSTTService: Процесс распознавания не запущен. Сначала вызовите initialize().")
+            return None
+        if self.vocabulary and self.vocabulary.revision != self._vocabulary_revision:
+            # У воркера своя копия словаря: отправляем новую версию целиком
+            self._vocabulary_revision = self.vocabulary.revision
+            self._submit("vocabulary", self.vocabulary)
+        size: int = memoryview(audio_data).nbytes
+        if size > self.slot_bytes:
+            return self._result(self._submit("accept_bytes", bytes(audio_data)))
+        with self._state:
+            # Все слоты заняты порциями, которые воркер еще не обработал
+            while self._busy_slots >= self.slots:
+                self._raise_if_failed()
+                self._state.wait(ProcessSTTService.WAIT_TIMEOUT)
+            offset: int = self._next_slot * self.slot_bytes
+            self._next_slot = (self._next_slot + 1) % self.slots
+            self._busy_slots += 1
+            self._memory.buf[offset:offset + size] = memoryview(audio_data).cast("B")
+            try:
+                future: Optional[Future] = self._submit("accept", offset, size)
+            except Exception:
+                self._busy_slots -= 1
+                raise
+        return self._result(future)
+
+    def finalize(self) -> Optional[STTResult]:
+        return self._result(self._submit("finalize"))
+
+    async def warm_up(self, seconds: float = 1.0) -> float:
+        return await run_blocking(self.executors, ExecutorRegistry.COMPUTE, self._call, "warm_up", seconds)
+
+    def reset_utterance(self) -> None:
+        # Воркер сбросит фразу, только если она не сменилась, пока команда была в пути
+        self._submit("reset_utterance", self.utterance_id)
+
+    def set_mode(self, mode: str) -> None:
+        self._submit("set_mode", mode)
+
+    def _call(self, operation: str, *args: Any) -> Any:
+        """Отправляет команду воркеру и ждет ответ."""
+        return self._result(self._submit(operation, *args, wait=True))
+
+    def _result(self, future: Optional[Future]) -> Any:
+        """В конвейерном режиме событие придет получателю, иначе ждем ответ."""
+        return future.result() if future else None
+
+    def _submit(self, operation: str, *args: Any, wait: bool = False) -> Optional[Future]:
+        """
+        Отправляет команду воркеру. Возвращает Future ответа для синхронного вызова
+        (`wait` или нет получателя событий), иначе None.
+        """
+        future: Optional[Future] = Future() if wait or self._event_handler is None else None
+        with self._state:
+            self._raise_if_failed()
+            if not self._connection:
+                return None
+            self._sequence += 1
+            sequence: int = self._sequence
+            self._pending[sequence] = operation
+            if future:
+                self._waiters[sequence] = future
+            try:
+                # Отправка под блокировкой: номера команд идут в канал по возрастанию
+                self._connection.send((sequence, operation, *args))
+            except (EOFError, OSError) as e:
+                self._pending.pop(sequence, None)
+                self._waiters.pop(sequence, None)
+                raise RuntimeError(f"STT worker process is not available: {e}") from e
+        return future
+
+    def _raise_if_failed(self) -> None:
+        """Поднимает ошибку воркера. Вызывается под `_state`."""
+        if self._error is None:
+            return
+        error: Exception = self._error
+        if not self._is_worker_lost:
+            self._error = None # Воркер жив: следующий вызов может быть успешным
+        raise error
+
+    def _read_responses(self) -> None:
+        """Тело потока ответов воркера."""
+        connection: Optional[Connection] = self._connection
+        while connection is not None:
+            try:
+                sequence, status, payload, utterance_id, mode = connection.recv()
+            except (EOFError, OSError) as e:
+                self._on_worker_lost(e)
+                break
+            with self._state:
+                self.utterance_id, self.mode = utterance_id, mode
+                operation: str = self._pending.pop(sequence, "")
+                if operation == "accept":
+                    self._busy_slots -= 1
+                future: Optional[Future] = self._waiters.pop(sequence, None)
+                error: Optional[RuntimeError] = \
+                    RuntimeError(f"STT worker failed on '{operation}': {payload}") if status == "error" else None
+                if error and future is None:
+                    self._error = error
+                self._state.notify_all()
+            if future is not None:
+                if error:
+                    future.set_exception(error)
+                else:
+                    future.set_result(payload)
+            elif error:
+                log.error(f"ProcessSTTService: {error}")
+            elif payload is not None and self._event_handler and operation in ("accept", "accept_bytes", "finalize"):
+                try:
+                    self._event_handler(payload)
+                except Exception as e:
+                    log.error(f"ProcessSTTService: Ошибка получателя событий: {e}", exc_info=True)
+
+    def _on_worker_lost(self, reason: Exception) -> None:
+        with self._state:
+            if self._connection is not None:
+                log.error(f"ProcessSTTService: Связь с процессом распознавания потеряна: {reason}")
+            error = RuntimeError(f"STT worker process is not available: {reason}")
+            self._error = error
+            self._is_worker_lost = True
+            waiters: List[Future] = list(self._waiters.values())
+            self._waiters.clear()
+            self._pending.clear()
+            self._busy_slots = 0
+            self._state.notify_all()
+        for future in waiters:
+            future.set_exception(error)
+
+    def close(self) -> None:
+        """Останавливает процесс воркера и освобождает разделяемую память."""
+        with self._state:
+            connection, self._connection = self._connection, None
+            if connection:
+                try:
+                    connection.send((0, "stop"))
+                except (EOFError, OSError):
+                    pass
+        if self._process:
+            self._process.join(timeout=5.0)
+            if self._process.is_alive():
+                log.warning("ProcessSTTService: Процесс распознавания не завершился, принудительная остановка.")
+                self._process.terminate()
+                self._process.join()
+            self._process = None
+        if self._reader and self._reader is not threading.current_thread():
+            self._reader.join(timeout=5.0) # Процесс завершен: поток ответов получит EOF
+            self._reader = None
+        if connection:
+            connection.close()
+        if self._memory:
+            self._memory.close()
+            self._memory.unlink()
+            self._memory = None
+        log.info("ProcessSTTService: Процесс распознавания остановлен.")
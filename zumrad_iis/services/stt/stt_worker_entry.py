@@ -0,0 +1,75 @@
+"""
+Точка входа процесса распознавания (см. ProcessSTTService).
+
+При запуске через spawn дочерний процесс импортирует главный модуль родителя.
+ProcessSTTService подставляет вместо него этот модуль, поэтому воркер
+не импортирует run.py / main.py с PyTorch и sounddevice: здесь нужны
+только STTService и разделяемая память.
+"""
+import asyncio
+import os
+from multiprocessing import shared_memory
+from multiprocessing.connection import Connection
+from typing import Any, Dict, List, Optional
+
+from zumrad_iis.services.avosk_stt import STTService
+
+
+def worker_main(connection: Connection,
+                memory_name: str,
+                stt_kwargs: Dict[str, Any],
+                cpu_affinity: Optional[List[int]]) -> None:
+    """
+    STTService и цикл обработки команд. Команда - (номер, операция, *аргументы),
+    ответ - (номер, статус, результат, номер фразы, режим). Команды выполняются
+    строго по порядку поступления.
+    """
+    if cpu_affinity and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cpu_affinity)
+    memory = shared_memory.SharedMemory(name=memory_name)
+    try:
+        stt = STTService(audio_input=None, **stt_kwargs)  # type: ignore[arg-type]
+        try:
+            asyncio.run(stt.initialize())
+        except Exception as e:
+            connection.send((0, "error", str(e), 0, stt.mode))
+            return
+        connection.send((0, "ready", None, stt.utterance_id, stt.mode))
+        while True:
+            try:
+                sequence, operation, *args = connection.recv()
+            except EOFError:
+                break  # Родительский процесс завершился
+            if operation == "stop":
+                break
+            try:
+                result: Any = _dispatch(stt, memory, operation, args)
+                connection.send((sequence, "ok", result, stt.utterance_id, stt.mode))
+            except Exception as e:
+                connection.send((sequence, "error", repr(e), stt.utterance_id, stt.mode))
+    finally:
+        memory.close()
+        connection.close()
+
+
+def _dispatch(stt: STTService, memory: shared_memory.SharedMemory, operation: str, args: List[Any]) -> Any:
+    if operation == "accept":
+        offset, size = args
+        return stt.accept(bytes(memory.buf[offset:offset + size]))
+    if operation == "accept_bytes":
+        return stt.accept(args[0])
+    if operation == "finalize":
+        return stt.finalize()
+    if operation == "warm_up":
+        return stt.warm_up_blocking(args[0])
+    if operation == "reset_utterance":
+        # Родитель видит номер фразы с опозданием: сбрасываем, только если фраза та же
+        if args and args[0] != stt.utterance_id:
+            return None
+        return stt.reset_utterance()
+    if operation == "set_mode":
+        return stt.set_mode(args[0])
+    if operation == "vocabulary":
+        stt.vocabulary = args[0]
+        return None
+    raise ValueError(f"Unknown STT worker operation: {operation}")
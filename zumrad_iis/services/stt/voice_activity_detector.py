@@ -0,0 +1,151 @@
+import logging
+from typing import Tuple
+
+import numpy as np
+
+log: logging.Logger = logging.getLogger(__name__)
+
+# Блоки, которые нужно передать распознавателю (bytes или memoryview)
+AudioChunks = Tuple[bytes | memoryview, ...]
+
+
+class VoiceActivityDetector:
+    """
+    Детектор речевой активности (VAD) перед распознавателем Vosk.
+
+    Блок делится на кадры по `frame_ms`, для всех кадров сразу (векторно, NumPy)
+    считаются энергия (dBFS) и частота пересечений нуля (ZCR). Кадр считается
+    речевым, если его энергия выше порога, а ZCR не выше `zcr_max` (отсекает
+    широкополосный шум и щелчки). Порог адаптивный: не ниже
+    `energy_threshold_db` и не ниже оценки шумового фона плюс `snr_margin_db`.
+
+    После окончания речи блоки еще `hangover_ms` считаются речевыми, чтобы
+    Vosk увидел хвост тишины и завершил фразу. Последние `preroll_ms` тишины
+    хранятся в кольцевом буфере и передаются перед первым речевым блоком,
+    чтобы не потерять начало слова.
+
+    :param samplerate: Частота дискретизации.
+    :param channels: Количество каналов (для классификации каналы усредняются).
+    """
+    FULL_SCALE: float = 32768.0
+    # Шумовой фон оценивается по нижнему перцентилю энергии кадров (паузы есть и внутри речи):
+    # вниз он следует быстро, вверх - медленно, чтобы речь не поднимала порог.
+    NOISE_PERCENTILE: float = 10.0
+    NOISE_FLOOR_ALPHA_DOWN: float = 0.5
+    NOISE_FLOOR_ALPHA_UP: float = 0.02
+    _NOTHING: AudioChunks = ()
+
+    def __init__(self,
+                samplerate: int,
+                channels: int = 1,
+                energy_threshold_db: float = -45.0,
+                snr_margin_db: float = 10.0,
+                zcr_max: float = 0.35,
+                frame_ms: int = 20,
+                min_speech_ms: int = 60,
+                hangover_ms: int = 800,
+                preroll_ms: int = 300,
+                ) -> None:
+        self.samplerate: int = samplerate
+        self.channels: int = channels
+        self.energy_threshold_db: float = energy_threshold_db
+        self.snr_margin_db: float = snr_margin_db
+        self.zcr_max: float = zcr_max
+        self.frame_samples: int = max(1, samplerate * frame_ms // 1000)
+        self.min_speech_frames: int = max(1, min_speech_ms // max(1, frame_ms))
+        self.hangover_samples: int = samplerate * hangover_ms // 1000
+        self._noise_floor_db: float = energy_threshold_db - snr_margin_db
+        self._hangover_left: int = 0
+        self._is_speech: bool = False
+        # Кольцевой буфер пре-ролла, выделяется один раз
+        self._preroll: np.ndarray = np.zeros(samplerate * preroll_ms // 1000 * channels, dtype=np.int16)
+        self._preroll_pos: int = 0
+        self._preroll_filled: int = 0
+        # Статистика для оценки экономии
+        self.speech_blocks: int = 0
+        self.silence_blocks: int = 0
+
+    @property
+    def is_speech(self) -> bool:
+        return self._is_speech
+
+    def reset(self) -> None:
+        self._hangover_left = 0
+        self._is_speech = False
+        self._preroll_filled = 0
+        self._preroll_pos = 0
+
+    def classify(self, samples: np.ndarray) -> bool:
+        """Возвращает True, если в блоке (int16, перемежающиеся каналы) есть речь."""
+        if self.channels > 1:
+            samples = samples.reshape(-1, self.channels).mean(axis=1)
+        frames_count: int = len(samples) // self.frame_samples
+        if frames_count == 0:
+            return False
+        frames: np.ndarray = samples[:frames_count * self.frame_samples] \
+            .reshape(frames_count, self.frame_samples).astype(np.float32)
+        rms: np.ndarray = np.sqrt(np.mean(frames * frames, axis=1))
+        energy_db: np.ndarray = 20.0 * np.log10(rms / VoiceActivityDetector.FULL_SCALE + 1e-10)
+        signs: np.ndarray = np.signbit(frames)
+        zcr: np.ndarray = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / self.frame_samples
+        threshold: float = max(self.energy_threshold_db, self._noise_floor_db + self.snr_margin_db)
+        speech_frames: int = int(np.count_nonzero((energy_db > threshold) & (zcr <= self.zcr_max)))
+        low_db: float = float(np.percentile(energy_db, VoiceActivityDetector.NOISE_PERCENTILE))
+        alpha: float = VoiceActivityDetector.NOISE_FLOOR_ALPHA_DOWN if low_db < self._noise_floor_db \
+            else VoiceActivityDetector.NOISE_FLOOR_ALPHA_UP
+        self._noise_floor_db += alpha * (low_db - self._noise_floor_db)
+        return speech_frames >= self.min_speech_frames
+
+    def process(self, block: bytes | memoryview) -> AudioChunks:
+        """
+        Классифицирует блок и возвращает то, что нужно передать распознавателю:
+        пустой кортеж для тишины, (пре-ролл, блок) в начале речи, (блок,) во время речи.
+        """
+        samples: np.ndarray = np.frombuffer(block, dtype=np.int16)
+        if self.classify(samples):
+            self._hangover_left = self.hangover_samples
+            self.speech_blocks += 1
+            if not self._is_speech:
+                self._is_speech = True
+                preroll: bytes = self._take_preroll()
+                return (preroll, block) if preroll else (block,)
+            return (block,)
+        if self._is_speech:
+            # Хвост речи: продолжаем передавать блоки, пока не истечет hangover
+            self._hangover_left -= len(samples) // self.channels
+            self.speech_blocks += 1
+            if self._hangover_left <= 0:
+                self._is_speech = False
+            return (block,)
+        self.silence_blocks += 1
+        self._store_preroll(samples)
+        return VoiceActivityDetector._NOTHING
+
+    def _store_preroll(self, samples: np.ndarray) -> None:
+        size: int = len(self._preroll)
+        if size == 0:
+            return
+        if len(samples) >= size:
+            self._preroll[:] = samples[-size:]
+            self._preroll_pos = 0
+            self._preroll_filled = size
+            return
+        first: int = min(len(samples), size - self._preroll_pos)
+        self._preroll[self._preroll_pos:self._preroll_pos + first] = samples[:first]
+        self._preroll[:len(samples) - first] = samples[first:]
+        self._preroll_pos = (self._preroll_pos + len(samples)) % size
+        self._preroll_filled = min(size, self._preroll_filled + len(samples))
+
+    def _take_preroll(self) -> bytes:
+        if not self._preroll_filled:
+            return b""
+        ordered: np.ndarray = np.concatenate((self._preroll[self._preroll_pos:], self._preroll[:self._preroll_pos]))
+        self._preroll_filled, filled = 0, self._preroll_filled
+        return ordered[-filled:].tobytes()
+
+    def log_stats(self) -> None:
+        total: int = self.speech_blocks + self.silence_blocks
+        if total:
+            log.info(f"VAD: speech blocks {self.speech_blocks}, silence blocks {self.silence_blocks} "
+                    f"({100.0 * self.silence_blocks / total:.1f}% not decoded), "
+                    f"noise floor {self._noise_floor_db:.1f} dBFS.")
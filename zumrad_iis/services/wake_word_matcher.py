@@ -0,0 +1,146 @@
+import re
+from typing import Dict, List, Optional, Tuple
+
+
+class WakeWordMatch:
+    """
+    Найденное ключевое слово.
+
+    :param score: 1.0 - точное совпадение (после нормализации), меньше - чем больше правок, тем ниже.
+    :param distance: Редакционное расстояние между нормализованными формами.
+    :param start: Индекс первого токена ключевого слова в тексте.
+    :param end: Индекс токена, следующего за ключевым словом.
+    :param remainder: Текст после ключевого слова (команда).
+    """
+    __slots__ = ("score", "distance", "start", "end", "remainder")
+
+    def __init__(self, score: float, distance: int, start: int, end: int, remainder: str) -> None:
+        self.score: float = score
+        self.distance: int = distance
+        self.start: int = start
+        self.end: int = end
+        self.remainder: str = remainder
+
+    def __repr__(self) -> str:
+        return (f"WakeWordMatch(score={self.score:.2f}, distance={self.distance}, "
+                f"tokens={self.start}:{self.end}, remainder={self.remainder!r})")
+
+
+class WakeWordMatcher:
+    """
+    Нечеткий поиск ключевого слова в начале фразы.
+
+    Vosk часто искажает ключевое слово: "изумрут" вместо "изумруд", "zum rad"
+    вместо "zumrad". Поэтому текст и ключевое слово сводятся к классам звуков:
+    кириллица и латиница в одном алфавите, звонкие и глухие согласные (д/т, з/с...)
+    и близкие гласные (а/о, е/и/ы) совпадают, мягкий и твердый знаки и апострофы
+    отбрасываются, повторы схлопываются. Затем ищется кандидат - один токен
+    или до MAX_JOIN соседних, склеенных вместе, - с редакционным расстоянием
+    до ключевого слова не больше `max_distance` и оценкой не ниже `min_score`.
+
+    Точное (после нормализации) совпадение засчитывается в любом из первых
+    `search_tokens` токенов ("ну, изумруд..."), а неточное - только в начале
+    фразы: иначе обычная речь ("hozir ham rad etdi") активирует ассистента.
+
+    Форма ключевого слова вычисляется один раз в конструкторе. На фразу приходится
+    один проход по тексту (нижний регистр и разбиение только первых токенов),
+    а сравнение кандидатов ограничено длиной ключевого слова и не зависит от длины фразы.
+
+    :param keyword: Ключевое слово.
+    :param max_distance_ratio: Допустимая доля правок от длины нормализованного ключевого слова.
+    :param search_tokens: В скольких первых токенах искать начало точного совпадения.
+    :param min_score: Минимальная оценка неточного совпадения.
+    """
+    MAX_JOIN: int = 3 # Сколько соседних токенов может составлять ключевое слово
+
+    # Классы звуков. Диграфы латиницы (узбекский) заменяются до посимвольной замены.
+    DIGRAPHS: Tuple[Tuple[str, str], ...] = (("sh", "ш"), ("ch", "ч"), ("o'", "у"), ("g'", "г"))
+    CLASSES: Dict[str, str] = {
+        **dict.fromkeys("аояёao", "a"),
+        **dict.fromkeys("уюu", "u"),
+        **dict.fromkeys("еэиыйeiy", "i"),
+        **dict.fromkeys("бпbp", "p"),
+        **dict.fromkeys("вфvfw", "f"),
+        **dict.fromkeys("гкgkq", "k"),
+        **dict.fromkeys("хxh", "h"),
+        **dict.fromkeys("дтdt", "t"),
+        **dict.fromkeys("жшщj", "S"),
+        **dict.fromkeys("зсцzsc", "s"),
+        **dict.fromkeys("ч", "c"),
+        **dict.fromkeys("лl", "l"),
+        **dict.fromkeys("мm", "m"),
+        **dict.fromkeys("нn", "n"),
+        **dict.fromkeys("рr", "r"),
+    }
+    _TRANSLATION = str.maketrans(CLASSES)
+    _DROP = re.compile(r"[^aiupfkhtSsclmnr]")
+
+    def __init__(self,
+                keyword: str,
+                max_distance_ratio: float = 0.2,
+                search_tokens: int = 3,
+                min_score: float = 0.8) -> None:
+        self.keyword: str = keyword.lower()
+        self._key: str = WakeWordMatcher.normalize(self.keyword)
+        self.max_distance: int = int(len(self._key) * max_distance_ratio) # 1 правка для ключевого слова из 5-9 звуков
+        self.search_tokens: int = max(1, search_tokens)
+        self.min_score: float = min_score
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """Сводит текст (в нижнем регистре) к строке классов звуков."""
+        for digraph, letter in WakeWordMatcher.DIGRAPHS:
+            text = text.replace(digraph, letter)
+        text = WakeWordMatcher._DROP.sub("", text.translate(WakeWordMatcher._TRANSLATION))
+        # Схлопываем повторы: "зуммрад" и "зумрад" совпадают
+        return "".join(c for i, c in enumerate(text) if i == 0 or c != text[i - 1])
+
+    def match(self, text: str) -> Optional[WakeWordMatch]:
+        """Лучшее вхождение ключевого слова в первых токенах `text` или None."""
+        if not self._key:
+            return None
+        # Разбиваем только начало фразы, остаток - одной строкой
+        max_tokens: int = self.search_tokens + WakeWordMatcher.MAX_JOIN - 1
+        tokens: List[str] = text.lower().split(maxsplit=max_tokens)
+        rest: str = tokens.pop() if len(tokens) > max_tokens else ""
+        normalized: List[str] = [WakeWordMatcher.normalize(token) for token in tokens]
+        best: Optional[Tuple[int, int, int]] = None # (расстояние, начало, конец)
+        for start in range(min(self.search_tokens, len(tokens))):
+            candidate: str = ""
+            for end in range(start + 1, min(start + WakeWordMatcher.MAX_JOIN, len(tokens)) + 1):
+                candidate += normalized[end - 1]
+                if not candidate:
+                    continue
+                if len(candidate) - len(self._key) > self.max_distance:
+                    break # Дальше кандидат только длиннее
+                distance: Optional[int] = self._bounded_distance(candidate)
+                if distance is None or (distance > 0 and start > 0):
+                    continue # Неточное совпадение - только в начале фразы
+                if best is None or distance < best[0]:
+                    best = (distance, start, end)
+            if best is not None and best[0] == 0:
+                break
+        if best is None:
+            return None
+        distance, start, end = best
+        score: float = 1.0 - distance / len(self._key)
+        if score < self.min_score:
+            return None
+        remainder: str = " ".join(tokens[end:] + ([rest] if rest else []))
+        return WakeWordMatch(score, distance, start, end, remainder)
+
+    def _bounded_distance(self, candidate: str) -> Optional[int]:
+        """Расстояние Левенштейна до ключевого слова или None, если оно больше max_distance."""
+        key: str = self._key
+        limit: int = self.max_distance
+        if abs(len(candidate) - len(key)) > limit:
+            return None
+        previous: List[int] = list(range(len(key) + 1))
+        for i, c in enumerate(candidate, 1):
+            current: List[int] = [i]
+            for j, k in enumerate(key, 1):
+                current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (c != k)))
+            if min(current) > limit:
+                return None # Расстояние уже не станет меньше
+            previous = current
+        return previous[-1] if previous[-1] <= limit else None
@@ -4,7 +4,11 @@ from typing import Optional, Any, Protocol, cast, Dict, List
 import sounddevice as sd
 import torch
 import functools
+import time
+from contextlib import nullcontext
 from zumrad_iis.core.tts_interface import ITextToSpeech
+from zumrad_iis.services.audio_device_registry import AudioDeviceRegistry
+from zumrad_iis.services.executor_registry import ExecutorRegistry, run_blocking
 # zumrad_app/core/tts_interface.py
 
 log: logging.Logger = logging.getLogger(__name__)
@@ -40,6 +44,10 @@ class AsyncSileroTTS(ITextToSpeech):
     :param model_id: Идентификатор модели (например, 'v3_1_ru', 'v4_uz').
     :param sample_rate: Частота дискретизации аудио (например, 48000, 24000, 16000, 8000).
     :param device: Устройство для выполнения модели (например, 'cpu' или 'cuda').
+    :param executors: Пулы потоков: загрузка модели, синтез и воспроизведение;
+        без реестра используется исполнитель цикла событий по умолчанию.
+    :param device_registry: Реестр устройств захвата: воспроизведение отмечается в нем
+        как открытый поток, чтобы переинициализация PortAudio не прервала речь.
     :raises ValueError: Если частота дискретизации не поддерживается. 
     """
 
@@ -48,6 +56,8 @@ class AsyncSileroTTS(ITextToSpeech):
             model_id: str,
             sample_rate: int,
             device: Optional[torch.device] = None,
+            executors: Optional[ExecutorRegistry] = None,
+            device_registry: Optional[AudioDeviceRegistry] = None,
             ) -> None:
         self.language: str = language
         self.model_id: str = model_id
@@ -58,6 +68,8 @@ class AsyncSileroTTS(ITextToSpeech):
             self.sample_rate: int = sample_rate
         
         self.device = torch.device('cpu') if device is None else device
+        self.executors: Optional[ExecutorRegistry] = executors
+        self.device_registry: Optional[AudioDeviceRegistry] = device_registry
         
         # --- Глобальная переменная для кэширования модели ---
         self._model: Optional[TTSModelProtocol] = None
@@ -70,7 +82,7 @@ class AsyncSileroTTS(ITextToSpeech):
     def _blocking_load_and_init_model(self) -> Optional[TTSModelProtocol]:
         """
         Синхронная (блокирующая) часть загрузки и инициализации модели.
-        Эта функция будет выполняться в отдельном потоке через asyncio.to_thread.
+        Эта функция будет выполняться в пуле model_loading.
         """
         log.debug("Блокирующая загрузка и инициализация модели Silero TTS в потоке...")
         try:
@@ -125,15 +137,9 @@ class AsyncSileroTTS(ITextToSpeech):
                 # global loaded_silero_model, model_initialization_task # Для изменения внешней переменной из замыкания
                 model: Optional[TTSModelProtocol] = None
                 try:
-                    # Выполняем блокирующую функцию в отдельном потоке, управляемом asyncio
-                    # Для Python >=3.9
-                    if hasattr(asyncio, 'to_thread'):
-                        model = await asyncio.to_thread(self._blocking_load_and_init_model)
-                    else:
-                        # Для Python < 3.9
-                        # loop = asyncio.get_event_loop()
-                        loop = asyncio.get_running_loop()
-                        model = await loop.run_in_executor(None, self._blocking_load_and_init_model)
+                    # Выполняем блокирующую функцию в пуле загрузки моделей
+                    model = await run_blocking(self.executors, ExecutorRegistry.MODEL_LOADING,
+                                            self._blocking_load_and_init_model)
                     
                 except Exception as e:
                     log.debug(f"Исключение внутри _task_wrapper при инициализации модели: {e}")
@@ -161,8 +167,7 @@ class AsyncSileroTTS(ITextToSpeech):
             
             return self._model is not None
 
-    # --- Функция синтеза речи (остается синхронной, но проверяет асинхронно загруженную модель) ---
-    # или ее тоже можно сделать асинхронной, если sd.play/wait могут быть проблемой
+    # --- Функция синтеза речи: синтез в пуле compute, воспроизведение в пуле speech_playback ---
     async def speak(self, text: str, voice: str | None = None) -> bool:
         if voice is None:
             raise ValueError("To call the speech synthesis function (TTS), you must specify the `speaker_voice` argument.")
@@ -172,30 +177,31 @@ class AsyncSileroTTS(ITextToSpeech):
                             "Пожалуйста, сначала вызовите `load_and_init_model()` и дождитесь завершения инициализации.")
                 
         log.debug(f"Speech synthesis (asynchronous context) for: '{text}'...")
-        try:
-            audio: torch.Tensor = self._model.apply_tts(text=text + ".s...",
+        model: TTSModelProtocol = self._model
+
+        def _synthesize_sync() -> Any:
+            """Синтез - самый тяжелый блокирующий вызов приложения, поэтому он выполняется в пуле compute."""
+            audio: torch.Tensor = model.apply_tts(text=text + ".s...",
                                                 speaker=voice,
                                                 sample_rate=self.sample_rate,
                                                 put_accent=True,
                                                 put_yo=True)
-            
-            audio_numpy = audio.cpu().numpy()
+            return audio.cpu().numpy()
+
+        try:
+            audio_numpy = await run_blocking(self.executors, ExecutorRegistry.COMPUTE, _synthesize_sync)
 
             def _play_and_wait_sync():
                 """
                 Блокирующая функция, которая запускает воспроизведение и ждет его окончания.
                 Именно эту единую функцию нужно выполнять в отдельном потоке.
                 """
-                sd.play(audio_numpy, samplerate=self.sample_rate)
-                sd.wait()
+                with self.device_registry.stream() if self.device_registry else nullcontext():
+                    sd.play(audio_numpy, samplerate=self.sample_rate)
+                    sd.wait()
 
-            loop = asyncio.get_running_loop()
-            if hasattr(asyncio, 'to_thread'): 
-                # Для Python >=3.9
-                await asyncio.to_thread(_play_and_wait_sync)
-            else: 
-                # Для Python < 3.9
-                await loop.run_in_executor(None, _play_and_wait_sync)
+            # Отдельный пул: звуки обратной связи не задерживают воспроизведение речи
+            await run_blocking(self.executors, ExecutorRegistry.SPEECH_PLAYBACK, _play_and_wait_sync)
                 
             log.info("Воспроизведение завершено (асинхронный контекст).")
             return True
@@ -203,6 +209,22 @@ class AsyncSileroTTS(ITextToSpeech):
             log.debug(f"Ошибка при синтезе или воспроизведении речи (асинхронный контекст): {e}")
             return False
         
+    async def warm_up(self, text: str, voice: str) -> float:
+        """
+        Синтезирует фразу без воспроизведения: первый вызов apply_tts платит
+        за JIT-компиляцию и оптимизацию графа. Возвращает затраченное время, секунды.
+        """
+        if self._model is None:
+            raise RuntimeError("Модель TTS не инициализирована. Сначала вызовите `load_and_init_model()`.")
+        model: TTSModelProtocol = self._model
+
+        def _synthesize() -> float:
+            started: float = time.perf_counter()
+            model.apply_tts(text=text, speaker=voice, sample_rate=self.sample_rate, put_accent=True, put_yo=True)
+            return time.perf_counter() - started
+
+        return await run_blocking(self.executors, ExecutorRegistry.COMPUTE, _synthesize)
+
     async def is_ready(self) -> bool:
         return self._model is not None
         